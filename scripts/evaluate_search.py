@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of RAG search quality and latency.
+
+Indexes this repository (incrementally, reusing the embedding cache) and
+compares the hybrid search fusion strategies on the labelled query set in
+scripts/search_eval_queries.json, reporting recall@k, MRR and latency.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.rag_service import RAGService
+from src.rag_service.evaluation import evaluate_search, load_queries
+from src.rag_service.fusion import FUSION_STRATEGIES
+
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate RAG search fusion strategies")
+    parser.add_argument("--queries", default=str(Path(__file__).parent / "search_eval_queries.json"),
+                        help="Labelled query set (JSON)")
+    parser.add_argument("--persist-dir", default=str(REPO_ROOT / ".rag_eval"),
+                        help="Index directory")
+    parser.add_argument("-k", type=int, default=10, help="Result cutoff")
+    parser.add_argument("--alpha", type=float, default=0.5, help="Vector weight")
+    parser.add_argument("--strategy", action="append", choices=FUSION_STRATEGIES,
+                        help="Strategy to evaluate (repeatable, default: all)")
+    parser.add_argument("--max-per-file", type=int, default=3,
+                        help="Cap on chunks per file (0 for no cap)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    service = RAGService(persist_directory=args.persist_dir, repo_path=str(REPO_ROOT))
+    service.index_directory(str(REPO_ROOT / "src"), extensions=[".py"])
+
+    search = service.search.hybrid_search
+    search.max_chunks_per_file = args.max_per_file or None
+
+    queries = load_queries(args.queries)
+    reports = evaluate_search(
+        search,
+        queries,
+        k=args.k,
+        strategies=args.strategy or FUSION_STRATEGIES,
+        alpha=args.alpha
+    )
+
+    if args.json:
+        print(json.dumps([r.to_dict() for r in reports.values()], indent=2))
+        return
+
+    print(f"{len(queries)} queries, k={args.k}, alpha={args.alpha}\n")
+    print(f"{'strategy':<10} {'recall':>8} {'mrr':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for report in reports.values():
+        print(f"{report.strategy:<10} {report.recall:>8.3f} {report.mrr:>8.3f} "
+              f"{report.latency_p50_ms:>9.1f} {report.latency_p95_ms:>9.1f}")
+    for report in reports.values():
+        if report.misses:
+            print(f"\n{report.strategy} missed: " + "; ".join(report.misses))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 """CLI command modules."""
 
-from . import status, init, run, analyze, search, clean, webhook
+from . import status, init, run, analyze, search, clean, webhook, watch
 
-__all__ = ['status', 'init', 'run', 'analyze', 'search', 'clean', 'webhook']
\ No newline at end of file
+__all__ = ['status', 'init', 'run', 'analyze', 'search', 'clean', 'webhook', 'watch']
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""Watch command for keeping the RAG index and code analysis up to date."""
+
+import sys
+import click
+from rich.console import Console
+
+console = Console()
+
+
+@click.command()
+@click.option('--poll', is_flag=True, help="Poll file stats instead of using filesystem events")
+@click.option('--debounce', default=0.5, type=float, help="Seconds of quiet before changes are indexed")
+@click.option('--no-sync', is_flag=True, help="Skip indexing changes made while not watching")
+@click.option('--no-analysis', is_flag=True, help="Do not refresh AST caches and the call graph")
+@click.option('--snapshot-interval', default=300.0, type=float,
+              help="Seconds between call graph snapshots while watching")
+@click.pass_context
+def watch(ctx, poll, debounce, no_sync, no_analysis, snapshot_interval):
+    """Watch the project and re-index files as they change.
+    
+    Runs until interrupted with Ctrl+C.
+    
+    Example:
+        agent-system watch --debounce 1
+    """
+    from src.rag_service import RAGService
+    from src.rag_service.watcher import FileWatcher, WATCHDOG_AVAILABLE
+    
+    project_root = ctx.obj['project_root']
+    dry_run = ctx.obj.get('dry_run', False)
+    
+    backend = "polling" if poll or not WATCHDOG_AVAILABLE else "filesystem events"
+    console.print(f"[cyan]Watching {project_root} ({backend})[/cyan]")
+    
+    if dry_run:
+        console.print("[yellow]DRY RUN MODE: Would re-index files as they change[/yellow]")
+        return
+    
+    try:
+        rag_service = RAGService(
+            persist_directory=str(project_root / ".rag"),
+            repo_path=str(project_root)
+        )
+        
+        analyzer = None
+        if not no_analysis:
+            from src.code_planner.ast_analyzer_v2 import EnhancedASTAnalyzer
+            analyzer = EnhancedASTAnalyzer(str(project_root))
+        
+        if not no_sync:
+            console.print("Indexing changes since the last run...")
+            rag_service.index_directory(str(project_root))
+        
+        watcher = FileWatcher(
+            rag_service,
+            analyzer=analyzer,
+            debounce_seconds=debounce,
+            use_polling=poll,
+            snapshot_interval=snapshot_interval
+        )
+        console.print("[green]✓[/green] Watching for changes (Ctrl+C to stop)")
+        watcher.run_forever()
+        
+        stats = watcher.get_stats()
+        console.print(
+            f"\n[green]✓[/green] Stopped after {stats['batches']} batches: "
+            f"{stats['files_indexed']} files re-indexed, {stats['files_removed']} removed"
+        )
+        if analyzer is not None:
+            analyzer.close()
+        rag_service.close()
+        
+    except Exception as e:
+        console.print(f"[red]Error while watching: {str(e)}[/red]")
+        if ctx.obj['debug']:
+            console.print_exception()
+        sys.exit(1)
@@ -13,7 +13,7 @@ from dataclasses import dataclass, field
 from collections import defaultdict
 
 
-@dataclass
+@dataclass(slots=True)
 class Symbol:
     """Represents a code symbol (function, class, etc.)."""
     name: str
@@ -26,7 +26,7 @@ class Symbol:
     complexity: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class FileAnalysis:
     """Analysis results for a single file."""
     path: str
@@ -72,6 +72,26 @@ class ASTAnalyzer:
         self._symbol_cache[cache_key] = analysis
         return analysis
     
+    def invalidate_file(self, file_path: str):
+        """Drop cached analysis of a file that changed or was deleted."""
+        self._symbol_cache.pop(str(self.repo_path / file_path), None)
+    
+    def refresh_files(self, files: List[str]) -> Dict[str, Optional[FileAnalysis]]:
+        """
+        Re-analyze files that changed on disk.
+        
+        Args:
+            files: Repository-relative paths (deleted files are only invalidated)
+            
+        Returns:
+            Dictionary of file path -> new analysis (None for deleted files)
+        """
+        results = {}
+        for file_path in files:
+            self.invalidate_file(file_path)
+            results[file_path] = self.analyze_file(file_path)
+        return results
+    
     def _detect_language(self, file_path: str) -> str:
         """Detect programming language from file extension."""
         ext = Path(file_path).suffix.lower()
@@ -117,7 +137,8 @@ class ASTAnalyzer:
                 elif isinstance(node, (ast.Import, ast.ImportFrom)):
                     imp = self._extract_python_import(node)
                     imports.append(imp)
-                    dependencies.add(imp.split('.')[0])
+                    if not imp.startswith('.'):
+                        dependencies.add(imp.split('.')[0])
             
             # Calculate file complexity
             total_complexity = sum(s.complexity for s in symbols)
@@ -190,8 +211,9 @@ class ASTAnalyzer:
         if isinstance(node, ast.Import):
             return node.names[0].name
         elif isinstance(node, ast.ImportFrom):
+            # Keep the leading dots of relative imports
             module = node.module or ''
-            return module
+            return '.' * node.level + module
         return ""
     
     def _analyze_javascript(self, full_path: Path, rel_path: str) -> FileAnalysis:
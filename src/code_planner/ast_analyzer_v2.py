@@ -7,39 +7,77 @@ This module provides the best available AST analysis for each language:
 - Basic analysis for unsupported languages
 """
 
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 from .ast_analyzer import Symbol, FileAnalysis, ASTAnalyzer as BaseASTAnalyzer
-from .tree_sitter_analyzer import TreeSitterAnalyzer
+from .tree_sitter_analyzer import get_shared_analyzer
 from .call_graph_analyzer import CallGraphAnalyzer
+from .symbol_table import SymbolTable
+from .graph_snapshot import GraphSnapshot, SnapshotStore, current_file_hashes
+from ..git_integration import GitAdapter
 from .cache_manager import create_cache_manager, CacheManager
-from .parallel_analyzer import ParallelASTAnalyzer
+from .parallel_analyzer import ParallelAnalyzer, ParallelASTAnalyzer
 from .radon_analyzer import RadonIntegration, RADON_AVAILABLE
 
 
 class EnhancedASTAnalyzer(BaseASTAnalyzer):
     """Enhanced AST analyzer with tree-sitter support."""
     
-    def __init__(self, repo_path: str, cache_manager: Optional[CacheManager] = None):
+    def __init__(self,
+                 repo_path: str,
+                 cache_manager: Optional[CacheManager] = None,
+                 max_workers: Optional[int] = None,
+                 snapshot_dir: Optional[str] = None):
         super().__init__(repo_path)
         try:
-            self.tree_sitter = TreeSitterAnalyzer()
+            self.tree_sitter = get_shared_analyzer()
             self.tree_sitter_available = True
         except Exception as e:
             print(f"Tree-sitter initialization failed: {e}")
             self.tree_sitter_available = False
         
         # Initialize NetworkX call graph
-        self.call_graph = CallGraphAnalyzer()
+        self._graph_analyzer = CallGraphAnalyzer()
+        
+        # Index of symbols and modules for resolving calls and imports
+        self._symbol_table = SymbolTable()
+        
+        # On-disk call graph snapshots; the graph is only saved if it changed.
+        # A loaded snapshot is restored (and its delta applied) on first use.
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else self.repo_path / ".code_planner" / "graph"
+        self._graph_changed = False
+        self._loaded_snapshot: Optional[GraphSnapshot] = None
+        self._snapshot_delta: List[str] = []
+        self._snapshot_key: Optional[str] = None
+        
+        # Content hash each parallel analysis in _symbol_cache was made from
+        self._analysis_hashes: Dict[str, Optional[str]] = {}
         
         # Initialize cache manager
         self.cache = cache_manager or create_cache_manager()
         
+        # Worker pool for parallel analysis, started on first use and kept warm
+        self.max_workers = max_workers
+        self._analysis_pool: Optional[ParallelAnalyzer] = None
+        
         # Initialize Radon integration for Python files
         self.radon = RadonIntegration() if RADON_AVAILABLE else None
         if not RADON_AVAILABLE:
             print("Note: Radon not available. Python complexity metrics will be basic.")
     
+    @property
+    def call_graph(self) -> CallGraphAnalyzer:
+        """NetworkX call graph."""
+        self._restore_snapshot()
+        return self._graph_analyzer
+    
+    @property
+    def symbol_table(self) -> SymbolTable:
+        """Symbol table the call graph is resolved with."""
+        self._restore_snapshot()
+        return self._symbol_table
+    
     def analyze_file(self, file_path: str) -> Optional[FileAnalysis]:
         """Analyze a single file using the best available method."""
         full_path = self.repo_path / file_path
@@ -158,6 +196,15 @@ class EnhancedASTAnalyzer(BaseASTAnalyzer):
         
         return analysis
     
+    def invalidate_file(self, file_path: str):
+        """Drop cached analysis and call graph entries of a changed file."""
+        super().invalidate_file(file_path)
+        self._analysis_hashes.pop(str(self.repo_path / file_path), None)
+        self.cache.invalidate_file(str(self.repo_path / file_path))
+        self.call_graph.remove_file(file_path)
+        self.symbol_table.remove_file(file_path)
+        self._graph_changed = True
+    
     def get_analyzer_info(self) -> Dict[str, any]:
         """Get information about available analyzers."""
         info = {
@@ -166,7 +213,20 @@ class EnhancedASTAnalyzer(BaseASTAnalyzer):
             "fallback_languages": ["python", "javascript"],
             "cache_stats": self.cache.get_cache_stats(),
             "radon_available": RADON_AVAILABLE,
-            "enhanced_python_metrics": RADON_AVAILABLE
+            "enhanced_python_metrics": RADON_AVAILABLE,
+            "symbol_table": self._symbol_table.get_stats(),
+            "pending_edges": self._graph_analyzer.get_pending_counts(),
+            "graph_snapshot": {
+                "key": self._snapshot_key,
+                # none: no snapshot loaded; loaded: graph not built from it yet
+                "state": (
+                    "loaded" if self._loaded_snapshot is not None
+                    else "restored" if self._snapshot_key else "none"
+                ),
+            },
+            "analysis_pool": (
+                self._analysis_pool.get_stats() if self._analysis_pool else {"running": False}
+            )
         }
         
         if self.tree_sitter_available:
@@ -176,53 +236,133 @@ class EnhancedASTAnalyzer(BaseASTAnalyzer):
         return info
     
     def _update_call_graph(self, analysis: FileAnalysis):
-        """Update the NetworkX call graph with analysis results."""
-        # Add symbols to graph
+        """
+        Replace a file's symbols, calls and imports in the NetworkX call graph.
+        
+        Unresolved calls and imports stay pending until a file defining
+        their target is analyzed; pending ones this file satisfies are
+        connected now.
+        """
+        path = analysis.path
+        
+        # Index the file first so calls within it resolve
+        self.symbol_table.add_file(analysis)
+        
+        symbols = []
+        calls = []
         for symbol in analysis.symbols:
-            node_id = self.call_graph.add_symbol(
-                file=analysis.path,
-                symbol=symbol.name,
-                kind=symbol.kind,
-                complexity=symbol.complexity,
-                lines=(symbol.line_start, symbol.line_end)
-            )
-            
-            # Add calls
+            symbols.append((symbol.name, symbol.kind, symbol.complexity,
+                            (symbol.line_start, symbol.line_end)))
+            node_id = f"{path}:{symbol.name}"
             for called in symbol.calls:
-                # Try to find the called symbol
-                called_id = self._find_symbol_id(called, analysis.path)
-                if called_id:
-                    self.call_graph.add_call(node_id, called_id)
-        
-        # Add file dependencies
-        for imp in analysis.imports:
-            # Try to find the imported file
-            import_file = self._resolve_import(imp, analysis.path)
-            if import_file:
-                self.call_graph.add_file_dependency(analysis.path, import_file, imp)
+                calls.append((node_id, called, self._find_symbol_id(called, path)))
+        
+        dependencies = [
+            (imp, self._resolve_import(imp, path), self.symbol_table.import_key(imp, path))
+            for imp in analysis.imports if imp
+        ]
+        
+        self.call_graph.replace_file(path, symbols, calls, dependencies)
+        self.call_graph.resolve_pending(
+            self.symbol_table.names(path),
+            self.symbol_table.module_keys(path),
+            self._find_symbol_id,
+            self._resolve_import
+        )
+        self._graph_changed = True
+    
+    def save_snapshot(self, git_adapter: Optional[GitAdapter] = None) -> Optional[Path]:
+        """
+        Save the call graph to the snapshot directory if it changed.
+        
+        Args:
+            git_adapter: Git access for the commit SHA and file hashes
+            
+        Returns:
+            Snapshot directory, or None if there was nothing to save
+        """
+        if not self._graph_changed:
+            return None
+        
+        git_adapter = git_adapter or GitAdapter(str(self.repo_path))
+        files = [path for path, _, _ in self.symbol_table.files()]
+        snapshot = GraphSnapshot.capture(
+            self.call_graph,
+            self.symbol_table,
+            current_file_hashes(str(self.repo_path), files, git_adapter),
+            git_adapter.get_current_commit()
+        )
+        directory = SnapshotStore(str(self.snapshot_dir)).save(snapshot)
+        self._graph_changed = False
+        return directory
+    
+    def load_snapshot(self,
+                      git_adapter: Optional[GitAdapter] = None,
+                      lazy: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Load the latest call graph snapshot and find the files changed since.
+        
+        Args:
+            git_adapter: Git access for the commit SHA and file hashes
+            lazy: Restore the graph and re-analyze changed files on first
+                use of the graph instead of now
+            
+        Returns:
+            Load statistics, or None if no snapshot was found
+        """
+        start = time.time()
+        git_adapter = git_adapter or GitAdapter(str(self.repo_path))
+        commit = git_adapter.get_current_commit()
+        snapshot = SnapshotStore(str(self.snapshot_dir)).latest(commit)
+        if snapshot is None:
+            return None
+        
+        # The delta: files edited, added to HEAD or deleted since
+        files = list(snapshot.file_hashes())
+        changed = snapshot.changed_files(
+            current_file_hashes(str(self.repo_path), files, git_adapter)
+        )
+        
+        self._loaded_snapshot = snapshot
+        self._snapshot_delta = changed
+        self._snapshot_key = snapshot.key
+        self._graph_changed = False
+        if not lazy:
+            self._restore_snapshot()
+        
+        return {
+            "key": snapshot.key,
+            "commit": snapshot.commit,
+            "files": snapshot.meta["files"],
+            "nodes": snapshot.meta["nodes"],
+            "edges": snapshot.meta["edges"],
+            "changed_files": len(changed),
+            "total_seconds": time.time() - start,
+        }
+    
+    def _restore_snapshot(self):
+        """Build the call graph from a loaded snapshot and apply its delta."""
+        if self._loaded_snapshot is None:
+            return
+        snapshot, changed = self._loaded_snapshot, self._snapshot_delta
+        self._loaded_snapshot, self._snapshot_delta = None, []
+        
+        start = time.time()
+        call_graph, symbol_table = CallGraphAnalyzer(), SymbolTable()
+        snapshot.restore(call_graph, symbol_table)
+        self._graph_analyzer, self._symbol_table = call_graph, symbol_table
+        if changed:
+            self.refresh_files(changed)
+        print(f"Restored call graph snapshot {snapshot.key} "
+              f"({len(changed)} changed files) in {time.time() - start:.2f}s")
     
     def _find_symbol_id(self, symbol_name: str, current_file: str) -> Optional[str]:
         """Find the full ID of a symbol."""
-        # First check in current file
-        current_id = f"{current_file}:{symbol_name}"
-        if current_id in self.call_graph.node_data:
-            return current_id
-        
-        # Check all cached files for the symbol
-        for file_path, analysis in self._symbol_cache.items():
-            for symbol in analysis.symbols:
-                if symbol.name == symbol_name or symbol.name.endswith(f".{symbol_name}"):
-                    return f"{analysis.path}:{symbol.name}"
-        
-        return None
+        return self.symbol_table.find_symbol(symbol_name, current_file)
     
     def _resolve_import(self, import_name: str, current_file: str) -> Optional[str]:
         """Resolve an import to a file path."""
-        # Simple heuristic - look for matching files in cache
-        for file_path in self._symbol_cache:
-            if import_name in file_path or file_path.endswith(f"{import_name}.py"):
-                return self._symbol_cache[file_path].path
-        return None
+        return self.symbol_table.resolve_import(import_name, current_file)
     
     def build_call_graph(self, files: List[str]) -> Dict[str, Set[str]]:
         """Build call graph using NetworkX (overrides base method)."""
@@ -246,12 +386,40 @@ class EnhancedASTAnalyzer(BaseASTAnalyzer):
         
         return result
     
+    def _get_analysis_pool(self) -> ParallelAnalyzer:
+        """Get the long-lived analysis pool, starting it if needed."""
+        if self._analysis_pool is None:
+            self._analysis_pool = ParallelAnalyzer(max_workers=self.max_workers)
+        return self._analysis_pool.start()
+    
+    def close(self):
+        """Stop the analysis worker pool."""
+        if self._analysis_pool is not None:
+            self._analysis_pool.shutdown()
+            self._analysis_pool = None
+    
     def _analyze_files_parallel(self, files: List[str]):
         """Analyze multiple files in parallel."""
+        # Files analyzed before are served from the in-memory cache, unless
+        # they changed since
+        hashes = current_file_hashes(str(self.repo_path), files)
+        stale = []
+        for file_path in files:
+            cache_key = str(self.repo_path / file_path)
+            if cache_key not in self._symbol_cache:
+                stale.append(file_path)
+            elif self._analysis_hashes.get(cache_key) != hashes[file_path]:
+                # Drops the old analysis and its part of the call graph
+                self.invalidate_file(file_path)
+                if hashes[file_path] is not None:
+                    stale.append(file_path)
+        files = stale
+        if not files:
+            return
         print(f"Using parallel analysis for {len(files)} files...")
         
-        # Create parallel analyzer
-        parallel = ParallelASTAnalyzer(str(self.repo_path))
+        # Analyze on the warm pool shared by all calls
+        parallel = ParallelASTAnalyzer(str(self.repo_path), pool=self._get_analysis_pool())
         
         # Analyze files
         analyses = parallel.analyze_files(files, show_progress=True)
@@ -262,6 +430,7 @@ class EnhancedASTAnalyzer(BaseASTAnalyzer):
                 # Update caches
                 cache_key = str(self.repo_path / file_path)
                 self._symbol_cache[cache_key] = analysis
+                self._analysis_hashes[cache_key] = hashes[file_path]
                 self._update_call_graph(analysis)
                 
                 # Store in Redis cache
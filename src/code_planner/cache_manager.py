@@ -283,6 +283,13 @@ class InMemoryCacheManager(CacheManager):
                     del self.cache[k]
                     del self.timestamps[k]
     
+    def invalidate_file(self, file_path: str):
+        """Invalidate all cache entries for a file."""
+        prefix = self._make_cache_key("ast", file_path, "")
+        for k in [k for k in self.cache if k.startswith(prefix)]:
+            del self.cache[k]
+            self.timestamps.pop(k, None)
+    
     def clear_cache(self, pattern: Optional[str] = None):
         """Clear cache entries."""
         if pattern:
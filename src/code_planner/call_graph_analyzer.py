@@ -3,11 +3,19 @@ NetworkX-based call graph analyzer.
 
 This module provides advanced call graph analysis using NetworkX,
 supporting dependency analysis, impact analysis, and graph visualization.
+
+Nodes and edges are owned by the file that contributed them: a file owns
+its symbol nodes, the call edges leaving them and the import edges leaving
+its file node. replace_file swaps a file's contribution in one step, and
+calls or imports that cannot be resolved yet are kept as pending edges
+until a file that may define their target is added.
 """
 
 import networkx as nx
+import threading
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple, Optional
 from dataclasses import dataclass
 import json
 
@@ -29,6 +37,18 @@ class CallGraphAnalyzer:
     def __init__(self):
         self.graph = nx.DiGraph()
         self.node_data: Dict[str, CallNode] = {}
+        
+        # Symbol nodes owned by each file
+        self._file_nodes: Dict[str, Set[str]] = {}
+        # Unresolved calls: called name -> caller ids
+        self._pending_calls: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # Unresolved imports: module key -> (importing file, import name)
+        self._pending_imports: Dict[str, Dict[Tuple[str, str], None]] = defaultdict(dict)
+        # Pending entries registered by each file, for cleanup
+        self._file_pending: Dict[str, Set[Tuple[str, str, str]]] = defaultdict(set)
+        # Module key of each resolved import, to re-pend it if its target goes away
+        self._import_keys: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.RLock()
     
     def add_symbol(self, file: str, symbol: str, kind: str, 
                    complexity: int = 1, lines: Tuple[int, int] = (0, 0)) -> str:
@@ -48,15 +68,41 @@ class CallGraphAnalyzer:
         # Add to graph
         self.graph.add_node(node_id, **node.__dict__)
         self.node_data[node_id] = node
+        if kind != "file":
+            self._file_nodes.setdefault(file, set()).add(node_id)
         
         return node_id
     
-    def add_call(self, caller_id: str, callee_id: str, call_type: str = "calls"):
-        """Add a call relationship between two symbols."""
-        self.graph.add_edge(caller_id, callee_id, type=call_type)
+    def add_call(self, caller_id: str, callee_id: str, call_type: str = "calls",
+                 name: Optional[str] = None):
+        """
+        Add a call relationship between two symbols.
+        
+        Args:
+            caller_id: Calling symbol
+            callee_id: Called symbol
+            call_type: Edge type
+            name: Name the callee was called by; lets the call be resolved
+                again if the callee's file changes
+        """
+        if name is None:
+            self.graph.add_edge(caller_id, callee_id, type=call_type)
+        else:
+            self.graph.add_edge(caller_id, callee_id, type=call_type, name=name)
+    
+    def add_pending_call(self, caller_id: str, name: str):
+        """Record a call whose target is not in the graph yet."""
+        self._pending_calls[name][caller_id] = None
+        self._file_pending[self.node_data[caller_id].file].add(("call", name, caller_id))
+    
+    def add_pending_dependency(self, from_file: str, import_name: str, key: str):
+        """Record an import whose target file is not in the graph yet."""
+        self._pending_imports[key][(from_file, import_name)] = None
+        self._file_pending[from_file].add(("import", key, import_name))
     
-    def add_file_dependency(self, from_file: str, to_file: str, import_name: str):
-        """Add a file-level dependency."""
+    def add_file_dependency(self, from_file: str, to_file: str, import_name: str,
+                            key: Optional[str] = None):
+        """Add a file-level dependency (key: module key for re-resolving it later)."""
         # Create file nodes if they don't exist
         from_id = f"{from_file}:__file__"
         to_id = f"{to_file}:__file__"
@@ -67,6 +113,240 @@ class CallGraphAnalyzer:
             self.add_symbol(to_file, "__file__", "file")
         
         self.graph.add_edge(from_id, to_id, type="imports", import_name=import_name)
+        if key is not None:
+            self._import_keys[(from_file, import_name)] = key
+    
+    def _detach_file(self, file: str, keep_file_node: bool):
+        """
+        Remove everything a file owns.
+        
+        Returns:
+            Tuple of (number of symbols removed, call edges from other files
+            into the removed symbols, import edges from other files into the
+            file node if it was removed)
+        """
+        file_id = f"{file}:__file__"
+        symbols = self._file_nodes.pop(file, set())
+        
+        incoming_calls = []
+        for node_id in symbols:
+            for caller_id, _, data in self.graph.in_edges(node_id, data=True):
+                if caller_id not in symbols and data.get("name"):
+                    incoming_calls.append((caller_id, node_id, data["name"]))
+        self.graph.remove_nodes_from(symbols)
+        for node_id in symbols:
+            del self.node_data[node_id]
+        
+        for kind, key, item in self._file_pending.pop(file, ()):
+            pending = self._pending_calls if kind == "call" else self._pending_imports
+            entries = pending.get(key)
+            if entries is not None:
+                entries.pop(item if kind == "call" else (file, item), None)
+                if not entries:
+                    del pending[key]
+        
+        incoming_imports = []
+        if file_id in self.graph:
+            for _, _, data in self.graph.out_edges(file_id, data=True):
+                self._import_keys.pop((file, data.get("import_name")), None)
+            self.graph.remove_edges_from(list(self.graph.out_edges(file_id)))
+            if not keep_file_node:
+                for importer_id, _, data in self.graph.in_edges(file_id, data=True):
+                    importer = self.node_data[importer_id].file
+                    key = self._import_keys.pop((importer, data.get("import_name")), None)
+                    if key is not None:
+                        incoming_imports.append((importer, data["import_name"], key))
+                self.graph.remove_node(file_id)
+                del self.node_data[file_id]
+        
+        return len(symbols), incoming_calls, incoming_imports
+    
+    def remove_file(self, file: str) -> int:
+        """
+        Remove a file's symbols, the calls and imports it declares and its
+        file node.
+        
+        Calls and imports of other files that pointed into it become
+        pending, so they reconnect if the file is added again.
+        
+        Returns:
+            Number of symbols removed
+        """
+        with self._lock:
+            removed, incoming_calls, incoming_imports = self._detach_file(file, keep_file_node=False)
+            for caller_id, _, name in incoming_calls:
+                self.add_pending_call(caller_id, name)
+            for importer, import_name, key in incoming_imports:
+                self.add_pending_dependency(importer, import_name, key)
+        return removed
+    
+    def replace_file(self,
+                     file: str,
+                     symbols: Iterable[Tuple[str, str, int, Tuple[int, int]]],
+                     calls: Iterable[Tuple[str, str, Optional[str]]],
+                     dependencies: Iterable[Tuple[str, Optional[str], str]]):
+        """
+        Replace a file's contribution to the graph in one step.
+        
+        Args:
+            file: File path
+            symbols: (symbol, kind, complexity, lines) of each symbol
+            calls: (caller symbol id, called name, callee id or None if
+                unresolved) of each call
+            dependencies: (import name, imported file or None if unresolved,
+                module key) of each import
+        """
+        symbols = list(symbols)
+        calls = list(calls)
+        dependencies = list(dependencies)
+        
+        with self._lock:
+            _, incoming_calls, _ = self._detach_file(file, keep_file_node=True)
+            
+            for symbol, kind, complexity, lines in symbols:
+                self.add_symbol(file, symbol, kind, complexity, lines)
+            
+            for caller_id, name, callee_id in calls:
+                if callee_id is not None and callee_id in self.graph:
+                    self.add_call(caller_id, callee_id, name=name)
+                else:
+                    self.add_pending_call(caller_id, name)
+            
+            for import_name, to_file, key in dependencies:
+                if to_file is not None:
+                    self.add_file_dependency(file, to_file, import_name, key)
+                else:
+                    self.add_pending_dependency(file, import_name, key)
+            
+            # Calls from other files reconnect to symbols that still exist
+            for caller_id, callee_id, name in incoming_calls:
+                if callee_id in self.graph:
+                    self.add_call(caller_id, callee_id, name=name)
+                else:
+                    self.add_pending_call(caller_id, name)
+    
+    def resolve_pending(self,
+                        names: Iterable[str],
+                        keys: Iterable[str],
+                        find_symbol: Callable[[str, str], Optional[str]],
+                        resolve_import: Callable[[str, str], Optional[str]]) -> int:
+        """
+        Retry pending calls and imports that a newly added file may satisfy.
+        
+        Args:
+            names: Names the file defines
+            keys: Module keys of the file
+            find_symbol: (called name, calling file) -> symbol id or None
+            resolve_import: (import name, importing file) -> file or None
+            
+        Returns:
+            Number of edges added
+        """
+        added = 0
+        with self._lock:
+            for name in names:
+                callers = self._pending_calls.pop(name, None)
+                for caller_id in callers or ():
+                    caller_file = self.node_data[caller_id].file
+                    self._file_pending[caller_file].discard(("call", name, caller_id))
+                    callee_id = find_symbol(name, caller_file)
+                    if callee_id is not None and callee_id in self.graph:
+                        self.add_call(caller_id, callee_id, name=name)
+                        added += 1
+                    else:
+                        self.add_pending_call(caller_id, name)
+            
+            for key in keys:
+                importers = self._pending_imports.pop(key, None)
+                for from_file, import_name in importers or ():
+                    self._file_pending[from_file].discard(("import", key, import_name))
+                    to_file = resolve_import(import_name, from_file)
+                    if to_file is not None:
+                        self.add_file_dependency(from_file, to_file, import_name, key)
+                        added += 1
+                    else:
+                        self.add_pending_dependency(from_file, import_name, key)
+        return added
+    
+    def iter_edges(self) -> Iterator[Tuple[str, str, str, Optional[str], Optional[str]]]:
+        """
+        Iterate over edges as (source, target, type, label, key).
+        
+        The label is the called name of a call or the import name of an
+        import; the key is the module key of a resolved import.
+        """
+        for u, v, data in self.graph.edges(data=True):
+            edge_type = data.get("type", "calls")
+            if edge_type == "imports":
+                label = data.get("import_name")
+                key = self._import_keys.get((self.node_data[u].file, label))
+            else:
+                label, key = data.get("name"), None
+            yield u, v, edge_type, label, key
+    
+    def iter_pending(self) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str, str]]]:
+        """
+        Get pending edges.
+        
+        Returns:
+            Tuple of ((caller id, called name) list,
+            (importing file, import name, module key) list)
+        """
+        calls = [(caller_id, name) for name, callers in self._pending_calls.items()
+                 for caller_id in callers]
+        imports = [(from_file, import_name, key) for key, importers in self._pending_imports.items()
+                   for from_file, import_name in importers]
+        return calls, imports
+    
+    def restore(self,
+                nodes: Iterable[CallNode],
+                edges: Iterable[Tuple[str, str, str, Optional[str], Optional[str]]],
+                pending_calls: Iterable[Tuple[str, str]] = (),
+                pending_imports: Iterable[Tuple[str, str, str]] = ()):
+        """
+        Replace the whole graph with saved state (see iter_edges and iter_pending).
+        """
+        graph = nx.DiGraph()
+        node_data: Dict[str, CallNode] = {}
+        file_nodes: Dict[str, Set[str]] = {}
+        for node in nodes:
+            node_data[node.id] = node
+            if node.kind != "file":
+                file_nodes.setdefault(node.file, set()).add(node.id)
+        graph.add_nodes_from((node_id, vars(node)) for node_id, node in node_data.items())
+        
+        import_keys: Dict[Tuple[str, str], str] = {}
+        attributes = []
+        for u, v, edge_type, label, key in edges:
+            if edge_type == "imports":
+                attributes.append((u, v, {"type": edge_type, "import_name": label}))
+                if key is not None:
+                    import_keys[(node_data[u].file, label)] = key
+            elif label is not None:
+                attributes.append((u, v, {"type": edge_type, "name": label}))
+            else:
+                attributes.append((u, v, {"type": edge_type}))
+        graph.add_edges_from(attributes)
+        
+        with self._lock:
+            self.graph = graph
+            self.node_data = node_data
+            self._file_nodes = file_nodes
+            self._import_keys = import_keys
+            self._pending_calls.clear()
+            self._pending_imports.clear()
+            self._file_pending.clear()
+            for caller_id, name in pending_calls:
+                self.add_pending_call(caller_id, name)
+            for from_file, import_name, key in pending_imports:
+                self.add_pending_dependency(from_file, import_name, key)
+    
+    def get_pending_counts(self) -> Dict[str, int]:
+        """Get the number of unresolved calls and imports."""
+        return {
+            "calls": sum(len(callers) for callers in self._pending_calls.values()),
+            "imports": sum(len(importers) for importers in self._pending_imports.values()),
+        }
     
     def get_callers(self, symbol_id: str) -> List[str]:
         """Get all symbols that call the given symbol."""
@@ -34,14 +34,29 @@ class CodePlanner:
     - Emit TaskBundles for Coding Agents
     """
     
-    def __init__(self, repo_path: str, git_adapter: Optional[GitAdapter] = None, use_rag: bool = True):
+    def __init__(self, repo_path: str, git_adapter: Optional[GitAdapter] = None,
+                 use_rag: bool = True, use_graph_snapshot: bool = True):
         self.repo_path = Path(repo_path)
         self.git_adapter = git_adapter or GitAdapter(repo_path)
+        self.use_graph_snapshot = use_graph_snapshot
         
         # Use enhanced analyzer if available
         if ENHANCED_AST_AVAILABLE:
             self.ast_analyzer = EnhancedASTAnalyzer(repo_path)
             logger.info("Using enhanced AST analyzer with tree-sitter support")
+            
+            # Start from the saved call graph instead of rebuilding it
+            if use_graph_snapshot:
+                try:
+                    stats = self.ast_analyzer.load_snapshot(self.git_adapter)
+                    if stats:
+                        logger.info(
+                            f"Loaded call graph snapshot {stats['key']} "
+                            f"({stats['nodes']} nodes, {stats['changed_files']} changed files) "
+                            f"in {stats['total_seconds']:.2f}s"
+                        )
+                except Exception as e:
+                    logger.warning(f"Failed to load call graph snapshot: {e}")
         else:
             self.ast_analyzer = ASTAnalyzer(repo_path)
             logger.info("Using basic AST analyzer")
@@ -122,12 +137,9 @@ class CodePlanner:
                         if self._is_valid_file(file_path):
                             all_files.add(file_path)
         
-        # Analyze all files
+        # Analyze all files and build the call graph (large sets go to the
+        # analyzer's worker pool)
         logger.debug(f"Pre-analyzing {len(all_files)} files")
-        for file_path in all_files:
-            self.ast_analyzer.analyze_file(file_path)
-        
-        # Build call graph
         if all_files:
             call_graph = self.ast_analyzer.build_call_graph(list(all_files))
             logger.debug(f"Built call graph with {len(call_graph)} nodes")
@@ -187,4 +199,14 @@ class CodePlanner:
         if ENHANCED_AST_AVAILABLE and hasattr(self.ast_analyzer, 'get_analyzer_info'):
             metrics["analyzer_info"] = self.ast_analyzer.get_analyzer_info()
         
-        return metrics
\ No newline at end of file
+        return metrics
+    
+    def close(self):
+        """Save the call graph snapshot and release the analyzer's worker processes."""
+        if self.use_graph_snapshot and hasattr(self.ast_analyzer, 'save_snapshot'):
+            try:
+                self.ast_analyzer.save_snapshot(self.git_adapter)
+            except Exception as e:
+                logger.warning(f"Failed to save call graph snapshot: {e}")
+        if hasattr(self.ast_analyzer, 'close'):
+            self.ast_analyzer.close()
@@ -0,0 +1,208 @@
+"""
+Compact columnar encoding of file analyses.
+
+Parallel analysis workers send their results to the parent process in this
+form instead of pickled FileAnalysis/Symbol object graphs. A batch holds:
+
+- one string table, with every name, kind, path and import interned once
+- per-file rows of ints (string indexes, complexity and end offsets of the
+  file's symbols, imports, exports and dependencies)
+- per-symbol rows of ints (string indexes, lines, complexity and end offsets
+  of the symbol's calls and imports)
+- flat arrays of string indexes for those variable-length lists
+
+Rows are packed into ``array`` buffers of the narrowest integer type that
+fits the batch, which pickle as raw bytes. Files are decoded back into
+FileAnalysis objects one at a time, on demand.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .ast_analyzer import FileAnalysis, Symbol
+
+# path, language, complexity, symbols end, imports end, exports end, dependencies end
+FILE_FIELDS = 7
+# name, kind, file_path, line_start, line_end, complexity, calls end, imports end
+SYMBOL_FIELDS = 8
+
+
+def _pack(values: List[int]) -> array:
+    """Pack ints into the narrowest array type that holds them."""
+    if min(values, default=0) >= 0:
+        high = max(values, default=0)
+        for typecode in ("B", "H", "I"):
+            if high < 1 << (8 * array(typecode).itemsize):
+                return array(typecode, values)
+    return array("q", values)
+
+
+class CompactAnalysisBatch:
+    """Columnar encoding of the analyses of a batch of files."""
+
+    __slots__ = ("strings", "files", "symbols", "symbol_strings", "file_strings")
+
+    def __init__(self,
+                 strings: List[str],
+                 files: array,
+                 symbols: array,
+                 symbol_strings: array,
+                 file_strings: array):
+        self.strings = strings
+        self.files = files
+        self.symbols = symbols
+        self.symbol_strings = symbol_strings
+        self.file_strings = file_strings
+
+    def __len__(self) -> int:
+        return len(self.files) // FILE_FIELDS
+
+    def __getstate__(self):
+        return (self.strings, self.files, self.symbols, self.symbol_strings, self.file_strings)
+
+    def __setstate__(self, state):
+        (self.strings, self.files, self.symbols,
+         self.symbol_strings, self.file_strings) = state
+
+    @classmethod
+    def encode(cls, analyses: Sequence[FileAnalysis]) -> "CompactAnalysisBatch":
+        """
+        Encode file analyses.
+
+        Args:
+            analyses: Analyses to encode; decode(i) returns analyses[i]
+
+        Returns:
+            Encoded batch
+        """
+        table: Dict[str, int] = {}
+
+        def intern(value: str) -> int:
+            index = table.get(value)
+            if index is None:
+                index = table[value] = len(table)
+            return index
+
+        files: List[int] = []
+        symbols: List[int] = []
+        symbol_strings: List[int] = []
+        file_strings: List[int] = []
+
+        for analysis in analyses:
+            for symbol in analysis.symbols:
+                symbol_strings.extend(map(intern, symbol.calls))
+                calls_end = len(symbol_strings)
+                symbol_strings.extend(map(intern, symbol.imports))
+                symbols.extend((
+                    intern(symbol.name),
+                    intern(symbol.kind),
+                    intern(symbol.file_path),
+                    symbol.line_start,
+                    symbol.line_end,
+                    int(symbol.complexity),
+                    calls_end,
+                    len(symbol_strings),
+                ))
+
+            file_strings.extend(map(intern, analysis.imports))
+            imports_end = len(file_strings)
+            file_strings.extend(map(intern, analysis.exports))
+            exports_end = len(file_strings)
+            file_strings.extend(map(intern, analysis.dependencies))
+            files.extend((
+                intern(analysis.path),
+                intern(analysis.language),
+                int(analysis.complexity),
+                len(symbols) // SYMBOL_FIELDS,
+                imports_end,
+                exports_end,
+                len(file_strings),
+            ))
+
+        return cls(
+            list(table),
+            _pack(files),
+            _pack(symbols),
+            _pack(symbol_strings),
+            _pack(file_strings)
+        )
+
+    def path(self, index: int) -> str:
+        """Get the path of an encoded file without decoding it."""
+        return self.strings[self.files[index * FILE_FIELDS]]
+
+    def decode(self, index: int) -> FileAnalysis:
+        """
+        Decode one file's analysis.
+
+        Args:
+            index: Position of the file in the encoded sequence
+
+        Returns:
+            FileAnalysis with its symbols
+        """
+        strings = self.strings
+        row = index * FILE_FIELDS
+        (path, language, complexity, symbols_end,
+         imports_end, exports_end, dependencies_end) = self.files[row:row + FILE_FIELDS]
+        if index:
+            symbols_start = self.files[row - FILE_FIELDS + 3]
+            lists_start = self.files[row - 1]
+        else:
+            symbols_start = lists_start = 0
+
+        symbols = []
+        symbol_strings = self.symbol_strings
+        for k in range(symbols_start, symbols_end):
+            offset = k * SYMBOL_FIELDS
+            (name, kind, file_path, line_start, line_end, symbol_complexity,
+             calls_end, symbol_imports_end) = self.symbols[offset:offset + SYMBOL_FIELDS]
+            calls_start = self.symbols[offset - 1] if k else 0
+            symbols.append(Symbol(
+                name=strings[name],
+                kind=strings[kind],
+                file_path=strings[file_path],
+                line_start=line_start,
+                line_end=line_end,
+                calls={strings[i] for i in symbol_strings[calls_start:calls_end]},
+                imports={strings[i] for i in symbol_strings[calls_end:symbol_imports_end]},
+                complexity=symbol_complexity,
+            ))
+
+        file_strings = self.file_strings
+        return FileAnalysis(
+            path=strings[path],
+            language=strings[language],
+            symbols=symbols,
+            imports=[strings[i] for i in file_strings[lists_start:imports_end]],
+            exports=[strings[i] for i in file_strings[imports_end:exports_end]],
+            dependencies={strings[i] for i in file_strings[exports_end:dependencies_end]},
+            complexity=complexity,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate encoded size in bytes."""
+        arrays = (self.files, self.symbols, self.symbol_strings, self.file_strings)
+        return (
+            sum(a.itemsize * len(a) for a in arrays)
+            + sum(len(s) for s in self.strings)
+        )
+
+
+def encode_analyses(analyses: Sequence[Optional[FileAnalysis]]) -> Tuple[CompactAnalysisBatch, List[int]]:
+    """
+    Encode analyses that may contain failures (None).
+
+    Returns:
+        Tuple of (batch, position of each analysis in the batch or -1)
+    """
+    positions = []
+    present = []
+    for analysis in analyses:
+        if analysis is None:
+            positions.append(-1)
+        else:
+            positions.append(len(present))
+            present.append(analysis)
+    return CompactAnalysisBatch.encode(present), positions
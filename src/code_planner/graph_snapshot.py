@@ -0,0 +1,408 @@
+"""
+On-disk snapshots of the call graph.
+
+A snapshot is a directory of .npy arrays that np.load can memory-map:
+
+- a string table (UTF-8 bytes plus offsets) holding every path, symbol,
+  kind, import and called name once
+- a file table: path, content hash, language and imports of each file
+- a node table: file, symbol, kind, complexity and lines of each node
+- the edges in CSR form: per-node offsets into target, type, label and key
+  arrays
+- the pending calls and imports
+
+plus meta.json with the commit SHA and the snapshot key. The key is derived
+from the commit SHA and the set of (path, hash) pairs the snapshot covers.
+Hashes are git blob SHAs, so files unchanged since HEAD are hashed with one
+``git ls-tree`` call instead of being read. On load, files whose hash
+differs from the snapshot's are the delta to re-analyze.
+"""
+
+import gc
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .call_graph_analyzer import CallGraphAnalyzer, CallNode
+from .symbol_table import SymbolTable
+from ..git_integration import GitAdapter
+
+SNAPSHOT_VERSION = 1
+EDGE_TYPES = ("calls", "imports")
+
+ARRAYS = (
+    "string_data", "string_offsets",
+    "file_path", "file_hash", "file_language", "file_imports_indptr", "file_imports",
+    "node_file", "node_symbol", "node_kind", "node_complexity", "node_lines",
+    "edge_indptr", "edge_target", "edge_type", "edge_label", "edge_key",
+    "pending_calls", "pending_imports",
+)
+
+
+def blob_hash(content: bytes) -> str:
+    """Git blob SHA of file content."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def current_file_hashes(repo_path: str,
+                        files: Iterable[str],
+                        git_adapter: Optional[GitAdapter] = None) -> Dict[str, Optional[str]]:
+    """
+    Get the current hash of files.
+
+    Files that are unchanged since HEAD take their blob SHA from the tree;
+    others are read and hashed the same way.
+
+    Args:
+        repo_path: Repository root
+        files: Repository-relative paths
+        git_adapter: Git access (files are read and hashed without it)
+
+    Returns:
+        Dictionary of file path -> hash (None for missing files)
+    """
+    repo_path = Path(repo_path)
+    tree: Dict[str, str] = {}
+    modified = set()
+    if git_adapter is not None:
+        tree = {entry.path: entry.sha for entry in git_adapter.list_files("HEAD")}
+        modified = set(git_adapter.get_modified_files("HEAD"))
+
+    hashes = {}
+    for path in files:
+        if path in tree and path not in modified:
+            hashes[path] = tree[path]
+            continue
+        try:
+            hashes[path] = blob_hash((repo_path / path).read_bytes())
+        except OSError:
+            hashes[path] = None
+    return hashes
+
+
+def snapshot_key(commit: str, file_hashes: Dict[str, Optional[str]]) -> str:
+    """Key of a snapshot of the given files at a commit."""
+    digest = hashlib.sha1(commit.encode())
+    for path in sorted(file_hashes):
+        digest.update(f"\n{path}\0{file_hashes[path] or ''}".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()[:16]
+
+
+class GraphSnapshot:
+    """Call graph and symbol table state as flat arrays."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        self.arrays = arrays
+        self.meta = meta
+
+    @property
+    def key(self) -> str:
+        return self.meta["key"]
+
+    @property
+    def commit(self) -> str:
+        return self.meta["commit"]
+
+    @classmethod
+    def capture(cls,
+                call_graph: CallGraphAnalyzer,
+                symbol_table: SymbolTable,
+                file_hashes: Dict[str, Optional[str]],
+                commit: str) -> "GraphSnapshot":
+        """
+        Capture the state of a call graph and its symbol table.
+
+        Args:
+            call_graph: Graph to capture
+            symbol_table: Symbol table the graph was built with
+            file_hashes: Hash of each analyzed file
+            commit: Commit SHA the files were analyzed at
+
+        Returns:
+            Snapshot
+        """
+        table: Dict[str, int] = {}
+
+        def intern(value: Optional[str]) -> int:
+            if value is None:
+                return -1
+            index = table.get(value)
+            if index is None:
+                index = table[value] = len(table)
+            return index
+
+        file_index: Dict[str, int] = {}
+        file_path, file_hash, file_language = [], [], []
+        file_imports_indptr, file_imports = [0], []
+
+        def add_file(path: str, language: Optional[str] = None, imports=()) -> int:
+            index = file_index.get(path)
+            if index is None:
+                index = file_index[path] = len(file_path)
+                file_path.append(intern(path))
+                file_hash.append(intern(file_hashes.get(path)))
+                file_language.append(intern(language))
+                file_imports.extend(map(intern, imports))
+                file_imports_indptr.append(len(file_imports))
+            return index
+
+        # Indexed files first, so every one of them has its language and imports
+        for path, language, imports in symbol_table.files():
+            add_file(path, language, imports)
+
+        node_index: Dict[str, int] = {}
+        node_file, node_symbol, node_kind, node_complexity, node_lines = [], [], [], [], []
+        for node_id, node in call_graph.node_data.items():
+            node_index[node_id] = len(node_file)
+            node_file.append(add_file(node.file))
+            node_symbol.append(intern(node.symbol))
+            node_kind.append(intern(node.kind))
+            node_complexity.append(int(node.complexity))
+            node_lines.append(node.lines)
+
+        edges = [
+            (node_index[u], node_index[v], EDGE_TYPES.index(edge_type), intern(label), intern(key))
+            for u, v, edge_type, label, key in call_graph.iter_edges()
+        ]
+        edges.sort(key=lambda edge: edge[0])
+        edge_array = np.array(edges, dtype=np.int32).reshape(-1, 5)
+        edge_indptr = np.zeros(len(node_file) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_array[:, 0], minlength=len(node_file)), out=edge_indptr[1:])
+
+        pending_calls, pending_imports = call_graph.iter_pending()
+        pending_calls = [(node_index[caller_id], intern(name)) for caller_id, name in pending_calls]
+        pending_imports = [
+            (add_file(from_file), intern(import_name), intern(key))
+            for from_file, import_name, key in pending_imports
+        ]
+
+        encoded = [value.encode("utf-8", "surrogatepass") for value in table]
+        string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=string_offsets[1:])
+
+        arrays = {
+            "string_data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "string_offsets": string_offsets,
+            "file_path": np.array(file_path, dtype=np.int32),
+            "file_hash": np.array(file_hash, dtype=np.int32),
+            "file_language": np.array(file_language, dtype=np.int32),
+            "file_imports_indptr": np.array(file_imports_indptr, dtype=np.int64),
+            "file_imports": np.array(file_imports, dtype=np.int32),
+            "node_file": np.array(node_file, dtype=np.int32),
+            "node_symbol": np.array(node_symbol, dtype=np.int32),
+            "node_kind": np.array(node_kind, dtype=np.int32),
+            "node_complexity": np.array(node_complexity, dtype=np.int32),
+            "node_lines": np.array(node_lines, dtype=np.int32).reshape(-1, 2),
+            "edge_indptr": edge_indptr,
+            "edge_target": np.ascontiguousarray(edge_array[:, 1]),
+            "edge_type": edge_array[:, 2].astype(np.uint8),
+            "edge_label": np.ascontiguousarray(edge_array[:, 3]),
+            "edge_key": np.ascontiguousarray(edge_array[:, 4]),
+            "pending_calls": np.array(pending_calls, dtype=np.int32).reshape(-1, 2),
+            "pending_imports": np.array(pending_imports, dtype=np.int32).reshape(-1, 3),
+        }
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "key": snapshot_key(commit, file_hashes),
+            "commit": commit,
+            "created_at": time.time(),
+            "files": len(file_path),
+            "nodes": len(node_file),
+            "edges": len(edges),
+        }
+        return cls(arrays, meta)
+
+    def save(self, directory: Path):
+        """Write the arrays and meta.json into a directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            np.save(directory / f"{name}.npy", self.arrays[name])
+        (directory / "meta.json").write_text(json.dumps(self.meta))
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "GraphSnapshot":
+        """
+        Load a snapshot.
+
+        Args:
+            directory: Snapshot directory
+            mmap: Memory-map the arrays instead of reading them
+
+        Raises:
+            ValueError: If the snapshot was written by another format version
+        """
+        meta = json.loads((directory / "meta.json").read_text())
+        if meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {meta.get('version')}")
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in ARRAYS
+        }
+        return cls(arrays, meta)
+
+    def strings(self) -> List[str]:
+        """Decode the string table."""
+        data = self.arrays["string_data"].tobytes()
+        offsets = self.arrays["string_offsets"].tolist()
+        return [
+            data[start:end].decode("utf-8", "surrogatepass")
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def file_hashes(self, strings: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """Get the hash of each file in the snapshot."""
+        strings = strings if strings is not None else self.strings()
+        return {
+            strings[path]: strings[file_hash] if file_hash >= 0 else None
+            for path, file_hash in zip(self.arrays["file_path"].tolist(),
+                                       self.arrays["file_hash"].tolist())
+        }
+
+    def changed_files(self, current_hashes: Dict[str, Optional[str]]) -> List[str]:
+        """Get analyzed files whose current hash differs from the snapshot's."""
+        return sorted(
+            path for path, file_hash in self.file_hashes().items()
+            if file_hash is not None and current_hashes.get(path) != file_hash
+        )
+
+    def restore(self, call_graph: CallGraphAnalyzer, symbol_table: SymbolTable):
+        """Load the snapshot into an empty call graph and symbol table."""
+        # Millions of small objects are created and all of them stay alive;
+        # collecting while they are built would only re-scan them
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._restore(call_graph, symbol_table)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _restore(self, call_graph: CallGraphAnalyzer, symbol_table: SymbolTable):
+        a = self.arrays
+        strings = self.strings()
+        files = [strings[i] for i in a["file_path"].tolist()]
+
+        node_files = a["node_file"].tolist()
+        node_symbols = [strings[i] for i in a["node_symbol"].tolist()]
+        node_kinds = [strings[i] for i in a["node_kind"].tolist()]
+        node_ids = [f"{files[f]}:{s}" for f, s in zip(node_files, node_symbols)]
+        nodes = [
+            CallNode(id=node_id, file=files[f], symbol=symbol, kind=kind,
+                     complexity=complexity, lines=(start, end))
+            for node_id, f, symbol, kind, complexity, (start, end) in zip(
+                node_ids, node_files, node_symbols, node_kinds,
+                a["node_complexity"].tolist(), a["node_lines"].tolist()
+            )
+        ]
+
+        sources = np.repeat(
+            np.arange(len(node_ids), dtype=np.int64), np.diff(a["edge_indptr"])
+        ).tolist()
+        edges = (
+            (node_ids[u], node_ids[v], EDGE_TYPES[t],
+             strings[label] if label >= 0 else None,
+             strings[key] if key >= 0 else None)
+            for u, v, t, label, key in zip(
+                sources, a["edge_target"].tolist(), a["edge_type"].tolist(),
+                a["edge_label"].tolist(), a["edge_key"].tolist()
+            )
+        )
+        pending_calls = [(node_ids[node], strings[name]) for node, name in a["pending_calls"].tolist()]
+        pending_imports = [
+            (files[f], strings[name], strings[key]) for f, name, key in a["pending_imports"].tolist()
+        ]
+        call_graph.restore(nodes, edges, pending_calls, pending_imports)
+
+        # Symbol names per indexed file, from the graph nodes
+        names: Dict[int, List[str]] = {}
+        for f, symbol, kind in zip(node_files, node_symbols, node_kinds):
+            if kind != "file":
+                names.setdefault(f, []).append(symbol)
+        imports_indptr = a["file_imports_indptr"].tolist()
+        imports = a["file_imports"].tolist()
+        for f, language in enumerate(a["file_language"].tolist()):
+            if language >= 0:
+                symbol_table.index_file(
+                    files[f],
+                    strings[language],
+                    names.get(f, []),
+                    [strings[i] for i in imports[imports_indptr[f]:imports_indptr[f + 1]]]
+                )
+
+
+class SnapshotStore:
+    """Directory holding the most recent snapshots, one subdirectory each."""
+
+    def __init__(self, root: str, keep: int = 3):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory for snapshots
+            keep: Number of snapshots to keep
+        """
+        self.root = Path(root)
+        self.keep = keep
+
+    def _entries(self) -> List[Dict]:
+        """Meta of stored snapshots, newest first."""
+        entries = []
+        if self.root.exists():
+            for directory in self.root.iterdir():
+                try:
+                    meta = json.loads((directory / "meta.json").read_text())
+                except (OSError, ValueError):
+                    continue
+                meta["path"] = directory
+                entries.append(meta)
+        entries.sort(key=lambda meta: meta.get("created_at", 0), reverse=True)
+        return entries
+
+    def save(self, snapshot: GraphSnapshot) -> Path:
+        """
+        Store a snapshot unless one with the same key exists.
+
+        The snapshot is written to a temporary directory and renamed into
+        place, so readers never see a partial snapshot.
+
+        Returns:
+            Snapshot directory
+        """
+        directory = self.root / snapshot.key
+        if (directory / "meta.json").exists():
+            return directory
+
+        staging = self.root / f".{snapshot.key}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        snapshot.save(staging)
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            # Written concurrently by another process
+            shutil.rmtree(staging, ignore_errors=True)
+
+        for meta in self._entries()[self.keep:]:
+            shutil.rmtree(meta["path"], ignore_errors=True)
+        return directory
+
+    def latest(self, commit: Optional[str] = None) -> Optional[GraphSnapshot]:
+        """
+        Load the newest snapshot, preferring one taken at the given commit.
+
+        Returns:
+            Snapshot, or None if no readable snapshot exists
+        """
+        entries = self._entries()
+        entries.sort(key=lambda meta: meta.get("commit") != commit)
+        for meta in entries:
+            try:
+                return GraphSnapshot.load(meta["path"])
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable graph snapshot {meta['path']}: {e}")
+        return None
@@ -115,8 +115,8 @@ class CodePlannerMessagingService:
             plan = message.value
             logger.info(f"Processing Plan {plan.id} from topic {message.topic}")
             
-            # Process the plan
-            task_bundle = self.code_planner.process_plan(plan)
+            # Process the plan off the event loop (analysis and RAG lookups block)
+            task_bundle = await asyncio.to_thread(self.code_planner.process_plan, plan)
             
             # Validate the bundle
             if not self.code_planner.validate_task_bundle(task_bundle):
@@ -168,6 +168,9 @@ class CodePlannerMessagingService:
         if self.producer:
             self.producer.close()
         
+        # Stop the analysis worker pool
+        self.code_planner.close()
+        
         logger.info("Code Planner messaging service shut down complete")
     
     def get_metrics(self) -> dict:
@@ -4,19 +4,24 @@ Parallel AST analysis using ProcessPoolExecutor.
 This module provides parallel processing capabilities for analyzing
 multiple files concurrently, significantly improving performance on
 large codebases.
+
+Worker processes build their tree-sitter parsers once, in the pool
+initializer, and receive files in chunked batches to amortize IPC. A
+ParallelAnalyzer can be kept running across calls so the pool stays warm.
 """
 
 import os
 import time
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import Dict, List, Optional, Tuple, Any
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from typing import Dict, List, Mapping, Optional, Tuple, Any
 import multiprocessing as mp
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 
 # Import analyzers at module level for pickling
-from .tree_sitter_analyzer import TreeSitterAnalyzer
+from .tree_sitter_analyzer import get_shared_analyzer
 from .ast_analyzer import FileAnalysis, Symbol
+from .compact_analysis import CompactAnalysisBatch, encode_analyses
 
 
 @dataclass
@@ -27,13 +32,116 @@ class AnalysisTask:
     language: Optional[str] = None
 
 
-@dataclass
 class AnalysisResult:
-    """Result of analyzing a file."""
-    file_path: str
-    analysis: Optional[FileAnalysis]
-    error: Optional[str] = None
-    duration: float = 0.0
+    """
+    Result of analyzing a file.
+    
+    Results from worker processes hold their analysis in the batch's
+    compact encoding and decode it on first access.
+    """
+    
+    __slots__ = ("file_path", "error", "duration", "_analysis", "_encoded")
+    
+    def __init__(self,
+                 file_path: str,
+                 analysis: Optional[FileAnalysis] = None,
+                 error: Optional[str] = None,
+                 duration: float = 0.0,
+                 encoded: Optional[Tuple[CompactAnalysisBatch, int]] = None):
+        self.file_path = file_path
+        self.error = error
+        self.duration = duration
+        self._analysis = analysis
+        self._encoded = encoded
+    
+    @property
+    def analysis(self) -> Optional[FileAnalysis]:
+        """The file's analysis (None if it failed)."""
+        if self._encoded is not None:
+            batch, index = self._encoded
+            self._analysis = batch.decode(index)
+            self._encoded = None
+        return self._analysis
+    
+    @property
+    def succeeded(self) -> bool:
+        """Whether the file was analyzed, without decoding the analysis."""
+        return self._encoded is not None or self._analysis is not None
+    
+    def __repr__(self) -> str:
+        return (
+            f"AnalysisResult(file_path={self.file_path!r}, error={self.error!r}, "
+            f"duration={self.duration:.3f})"
+        )
+
+
+class LazyAnalyses(Mapping[str, FileAnalysis]):
+    """
+    Read-only mapping of file paths to analyses.
+    
+    Holds the analysis results and decodes each file's analysis only
+    when it is looked up.
+    """
+    
+    def __init__(self, results: Dict[str, AnalysisResult]):
+        self._results = results
+    
+    def __getitem__(self, file_path: str) -> FileAnalysis:
+        return self._results[file_path].analysis
+    
+    def __iter__(self):
+        return iter(self._results)
+    
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+@dataclass
+class BatchReport:
+    """Timing of one batch, reported by the worker that ran it."""
+    pid: int
+    files: int
+    duration: float
+    startup_seconds: float
+    nbytes: int = 0  # Encoded size of the batch's analyses
+
+
+@dataclass
+class WorkerStats:
+    """Accumulated throughput of one worker process."""
+    pid: int
+    startup_seconds: float = 0.0
+    batches: int = 0
+    files: int = 0
+    busy_seconds: float = 0.0
+    
+    @property
+    def files_per_sec(self) -> float:
+        """Files analyzed per second of work."""
+        return self.files / self.busy_seconds if self.busy_seconds else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {**asdict(self), "files_per_sec": self.files_per_sec}
+
+
+# Set once per worker process by the pool initializer
+_worker_startup_seconds = 0.0
+
+
+def _init_analysis_worker():
+    """Pool initializer: build the tree-sitter parsers once per worker process."""
+    global _worker_startup_seconds
+    start_time = time.time()
+    get_shared_analyzer()
+    _worker_startup_seconds = time.time() - start_time
+
+
+def _worker_info() -> BatchReport:
+    """Report a worker's pid and startup cost (used to warm up the pool)."""
+    return BatchReport(
+        pid=os.getpid(), files=0, duration=0.0, startup_seconds=_worker_startup_seconds
+    )
 
 
 def analyze_file_worker(task: AnalysisTask) -> AnalysisResult:
@@ -45,8 +153,8 @@ def analyze_file_worker(task: AnalysisTask) -> AnalysisResult:
     start_time = time.time()
     
     try:
-        # Create analyzer in the worker process
-        analyzer = TreeSitterAnalyzer()
+        # Parsers are built once per process and reused for every file
+        analyzer = get_shared_analyzer()
         
         # Detect language if not provided
         language = task.language
@@ -85,36 +193,140 @@ def analyze_file_worker(task: AnalysisTask) -> AnalysisResult:
         )
 
 
+def analyze_batch_worker(
+    tasks: List[AnalysisTask]
+) -> Tuple[BatchReport, CompactAnalysisBatch, List[Tuple[str, int, Optional[str], float]]]:
+    """
+    Worker function analyzing a chunk of files in one round trip.
+    
+    This function runs in a separate process and must be picklable.
+    Analyses are returned in compact columnar form, with one
+    (file_path, position in batch or -1, error, duration) row per task.
+    """
+    start_time = time.time()
+    results = [analyze_file_worker(task) for task in tasks]
+    batch, positions = encode_analyses([result.analysis for result in results])
+    rows = [
+        (result.file_path, position, result.error, result.duration)
+        for result, position in zip(results, positions)
+    ]
+    report = BatchReport(
+        pid=os.getpid(),
+        files=len(tasks),
+        duration=time.time() - start_time,
+        startup_seconds=_worker_startup_seconds,
+        nbytes=batch.nbytes
+    )
+    return report, batch, rows
+
+
 class ParallelAnalyzer:
     """
     Parallel AST analyzer using ProcessPoolExecutor.
     
     Provides significant performance improvements when analyzing
-    multiple files by utilizing all available CPU cores.
+    multiple files by utilizing all available CPU cores. Use it as a
+    context manager for one-off work, or start() it once and keep it
+    running so later calls reuse the warm worker processes.
     """
     
-    def __init__(self, max_workers: Optional[int] = None):
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: Optional[int] = None):
         """
         Initialize parallel analyzer.
         
         Args:
             max_workers: Maximum number of worker processes.
                         If None, uses cpu_count().
+            chunk_size: Files sent to a worker per round trip.
+                        If None, sized from the number of files.
         """
         self.max_workers = max_workers or mp.cpu_count()
+        self.chunk_size = chunk_size
         self._executor = None
+        
+        # Pool and per-worker statistics
+        self.pool_startup_seconds = 0.0
+        self.worker_stats: Dict[int, WorkerStats] = {}
+        self.files_analyzed = 0
+        self.calls = 0
+        self.transfer_bytes = 0
     
     def __enter__(self):
         """Context manager entry."""
-        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
-        return self
+        return self.start()
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
+        self.shutdown()
+    
+    @property
+    def running(self) -> bool:
+        """Whether the worker pool is up."""
+        return self._executor is not None
+    
+    def start(self) -> "ParallelAnalyzer":
+        """Start the worker pool and wait until every worker is initialized."""
+        if self._executor is not None:
+            return self
+        
+        start_time = time.time()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_analysis_worker
+        )
+        
+        # Concurrent pings make the executor spawn all of its workers now
+        pings = [self._executor.submit(_worker_info) for _ in range(self.max_workers)]
+        wait(pings)
+        for ping in pings:
+            try:
+                self._record(ping.result())
+            except Exception:
+                pass
+        
+        self.pool_startup_seconds = time.time() - start_time
+        return self
+    
+    def shutdown(self):
+        """Stop the worker pool."""
         if self._executor:
             self._executor.shutdown(wait=True)
             self._executor = None
     
+    def _record(self, report: BatchReport):
+        """Add a worker's batch report to its statistics."""
+        stats = self.worker_stats.get(report.pid)
+        if stats is None:
+            stats = self.worker_stats[report.pid] = WorkerStats(
+                pid=report.pid, startup_seconds=report.startup_seconds
+            )
+        if report.files:
+            stats.batches += 1
+            stats.files += report.files
+            stats.busy_seconds += report.duration
+            self.transfer_bytes += report.nbytes
+    
+    def _chunk_size_for(self, num_files: int) -> int:
+        """Files per batch: about four batches per worker, at most 32 files each."""
+        if self.chunk_size:
+            return self.chunk_size
+        return max(1, min(32, num_files // (self.max_workers * 4)))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool startup cost and per-worker throughput."""
+        return {
+            "running": self.running,
+            "max_workers": self.max_workers,
+            "pool_startup_seconds": self.pool_startup_seconds,
+            "calls": self.calls,
+            "files_analyzed": self.files_analyzed,
+            "transfer_bytes": self.transfer_bytes,
+            "workers": [
+                stats.to_dict()
+                for stats in sorted(self.worker_stats.values(), key=lambda s: s.pid)
+            ]
+        }
+    
     def analyze_files(
         self, 
         file_paths: List[str], 
@@ -133,7 +345,7 @@ class ParallelAnalyzer:
             Dictionary mapping file paths to analysis results
         """
         if not self._executor:
-            raise RuntimeError("ParallelAnalyzer must be used as context manager")
+            raise RuntimeError("ParallelAnalyzer must be started or used as context manager")
         
         # Create tasks
         tasks = [
@@ -141,32 +353,43 @@ class ParallelAnalyzer:
             for fp in file_paths
         ]
         
-        # Submit tasks
-        future_to_task = {
-            self._executor.submit(analyze_file_worker, task): task
-            for task in tasks
+        # Submit tasks in chunks, one round trip per chunk
+        chunk_size = self._chunk_size_for(len(tasks))
+        future_to_batch = {
+            self._executor.submit(analyze_batch_worker, tasks[i:i + chunk_size]): tasks[i:i + chunk_size]
+            for i in range(0, len(tasks), chunk_size)
         }
         
         # Collect results
         results = {}
         completed = 0
         
-        for future in as_completed(future_to_task):
-            task = future_to_task[future]
+        for future in as_completed(future_to_batch):
+            batch = future_to_batch[future]
             try:
-                result = future.result()
-                results[result.file_path] = result
+                report, encoded, rows = future.result()
+                self._record(report)
+                for file_path, position, error, duration in rows:
+                    results[file_path] = AnalysisResult(
+                        file_path=file_path,
+                        error=error,
+                        duration=duration,
+                        encoded=(encoded, position) if position >= 0 else None
+                    )
             except Exception as e:
-                results[task.file_path] = AnalysisResult(
-                    file_path=task.file_path,
-                    analysis=None,
-                    error=f"Worker exception: {str(e)}"
-                )
+                for task in batch:
+                    results[task.file_path] = AnalysisResult(
+                        file_path=task.file_path,
+                        analysis=None,
+                        error=f"Worker exception: {str(e)}"
+                    )
             
-            completed += 1
+            completed += len(batch)
             if progress_callback:
                 progress_callback(completed, len(tasks))
         
+        self.calls += 1
+        self.files_analyzed += len(tasks)
         return results
     
     def analyze_files_batch(
@@ -187,7 +410,7 @@ class ParallelAnalyzer:
             Dictionary mapping file paths to analysis results
         """
         if not self._executor:
-            raise RuntimeError("ParallelAnalyzer must be used as context manager")
+            raise RuntimeError("ParallelAnalyzer must be started or used as context manager")
         
         all_results = {}
         
@@ -227,17 +450,30 @@ class ParallelASTAnalyzer:
     parallel processing capabilities.
     """
     
-    def __init__(self, repo_path: str, max_workers: Optional[int] = None):
+    def __init__(self,
+                 repo_path: str,
+                 max_workers: Optional[int] = None,
+                 pool: Optional[ParallelAnalyzer] = None):
+        """
+        Initialize the analyzer.
+        
+        Args:
+            repo_path: Repository root path
+            max_workers: Worker processes for a per-call pool
+            pool: Long-lived pool to use instead of a per-call one
+        """
         self.repo_path = Path(repo_path)
         self.max_workers = max_workers
-        self._results_cache: Dict[str, FileAnalysis] = {}
+        self.pool = pool
+        # Results keep their compact encoding until an analysis is read
+        self._results_cache: Dict[str, AnalysisResult] = {}
     
     def analyze_directory(
         self,
         directory: str = ".",
         extensions: Optional[List[str]] = None,
         exclude_patterns: Optional[List[str]] = None
-    ) -> Dict[str, FileAnalysis]:
+    ) -> Mapping[str, FileAnalysis]:
         """
         Analyze all files in a directory in parallel.
         
@@ -281,7 +517,7 @@ class ParallelASTAnalyzer:
         self,
         file_paths: List[str],
         show_progress: bool = True
-    ) -> Dict[str, FileAnalysis]:
+    ) -> Mapping[str, FileAnalysis]:
         """
         Analyze multiple files in parallel.
         
@@ -290,14 +526,14 @@ class ParallelASTAnalyzer:
             show_progress: Whether to show progress
             
         Returns:
-            Dictionary mapping file paths to FileAnalysis objects
+            Mapping of file paths to FileAnalysis objects, decoded on access
         """
         # Filter out already cached files
         to_analyze = [fp for fp in file_paths if fp not in self._results_cache]
         
         if not to_analyze:
             # All files cached
-            return {fp: self._results_cache[fp] for fp in file_paths}
+            return LazyAnalyses({fp: self._results_cache[fp] for fp in file_paths})
         
         print(f"Analyzing {len(to_analyze)} files in parallel...")
         start_time = time.time()
@@ -308,13 +544,20 @@ class ParallelASTAnalyzer:
                 pct = (completed / total) * 100
                 print(f"  Progress: {completed}/{total} ({pct:.1f}%)", end='\r')
         
-        # Use parallel analyzer
-        with ParallelAnalyzer(max_workers=self.max_workers) as analyzer:
-            results = analyzer.analyze_files(
+        # Use the long-lived pool if there is one, else a pool for this call
+        if self.pool is not None:
+            results = self.pool.start().analyze_files(
                 to_analyze,
                 str(self.repo_path),
                 progress_callback=progress if show_progress else None
             )
+        else:
+            with ParallelAnalyzer(max_workers=self.max_workers) as analyzer:
+                results = analyzer.analyze_files(
+                    to_analyze,
+                    str(self.repo_path),
+                    progress_callback=progress if show_progress else None
+                )
         
         if show_progress:
             print()  # New line after progress
@@ -322,22 +565,20 @@ class ParallelASTAnalyzer:
         # Process results
         successful = 0
         failed = 0
-        analyses = {}
         
         for file_path, result in results.items():
-            if result.analysis:
-                analyses[file_path] = result.analysis
-                self._results_cache[file_path] = result.analysis
+            if result.succeeded:
+                self._results_cache[file_path] = result
                 successful += 1
             else:
                 failed += 1
                 if result.error:
                     print(f"  Failed: {file_path} - {result.error}")
         
-        # Add cached results
-        for fp in file_paths:
-            if fp in self._results_cache and fp not in analyses:
-                analyses[fp] = self._results_cache[fp]
+        # New and cached results
+        analyses = LazyAnalyses({
+            fp: self._results_cache[fp] for fp in file_paths if fp in self._results_cache
+        })
         
         duration = time.time() - start_time
         print(f"Analyzed {successful} files in {duration:.2f}s ({failed} failed)")
@@ -354,11 +595,11 @@ class ParallelASTAnalyzer:
         return {
             "cached_files": len(self._results_cache),
             "total_symbols": sum(
-                len(analysis.symbols) 
-                for analysis in self._results_cache.values()
+                len(result.analysis.symbols) 
+                for result in self._results_cache.values()
             ),
             "total_complexity": sum(
-                analysis.complexity 
-                for analysis in self._results_cache.values()
+                result.analysis.complexity 
+                for result in self._results_cache.values()
             )
         }
\ No newline at end of file
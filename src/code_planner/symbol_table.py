@@ -0,0 +1,282 @@
+"""
+Global symbol table for call graph construction.
+
+Indexes the symbols and modules of analyzed files so that call sites and
+imports resolve with dictionary lookups instead of scans over every
+analyzed file:
+
+- symbol name -> definitions (by full name and by last dotted component)
+- qualified name (module.Class.method) -> symbol id
+- module name -> file, for Python dotted modules and JS/TS module paths
+
+Entries are kept per file, so re-analyzing or removing a file only touches
+that file's entries.
+"""
+
+import posixpath
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .ast_analyzer import FileAnalysis
+
+PYTHON_EXTENSIONS = (".py", ".pyi")
+JS_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")
+
+
+def python_module_names(path: str) -> List[str]:
+    """
+    Dotted names a Python file can be imported as, longest first.
+
+    "src/pkg/mod.py" gives ["src.pkg.mod", "pkg.mod", "mod"], so imports
+    resolve whichever directory is the source root. Packages are named
+    after the directory of their __init__.py.
+    """
+    parts = posixpath.splitext(path)[0].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return [".".join(parts[i:]) for i in range(len(parts))] or [posixpath.splitext(path)[0]]
+
+
+def js_module_names(path: str) -> List[str]:
+    """
+    Module paths a JS/TS file can be imported as.
+
+    "src/utils/index.js" gives ["src/utils/index", "src/utils"].
+    """
+    stem = posixpath.splitext(path)[0]
+    names = [stem]
+    if posixpath.basename(stem) == "index":
+        names.append(posixpath.dirname(stem))
+    return names
+
+
+def _last_component(module: str) -> str:
+    """Last component of a dotted or slash-separated module name."""
+    return module.replace("/", ".").rsplit(".", 1)[-1]
+
+
+class SymbolTable:
+    """Incrementally maintained index of symbols and modules."""
+
+    def __init__(self):
+        # name or last dotted component -> symbol ids (dict as ordered set)
+        self._by_name: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # file -> {name or last dotted component -> symbol id}
+        self._local: Dict[str, Dict[str, str]] = {}
+        # module.qualified.name -> symbol id
+        self._qualified: Dict[str, str] = {}
+        # module name -> files (dict as ordered set)
+        self._modules: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # file -> (language, import strings, qualified names, module names)
+        self._files: Dict[str, tuple] = {}
+        # file -> files it imports; cleared whenever the module index changes
+        self._resolved_imports: Dict[str, Set[str]] = {}
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._files
+
+    def add_file(self, analysis: FileAnalysis):
+        """Index the symbols and module names of a file, replacing old entries."""
+        self.index_file(
+            analysis.path,
+            analysis.language,
+            [symbol.name for symbol in analysis.symbols],
+            analysis.imports
+        )
+
+    def index_file(self, path: str, language: str, symbol_names: List[str], imports: List[str]):
+        """
+        Index a file from its symbol names and imports, replacing old entries.
+
+        Args:
+            path: Repository-relative file path
+            language: Language of the file
+            symbol_names: Names of the symbols the file defines
+            imports: Import strings of the file
+        """
+        self.remove_file(path)
+
+        if language == "python" or path.endswith(PYTHON_EXTENSIONS):
+            modules = python_module_names(path)
+        elif language == "javascript" or path.endswith(JS_EXTENSIONS):
+            modules = js_module_names(path)
+        else:
+            modules = [posixpath.splitext(path)[0]]
+
+        local: Dict[str, str] = {}
+        qualified = []
+        for name in symbol_names:
+            symbol_id = f"{path}:{name}"
+            local[name] = symbol_id
+            self._by_name[name][symbol_id] = None
+            qualified_name = f"{modules[0]}.{name}"
+            self._qualified[qualified_name] = symbol_id
+            qualified.append(qualified_name)
+        # Methods ("Class.method") are also found by their bare name
+        for name in symbol_names:
+            if "." in name:
+                short = name.rsplit(".", 1)[1]
+                if short not in local:
+                    local[short] = f"{path}:{name}"
+                    self._by_name[short][local[short]] = None
+
+        for module in modules:
+            self._modules[module][path] = None
+
+        self._local[path] = local
+        self._files[path] = (language, list(imports), qualified, modules)
+        self._resolved_imports.clear()
+
+    def files(self) -> Iterator[Tuple[str, str, List[str]]]:
+        """Iterate over (path, language, imports) of the indexed files."""
+        for path, (language, imports, _, _) in self._files.items():
+            yield path, language, imports
+
+    def remove_file(self, file_path: str):
+        """Drop all entries of a file."""
+        entry = self._files.pop(file_path, None)
+        if entry is None:
+            return
+        _, _, qualified, modules = entry
+
+        for name, symbol_id in self._local.pop(file_path).items():
+            ids = self._by_name.get(name)
+            if ids is not None:
+                ids.pop(symbol_id, None)
+                if not ids:
+                    del self._by_name[name]
+        for qualified_name in qualified:
+            if self._qualified.get(qualified_name, "").startswith(f"{file_path}:"):
+                del self._qualified[qualified_name]
+        for module in modules:
+            files = self._modules.get(module)
+            if files is not None:
+                files.pop(file_path, None)
+                if not files:
+                    del self._modules[module]
+        self._resolved_imports.clear()
+
+    def resolve_import(self, import_name: str, from_file: str) -> Optional[str]:
+        """
+        Resolve an import to the file that defines the module.
+
+        Args:
+            import_name: Python module ("pkg.mod", ".sibling", "..") or JS
+                specifier ("./utils", "../lib/index.js", "src/api")
+            from_file: Repository-relative path of the importing file
+
+        Returns:
+            Path of an indexed file, or None for external modules
+        """
+        if not import_name:
+            return None
+        module, exact = self._target_module(import_name, from_file)
+        return self._pick(module, from_file, exact)
+
+    def import_key(self, import_name: str, from_file: str) -> str:
+        """
+        Short key of the module an import refers to.
+
+        An import can only start resolving when a file with the same key
+        (see module_keys) is indexed, so unresolved imports are grouped by it.
+        """
+        return _last_component(self._target_module(import_name, from_file)[0])
+
+    def module_keys(self, file_path: str) -> Set[str]:
+        """Short keys of the module names of an indexed file."""
+        entry = self._files.get(file_path)
+        return {_last_component(module) for module in entry[3]} if entry else set()
+
+    def names(self, file_path: str) -> List[str]:
+        """Names (full and last dotted component) defined by an indexed file."""
+        return list(self._local.get(file_path, ()))
+
+    @staticmethod
+    def _target_module(import_name: str, from_file: str) -> Tuple[str, bool]:
+        """Get the module name an import refers to and whether it is repository-rooted."""
+        directory = posixpath.dirname(from_file)
+        if from_file.endswith(PYTHON_EXTENSIONS):
+            if import_name.startswith("."):
+                # Relative import: each dot beyond the first goes up a package
+                module = import_name.lstrip(".")
+                level = len(import_name) - len(module)
+                base = directory
+                for _ in range(level - 1):
+                    base = posixpath.dirname(base)
+                parts = [p for p in base.split("/") if p] + [p for p in module.split(".") if p]
+                return ".".join(parts), True
+            return import_name, False
+
+        key = import_name
+        if import_name.startswith("."):
+            key = posixpath.normpath(posixpath.join(directory, import_name))
+        stem, ext = posixpath.splitext(key)
+        if ext in JS_EXTENSIONS or ext in PYTHON_EXTENSIONS:
+            key = stem
+        return key, False
+
+    def _pick(self, module: str, from_file: str, exact: bool = False) -> Optional[str]:
+        """Choose among the files registered under a module name."""
+        files = self._modules.get(module)
+        if not files:
+            return None
+        if exact:
+            # Only files whose full path spells the module
+            files = [f for f in files if self._files[f][3][0] == module]
+            if not files:
+                return None
+        if len(files) == 1:
+            return next(iter(files))
+        # Ambiguous suffix: prefer the file closest to the importer
+        return max(files, key=lambda f: len(posixpath.commonpath([f, from_file])))
+
+    def imported_files(self, file_path: str) -> Set[str]:
+        """Indexed files imported by a file."""
+        resolved = self._resolved_imports.get(file_path)
+        if resolved is None:
+            entry = self._files.get(file_path)
+            resolved = set()
+            if entry is not None:
+                for import_name in entry[1]:
+                    target = self.resolve_import(import_name, file_path)
+                    if target and target != file_path:
+                        resolved.add(target)
+            self._resolved_imports[file_path] = resolved
+        return resolved
+
+    def find_symbol(self, name: str, from_file: str) -> Optional[str]:
+        """
+        Resolve a called name to a symbol id ("file:symbol").
+
+        Definitions in the calling file win, then definitions in files it
+        imports, then the first definition indexed anywhere.
+
+        Args:
+            name: Called name ("helper", "Class.method" or "pkg.mod.func")
+            from_file: Repository-relative path of the calling file
+
+        Returns:
+            Symbol id, or None if no indexed file defines the name
+        """
+        local = self._local.get(from_file)
+        if local and name in local:
+            return local[name]
+
+        ids = self._by_name.get(name)
+        if not ids:
+            return self._qualified.get(name)
+
+        for imported in self.imported_files(from_file):
+            symbol_id = self._local[imported].get(name)
+            if symbol_id is not None:
+                return symbol_id
+        return next(iter(ids))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index sizes."""
+        return {
+            "files": len(self._files),
+            "symbols": len(self._qualified),
+            "names": len(self._by_name),
+            "modules": len(self._modules),
+        }
@@ -10,6 +10,9 @@ import tree_sitter_python
 import tree_sitter_javascript
 import tree_sitter_java
 import tree_sitter_go
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
@@ -60,9 +63,15 @@ LANGUAGE_CONFIGS = {
 class TreeSitterAnalyzer:
     """AST analyzer using tree-sitter for multi-language support."""
     
-    def __init__(self):
+    def __init__(self, parse_cache_size: int = 256):
         self.parsers = {}
         self._initialize_parsers()
+        
+        # Recent parse trees keyed by content hash, so the RAG chunker and
+        # the code planner parse each file only once
+        self.parse_cache_size = parse_cache_size
+        self._parse_cache: "OrderedDict[Tuple[str, str], tree_sitter.Tree]" = OrderedDict()
+        self._parse_lock = threading.Lock()
     
     def _initialize_parsers(self):
         """Initialize tree-sitter parsers for each language."""
@@ -72,6 +81,35 @@ class TreeSitterAnalyzer:
             parser = tree_sitter.Parser(language)
             self.parsers[lang] = parser
     
+    def parse(self, content: bytes, language: str) -> Optional["tree_sitter.Tree"]:
+        """
+        Parse source code, reusing the tree of identical recent content.
+        
+        Args:
+            content: Source code bytes
+            language: Language name from LANGUAGE_CONFIGS
+            
+        Returns:
+            Parse tree, or None if the language is not supported
+        """
+        parser = self.parsers.get(language)
+        if not parser:
+            return None
+        
+        key = (language, hashlib.sha1(content).hexdigest())
+        with self._parse_lock:
+            tree = self._parse_cache.get(key)
+            if tree is not None:
+                self._parse_cache.move_to_end(key)
+                return tree
+            
+            # Parsers are not thread-safe, parse under the lock
+            tree = parser.parse(content)
+            self._parse_cache[key] = tree
+            if len(self._parse_cache) > self.parse_cache_size:
+                self._parse_cache.popitem(last=False)
+        return tree
+    
     def detect_language(self, file_path: str) -> Optional[str]:
         """Detect language from file extension."""
         ext = Path(file_path).suffix.lower()
@@ -96,12 +134,10 @@ class TreeSitterAnalyzer:
                 content = f.read()
             
             # Parse with tree-sitter
-            parser = self.parsers.get(language)
-            if not parser:
+            tree = self.parse(content, language)
+            if tree is None:
                 return None
             
-            tree = parser.parse(content)
-            
             # Extract symbols
             symbols = self._extract_symbols(tree, content, str(file_path), language)
             imports = self._extract_imports(tree, content, language)
@@ -280,12 +316,10 @@ class TreeSitterAnalyzer:
                 import_text = content[node.start_byte:node.end_byte].decode('utf-8')
                 
                 if language == "python":
-                    # Handle "import x" and "from x import y"
+                    # Handle "import x.y" and "from .x import y" (full module path)
                     parts = import_text.split()
-                    if parts[0] == "import":
-                        imports.append(parts[1].split('.')[0])
-                    elif parts[0] == "from" and len(parts) > 1:
-                        imports.append(parts[1].split('.')[0])
+                    if parts[0] in ("import", "from") and len(parts) > 1:
+                        imports.append(parts[1].rstrip(','))
                 
                 elif language == "javascript":
                     # Handle import x from 'module'
@@ -320,4 +354,17 @@ class TreeSitterAnalyzer:
             if not imp.startswith('.') and not imp.startswith('_'):
                 # Get top-level package
                 deps.add(imp.split('.')[0] if '.' in imp else imp)
-        return deps
\ No newline at end of file
+        return deps
+
+
+_shared_analyzer: Optional[TreeSitterAnalyzer] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_analyzer() -> TreeSitterAnalyzer:
+    """Get the process-wide analyzer whose parse cache all callers share."""
+    global _shared_analyzer
+    with _shared_lock:
+        if _shared_analyzer is None:
+            _shared_analyzer = TreeSitterAnalyzer()
+        return _shared_analyzer
\ No newline at end of file
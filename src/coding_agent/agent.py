@@ -97,6 +97,12 @@ class CodingAgent:
             
             result.branch_name = branch_name
             
+            # Scope RAG lookups to the commit the task is based on; until it
+            # is indexed (index_git_ref), lookups use the working-tree index
+            for rag_client in (self.rag_client, getattr(self.context_gatherer, "rag_client", None)):
+                if rag_client is not None:
+                    rag_client.default_ref = task.base_commit_sha or None
+            
             # 2. Gather context
             logger.info("Gathering context...")
             context = self.context_gatherer.gather_context(task)
@@ -463,7 +469,15 @@ Example:
             try:
                 results = self.rag_client.find_symbol(symbol_name)
                 if results:
-                    return self._format_search_result(results[0])
+                    # Symbol index hits are definitions; show every equally
+                    # good one (same name defined in several files)
+                    best = [
+                        r for r in results[:3]
+                        if r.get("match_type") == "symbol" and r.get("score") == results[0].get("score")
+                    ]
+                    return "\n\n".join(
+                        self._format_search_result(r) for r in best or results[:1]
+                    )
             except Exception as e:
                 logger.error(f"Symbol search failed: {e}")
         
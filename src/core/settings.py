@@ -180,6 +180,10 @@ class WebhookSettings(BaseSettings):
         default_factory=dict,
         description="Map webhook sources to project directories"
     )
+    watch_projects: bool = Field(
+        False,
+        description="Re-index mapped projects as their files change"
+    )
     
     class Config:
         env_prefix = "AGENT_WEBHOOK_"
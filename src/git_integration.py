@@ -3,8 +3,19 @@ Git integration utilities for the agent system.
 """
 
 import subprocess
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class TreeEntry:
+    """A blob in a git tree."""
+    path: str
+    sha: str
+    size: int
+    mode: str = "100644"
 
 
 class GitAdapter:
@@ -42,11 +53,17 @@ class GitAdapter:
         except subprocess.CalledProcessError:
             return "main"
     
-    def get_modified_files(self) -> List[str]:
-        """Get list of modified files."""
+    def get_modified_files(self, ref: Optional[str] = None) -> List[str]:
+        """
+        Get list of modified files.
+        
+        Args:
+            ref: Compare the working tree with this commit (including staged
+                changes) instead of with the index
+        """
         try:
             result = subprocess.run(
-                ["git", "diff", "--name-only"],
+                ["git", "diff", "--name-only"] + ([ref] if ref else []),
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
@@ -57,6 +74,109 @@ class GitAdapter:
         except subprocess.CalledProcessError:
             return []
     
+    def resolve_ref(self, ref: str = "HEAD") -> Optional[str]:
+        """Resolve a ref (branch, tag, SHA) to a commit SHA."""
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "--verify", f"{ref}^{{commit}}"],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            return result.stdout.strip()
+        except (subprocess.CalledProcessError, OSError):
+            return None
+    
+    def list_files(self, ref: str = "HEAD") -> List[TreeEntry]:
+        """
+        List the blobs in a commit's tree without a checkout.
+        
+        Submodules and symlinks are skipped.
+        
+        Args:
+            ref: Commit, branch or tag
+            
+        Returns:
+            Tree entries with path, blob SHA and size
+        """
+        try:
+            result = subprocess.run(
+                ["git", "ls-tree", "-r", "-z", "--long", "--full-tree", ref],
+                cwd=self.repo_path,
+                capture_output=True,
+                check=True
+            )
+        except subprocess.CalledProcessError:
+            return []
+        
+        entries = []
+        for record in result.stdout.split(b"\0"):
+            if not record:
+                continue
+            # "<mode> <type> <sha> <size>\t<path>"
+            info, path = record.split(b"\t", 1)
+            mode, obj_type, sha, size = info.split()
+            if obj_type != b"blob" or mode == b"120000":
+                continue
+            entries.append(TreeEntry(
+                path=path.decode("utf-8", errors="surrogateescape"),
+                sha=sha.decode(),
+                size=int(size),
+                mode=mode.decode()
+            ))
+        return entries
+    
+    def iter_blobs(self, shas: Iterable[str]) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """
+        Stream blob contents through a single ``git cat-file --batch``.
+        
+        Args:
+            shas: Blob SHAs to read
+            
+        Yields:
+            (sha, content) pairs in request order; content is None for
+            missing objects
+        """
+        process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        
+        shas = list(shas)
+        
+        def feed():
+            # Written from a thread so large requests cannot deadlock on pipes
+            try:
+                for sha in shas:
+                    process.stdin.write(f"{sha}\n".encode())
+                process.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+        
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        
+        try:
+            for sha in shas:
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    # "<sha> missing"
+                    yield sha, None
+                    continue
+                size = int(header[2])
+                content = process.stdout.read(size)
+                process.stdout.read(1)  # Trailing newline
+                yield sha, content
+        finally:
+            process.stdout.close()
+            process.kill()
+            process.wait()
+            writer.join()
+    
     def get_file_content(self, file_path: str, commit: Optional[str] = None) -> Optional[str]:
         """Get file content at specific commit."""
         try:
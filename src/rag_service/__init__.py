@@ -7,5 +7,6 @@ capabilities for all agents in the system.
 
 from .service import RAGService
 from .client import RAGClient
+from .async_client import AsyncRAGClient
 
-__all__ = ["RAGService", "RAGClient"]
\ No newline at end of file
+__all__ = ["RAGService", "RAGClient", "AsyncRAGClient"]
\ No newline at end of file
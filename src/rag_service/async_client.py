@@ -0,0 +1,183 @@
+"""
+Asyncio client for the RAG service.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .service import RAGService
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRAGClient:
+    """
+    Awaitable interface to the RAG service for async services.
+
+    Query embeddings are requested through the embedding backend's async API and
+    vector/keyword store access runs on a thread pool, so searches from
+    many coroutines overlap instead of blocking the event loop. Results
+    match RAGClient's.
+    """
+
+    def __init__(self,
+                 service: Optional[RAGService] = None,
+                 max_workers: int = 8,
+                 default_ref: Optional[str] = None):
+        """
+        Initialize the async RAG client.
+
+        Args:
+            service: RAG service instance (creates default if None)
+            max_workers: Threads for store access and indexing
+            default_ref: Git ref searches are scoped to by default
+        """
+        if service is None:
+            # Create default service with persistence in .rag directory
+            persist_dir = Path(".rag")
+            persist_dir.mkdir(exist_ok=True)
+            service = RAGService(persist_directory=str(persist_dir))
+
+        self.service = service
+        self.default_ref = default_ref
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="async-rag"
+        )
+
+    async def _run(self, fn, *args, **kwargs):
+        """Run a blocking service call on the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    async def _search(self,
+                      query: str,
+                      k: int,
+                      filters: Optional[Dict[str, Any]],
+                      ref: Optional[str]):
+        """Embed the query on the event loop, then search on the pool."""
+        ref = ref or self.default_ref
+        cached = await self._run(self.service.cached_search_code, query, k, filters, ref)
+        if cached is not None:
+            return cached
+
+        query_embedding = await self.service.embedding_service.embed_text_async(query)
+        return await self._run(
+            self.service.search_code,
+            query,
+            k=k,
+            filters=filters,
+            ref=ref,
+            query_embedding=query_embedding
+        )
+
+    async def search(self,
+                     query: str,
+                     k: int = 10,
+                     filters: Optional[Dict[str, Any]] = None,
+                     ref: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search for code.
+
+        Args:
+            query: Search query
+            k: Number of results
+            filters: Optional filters
+            ref: Git ref to search (defaults to default_ref)
+
+        Returns:
+            List of search results as dictionaries
+        """
+        results = await self._search(query, k, filters, ref)
+        return [result.to_dict() for result in results]
+
+    async def get_context(self,
+                          query: str,
+                          k: int = 10,
+                          max_tokens: int = 3000,
+                          ref: Optional[str] = None) -> str:
+        """
+        Get formatted context for LLM prompts.
+
+        Args:
+            query: Context query
+            k: Number of chunks to retrieve
+            max_tokens: Maximum tokens in context
+            ref: Git ref to search (defaults to default_ref)
+
+        Returns:
+            Formatted context string
+        """
+        results = await self._search(query, k, None, ref)
+        packed = await self._run(self.service.context_packer.pack, results, max_tokens)
+
+        if not packed.candidates:
+            return "No relevant context found."
+
+        return packed.text
+
+    async def find_symbol(self,
+                          symbol_name: str,
+                          symbol_type: Optional[str] = None,
+                          prefix: bool = False,
+                          ref: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find a specific symbol.
+
+        Args:
+            symbol_name: Name of the symbol, optionally qualified (Class.method)
+            symbol_type: Type of symbol (function, class, etc)
+            prefix: Also match symbols starting with symbol_name
+            ref: Git ref to search (defaults to default_ref)
+
+        Returns:
+            List of search results
+        """
+        results = await self._run(
+            self.service.find_symbol,
+            symbol_name,
+            symbol_type,
+            prefix=prefix,
+            ref=ref or self.default_ref
+        )
+        return [result.to_dict() for result in results]
+
+    async def index_file(self, file_path: str) -> int:
+        """
+        Index a single file.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Number of chunks indexed
+        """
+        return await self._run(self.service.index_file, file_path)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        stats = await self._run(self.service.get_stats)
+        return {
+            "total_chunks": stats.total_chunks,
+            "total_files": stats.total_files,
+            "total_embeddings": stats.total_embeddings,
+            "languages": stats.languages,
+            "chunk_types": stats.chunk_types,
+            "cache_stats": stats.cache_stats
+        }
+
+    def is_available(self) -> bool:
+        """Check if RAG service is available."""
+        return self.service.embedding_service.enabled
+
+    async def close(self):
+        """Wait for in-flight calls and release the thread pool."""
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
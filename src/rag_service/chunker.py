@@ -2,6 +2,7 @@
 Code chunking strategies for the RAG service.
 """
 
+import bisect
 import re
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
@@ -13,20 +14,79 @@ from .models import CodeChunk, ChunkType
 logger = logging.getLogger(__name__)
 
 
+# Tree-sitter parsers ship with the code planner; they are imported lazily
+# (and optionally) so the RAG service works without them.
+TREE_SITTER_AVAILABLE: Optional[bool] = None  # Resolved on first use
+_tree_sitter_analyzer = None
+
+
+def get_tree_sitter_analyzer():
+    """Get the shared TreeSitterAnalyzer, or None if tree-sitter is unavailable."""
+    global TREE_SITTER_AVAILABLE, _tree_sitter_analyzer
+    if TREE_SITTER_AVAILABLE is None:
+        try:
+            from ..code_planner.tree_sitter_analyzer import get_shared_analyzer
+            _tree_sitter_analyzer = get_shared_analyzer()
+            TREE_SITTER_AVAILABLE = True
+        except Exception as e:
+            logger.info(f"Tree-sitter chunking unavailable, using regex chunking: {e}")
+            TREE_SITTER_AVAILABLE = False
+    return _tree_sitter_analyzer
+
+
+# Definition node types used for tree-sitter chunking
+TREE_SITTER_DEFINITIONS = {
+    "python": {
+        "class": {"class_definition"},
+        "function": {"function_definition"},
+        "wrappers": {"decorated_definition"},
+    },
+    "javascript": {
+        "class": {"class_declaration"},
+        "function": {"function_declaration", "generator_function_declaration", "method_definition"},
+        "wrappers": {"export_statement"},
+        "variables": {"lexical_declaration", "variable_declaration"},
+    },
+    "java": {
+        "class": {"class_declaration", "interface_declaration", "enum_declaration"},
+        "function": {"method_declaration", "constructor_declaration"},
+    },
+    "go": {
+        "class": {"type_declaration"},
+        "function": {"function_declaration", "method_declaration"},
+    },
+}
+
+_FUNCTION_VALUE_TYPES = {"arrow_function", "function_expression", "function"}
+
+
+@dataclass
+class _Unit:
+    """A line span emitted by the tree-sitter chunker."""
+    start_line: int
+    end_line: int
+    chunk_type: ChunkType
+    name: Optional[str] = None
+    parent: Optional[str] = None
+    is_definition: bool = True
+    mergeable: bool = True
+
+
 class CodeChunker:
     """
     Chunks code files into semantic units for indexing.
     
     Supports multiple strategies:
-    - Function/class level chunking
+    - AST-based chunking with tree-sitter (python, javascript, java, go)
+    - Function/class level chunking with regexes
     - Fixed-size windowing
-    - AST-based chunking (future)
     """
     
     def __init__(self, 
                  chunk_size: int = 1500,
                  chunk_overlap: int = 200,
-                 min_chunk_size: int = 100):
+                 min_chunk_size: int = 100,
+                 strategy: str = "auto"):
         """
         Initialize the chunker.
         
@@ -34,10 +94,15 @@ class CodeChunker:
             chunk_size: Target size for chunks in characters
             chunk_overlap: Overlap between chunks
             min_chunk_size: Minimum size for a chunk
+            strategy: "auto" (tree-sitter where supported), "tree_sitter" or "regex"
         """
+        if strategy not in ("auto", "tree_sitter", "regex"):
+            raise ValueError(f"Unknown chunking strategy: {strategy}")
+        
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.min_chunk_size = min_chunk_size
+        self.strategy = strategy
         
         # Language-specific patterns
         self.language_patterns = {
@@ -79,8 +144,12 @@ class CodeChunker:
         if not language:
             language = self._detect_language(file_path)
         
-        # Try semantic chunking first
-        chunks = self._semantic_chunk(content, file_path, language)
+        # Prefer exact AST boundaries, then regex boundaries
+        chunks = None
+        if self.strategy != "regex":
+            chunks = self._tree_sitter_chunk(content, file_path, language)
+        if chunks is None:
+            chunks = self._semantic_chunk(content, file_path, language)
         
         # Fall back to sliding window if no semantic chunks
         if not chunks:
@@ -105,11 +174,12 @@ class CodeChunker:
         
         # Find all semantic boundaries
         boundaries = []
+        newline_offsets = [m.start() for m in re.finditer('\n', content)]
         
         # Find functions and classes
         for pattern_name, pattern in patterns.items():
             for match in pattern.finditer(content):
-                line_no = content[:match.start()].count('\n') + 1
+                line_no = bisect.bisect_left(newline_offsets, match.start()) + 1
                 
                 # Extract symbol name
                 groups = match.groups()
@@ -180,6 +250,267 @@ class CodeChunker:
         
         return chunks
     
+    def _tree_sitter_chunk(self,
+                           content: str,
+                           file_path: str,
+                           language: str) -> Optional[List[CodeChunk]]:
+        """
+        Chunk along tree-sitter definitions.
+        
+        Classes that fit in a chunk are kept whole; larger classes are
+        emitted as a header chunk plus one chunk per member. Oversized
+        definitions are split on line boundaries and runs of small sibling
+        definitions are merged.
+        
+        Returns:
+            Chunks, or None if tree-sitter does not support the language
+        """
+        if language not in TREE_SITTER_DEFINITIONS:
+            return None
+        
+        analyzer = get_tree_sitter_analyzer()
+        if analyzer is None:
+            return None
+        
+        source = content.encode('utf-8')
+        tree = analyzer.parse(source, language)
+        if tree is None:
+            return None
+        
+        lines = content.splitlines()
+        units: List[_Unit] = []
+        split_classes: List[_Unit] = []
+        self._collect_units(tree.root_node, source, language, None, units, split_classes)
+        units.extend(self._gap_units(units, split_classes, len(lines)))
+        units.sort(key=lambda u: u.start_line)
+        
+        chunks = []
+        pending: List[_Unit] = []
+        pending_size = 0
+        
+        for unit in units:
+            size = self._span_size(lines, unit.start_line, unit.end_line)
+            
+            if size < self.min_chunk_size and not unit.is_definition:
+                continue  # Blank lines or stray module-level code
+            
+            if size < self.min_chunk_size and unit.mergeable:
+                # Merge runs of small sibling definitions
+                if pending and (pending[0].parent != unit.parent or
+                                pending_size + size > self.chunk_size):
+                    chunks.extend(self._merge_units(pending, lines, file_path, language))
+                    pending, pending_size = [], 0
+                pending.append(unit)
+                pending_size += size
+                if pending_size >= self.min_chunk_size:
+                    chunks.extend(self._merge_units(pending, lines, file_path, language))
+                    pending, pending_size = [], 0
+                continue
+            
+            if pending:
+                chunks.extend(self._merge_units(pending, lines, file_path, language))
+                pending, pending_size = [], 0
+            
+            chunks.extend(self._split_unit(unit, lines, file_path, language))
+        
+        if pending:
+            chunks.extend(self._merge_units(pending, lines, file_path, language))
+        
+        return chunks
+    
+    def _collect_units(self,
+                       container,
+                       source: bytes,
+                       language: str,
+                       parent: Optional[str],
+                       units: List[_Unit],
+                       split_classes: List[_Unit]):
+        """Collect definition spans below a tree-sitter node."""
+        for child in container.named_children:
+            definition = self._ts_definition(child, source, language)
+            if not definition:
+                continue
+            
+            kind, name, inner = definition
+            qualified = f"{parent}.{name}" if parent and name else name
+            start_line = child.start_point[0] + 1
+            end_line = child.end_point[0] + 1
+            
+            if kind == "class":
+                members: List[_Unit] = []
+                body = inner.child_by_field_name("body")
+                if body is not None and child.end_byte - child.start_byte > self.chunk_size:
+                    self._collect_units(body, source, language, qualified, members, split_classes)
+                
+                if not members:
+                    units.append(_Unit(start_line, end_line, ChunkType.CLASS, qualified, parent))
+                    continue
+                
+                # Class header (signature, docstring, leading attributes)
+                header_end = members[0].start_line - 1
+                if header_end >= start_line:
+                    units.append(_Unit(start_line, header_end, ChunkType.CLASS,
+                                       qualified, parent, mergeable=False))
+                units.extend(members)
+                split_classes.append(
+                    _Unit(start_line, end_line, ChunkType.CLASS, qualified, parent)
+                )
+            else:
+                owner = parent
+                if inner.type == "method_declaration" and language == "go":
+                    owner = self._go_receiver(inner, source)
+                    qualified = f"{owner}.{name}" if owner and name else name
+                chunk_type = ChunkType.METHOD if owner else ChunkType.FUNCTION
+                units.append(_Unit(start_line, end_line, chunk_type, qualified, owner))
+    
+    def _ts_definition(self, node, source: bytes, language: str):
+        """Get (kind, name, definition node) if a node defines a symbol."""
+        spec = TREE_SITTER_DEFINITIONS[language]
+        inner = node
+        if node.type in spec.get("wrappers", ()):
+            inner = (node.child_by_field_name("definition") or
+                     node.child_by_field_name("declaration"))
+            if inner is None:
+                return None
+        
+        if inner.type in spec["class"]:
+            return "class", self._ts_name(inner, source), inner
+        if inner.type in spec["function"]:
+            return "function", self._ts_name(inner, source), inner
+        if inner.type in spec.get("variables", ()):
+            # const handler = () => {...}
+            for declarator in inner.named_children:
+                value = declarator.child_by_field_name("value")
+                if value is not None and value.type in _FUNCTION_VALUE_TYPES:
+                    return "function", self._ts_name(declarator, source), inner
+        return None
+    
+    def _ts_name(self, node, source: bytes) -> Optional[str]:
+        """Get the declared name of a definition node."""
+        name_node = node.child_by_field_name("name")
+        if name_node is None and node.type == "type_declaration":
+            for child in node.named_children:
+                if child.type == "type_spec":
+                    name_node = child.child_by_field_name("name")
+                    break
+        if name_node is None:
+            return None
+        return source[name_node.start_byte:name_node.end_byte].decode('utf-8', errors='replace')
+    
+    def _go_receiver(self, node, source: bytes) -> Optional[str]:
+        """Get the receiver type name of a Go method."""
+        receiver = node.child_by_field_name("receiver")
+        if receiver is None:
+            return None
+        text = source[receiver.start_byte:receiver.end_byte].decode('utf-8', errors='replace')
+        parts = text.strip("()").split()
+        return parts[-1].lstrip("*") if parts else None
+    
+    def _gap_units(self,
+                   units: List[_Unit],
+                   split_classes: List[_Unit],
+                   line_count: int) -> List[_Unit]:
+        """Get spans of code not covered by any definition."""
+        covered = sorted((u.start_line, u.end_line) for u in units)
+        gaps = []
+        line = 1
+        for start, end in covered + [(line_count + 1, line_count + 1)]:
+            if start > line:
+                gaps.append((line, start - 1))
+            line = max(line, end + 1)
+        
+        result = []
+        for start, end in gaps:
+            # Gaps inside a split class belong to that class
+            owner = next(
+                (c for c in reversed(split_classes)
+                 if c.start_line <= start and end <= c.end_line),
+                None
+            )
+            if owner:
+                result.append(_Unit(start, end, ChunkType.CLASS, owner.name, owner.parent,
+                                    is_definition=False, mergeable=False))
+            else:
+                result.append(_Unit(start, end, ChunkType.MODULE,
+                                    is_definition=False, mergeable=False))
+        return result
+    
+    def _span_size(self, lines: List[str], start_line: int, end_line: int) -> int:
+        """Get the size of a line span without surrounding whitespace."""
+        return len('\n'.join(lines[start_line - 1:end_line]).strip())
+    
+    def _make_chunk(self,
+                    unit: _Unit,
+                    start_line: int,
+                    end_line: int,
+                    lines: List[str],
+                    file_path: str,
+                    language: str,
+                    **metadata) -> CodeChunk:
+        """Create a chunk for (part of) a tree-sitter unit."""
+        metadata['chunker'] = 'tree_sitter'
+        if unit.parent:
+            metadata['parent_symbol'] = unit.parent
+        return CodeChunk(
+            content='\n'.join(lines[start_line - 1:end_line]),
+            file_path=file_path,
+            start_line=start_line,
+            end_line=end_line,
+            chunk_type=unit.chunk_type,
+            language=language,
+            symbol_name=unit.name,
+            metadata=metadata
+        )
+    
+    def _split_unit(self,
+                    unit: _Unit,
+                    lines: List[str],
+                    file_path: str,
+                    language: str) -> List[CodeChunk]:
+        """Split a unit larger than chunk_size on line boundaries."""
+        spans = []
+        start = unit.start_line
+        size = 0
+        for line_no in range(unit.start_line, unit.end_line + 1):
+            line_size = len(lines[line_no - 1]) + 1
+            if size and size + line_size > self.chunk_size:
+                spans.append((start, line_no - 1))
+                start, size = line_no, 0
+            size += line_size
+        spans.append((start, unit.end_line))
+        
+        if len(spans) == 1:
+            return [self._make_chunk(unit, unit.start_line, unit.end_line, lines, file_path, language)]
+        
+        return [
+            self._make_chunk(unit, start, end, lines, file_path, language,
+                             part=i + 1, parts=len(spans))
+            for i, (start, end) in enumerate(spans)
+        ]
+    
+    def _merge_units(self,
+                     units: List[_Unit],
+                     lines: List[str],
+                     file_path: str,
+                     language: str) -> List[CodeChunk]:
+        """Merge a run of small sibling definitions into one chunk."""
+        if len(units) == 1:
+            unit = units[0]
+            return [self._make_chunk(unit, unit.start_line, unit.end_line, lines, file_path, language)]
+        
+        types = {u.chunk_type for u in units}
+        merged = _Unit(
+            start_line=units[0].start_line,
+            end_line=units[-1].end_line,
+            chunk_type=types.pop() if len(types) == 1 else ChunkType.GENERAL,
+            name=units[0].name,
+            parent=units[0].parent
+        )
+        return [self._make_chunk(
+            merged, merged.start_line, merged.end_line, lines, file_path, language,
+            merged_symbols=','.join(u.name for u in units if u.name)
+        )]
+    
     def _window_chunk(self, 
                      content: str, 
                      file_path: str,
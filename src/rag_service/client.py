@@ -18,15 +18,21 @@ class RAGClient:
     
     This provides a simplified interface for other components
     to interact with the RAG service.
+    
+    Searches are scoped to ``default_ref`` (a git branch, tag or commit)
+    unless a ref is passed explicitly; None searches the working-tree
+    index, as do refs that were not indexed with index_git_ref.
     """
     
-    def __init__(self, service: Optional[RAGService] = None):
+    def __init__(self, service: Optional[RAGService] = None, default_ref: Optional[str] = None):
         """
         Initialize the RAG client.
         
         Args:
             service: RAG service instance (creates default if None)
+            default_ref: Git ref searches are scoped to by default
         """
+        self.default_ref = default_ref
         if service is None:
             # Create default service with persistence in .rag directory
             persist_dir = Path(".rag")
@@ -38,7 +44,8 @@ class RAGClient:
     def search(self,
                query: str,
                k: int = 10,
-               filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+               filters: Optional[Dict[str, Any]] = None,
+               ref: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Search for code.
         
@@ -46,17 +53,21 @@ class RAGClient:
             query: Search query
             k: Number of results
             filters: Optional filters
+            ref: Git ref to search (defaults to default_ref)
             
         Returns:
             List of search results as dictionaries
         """
-        results = self.service.search_code(query, k=k, filters=filters)
+        results = self.service.search_code(
+            query, k=k, filters=filters, ref=ref or self.default_ref
+        )
         return [result.to_dict() for result in results]
     
     def get_context(self,
                    query: str,
                    k: int = 10,
-                   max_tokens: int = 3000) -> str:
+                   max_tokens: int = 3000,
+                   ref: Optional[str] = None) -> str:
         """
         Get formatted context for LLM prompts.
         
@@ -64,26 +75,56 @@ class RAGClient:
             query: Context query
             k: Number of chunks to retrieve
             max_tokens: Maximum tokens in context
+            ref: Git ref to search (defaults to default_ref)
             
         Returns:
             Formatted context string
         """
-        return self.service.get_context(query, k=k, max_tokens=max_tokens)
+        return self.service.get_context(
+            query, k=k, max_tokens=max_tokens, ref=ref or self.default_ref
+        )
+    
+    def pack_context(self,
+                     query: str,
+                     k: int = 10,
+                     max_tokens: int = 3000,
+                     ref: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get context for LLM prompts with the spans and token usage.
+        
+        Args:
+            query: Context query
+            k: Number of chunks to retrieve
+            max_tokens: Maximum tokens in context
+            ref: Git ref to search (defaults to default_ref)
+            
+        Returns:
+            Packed context as a dictionary (text, spans, tokens_used, ...)
+        """
+        return self.service.pack_context(
+            query, k=k, max_tokens=max_tokens, ref=ref or self.default_ref
+        ).to_dict()
     
     def find_symbol(self,
                    symbol_name: str,
-                   symbol_type: Optional[str] = None) -> List[Dict[str, Any]]:
+                   symbol_type: Optional[str] = None,
+                   prefix: bool = False,
+                   ref: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Find a specific symbol.
         
         Args:
-            symbol_name: Name of the symbol
+            symbol_name: Name of the symbol, optionally qualified (Class.method)
             symbol_type: Type of symbol (function, class, etc)
+            prefix: Also match symbols starting with symbol_name
+            ref: Git ref to search (defaults to default_ref)
             
         Returns:
             List of search results
         """
-        results = self.service.find_symbol(symbol_name, symbol_type)
+        results = self.service.find_symbol(
+            symbol_name, symbol_type, prefix=prefix, ref=ref or self.default_ref
+        )
         return [result.to_dict() for result in results]
     
     def get_snippet(self,
@@ -145,7 +186,8 @@ class RAGClient:
             "total_files": stats.total_files,
             "total_embeddings": stats.total_embeddings,
             "languages": stats.languages,
-            "chunk_types": stats.chunk_types
+            "chunk_types": stats.chunk_types,
+            "cache_stats": stats.cache_stats
         }
     
     def is_available(self) -> bool:
@@ -0,0 +1,356 @@
+"""
+Token-budgeted context packing for the RAG service.
+
+Search results are packed into an LLM prompt budget by relevance per
+token: a 0/1 knapsack picks the set of chunks with the highest total score
+that fits, then adjacent or overlapping chunks of the same file are merged
+into single spans. Token counts are cached by content hash (in memory and,
+when the service persists its index, in SQLite), so chunks are tokenized
+once rather than on every call.
+"""
+
+import hashlib
+import logging
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .models import SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Budget resolution of the knapsack table; token weights are rounded up to
+# multiples of max_tokens / _KNAPSACK_BUCKETS so the budget always holds
+_KNAPSACK_BUCKETS = 512
+
+
+def format_span(file_path: str, start_line: int, end_line: int, language: str, content: str) -> str:
+    """Format a code span for a prompt."""
+    return f"""File: {file_path}:{start_line}-{end_line}
+```{language}
+{content}
+```
+"""
+
+
+@dataclass
+class ContextSpan:
+    """A contiguous region of one file included in the context."""
+    file_path: str
+    start_line: int
+    end_line: int
+    language: str
+    content: str
+    score: float  # Best score of the merged chunks
+    chunk_ids: List[str] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def text(self) -> str:
+        """Formatted span."""
+        return format_span(
+            self.file_path, self.start_line, self.end_line, self.language, self.content
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "file_path": self.file_path,
+            "start_line": self.start_line,
+            "end_line": self.end_line,
+            "language": self.language,
+            "score": self.score,
+            "chunk_ids": self.chunk_ids,
+            "tokens": self.tokens,
+        }
+
+
+@dataclass
+class PackedContext:
+    """Context packed into a token budget."""
+    spans: List[ContextSpan]
+    max_tokens: int
+    tokens_used: int = 0
+    candidates: int = 0
+    dropped_ids: List[str] = field(default_factory=list)  # Candidates that did not fit
+
+    @property
+    def text(self) -> str:
+        """Formatted context string."""
+        return "\n".join(span.text for span in self.spans)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "text": self.text,
+            "spans": [span.to_dict() for span in self.spans],
+            "tokens_used": self.tokens_used,
+            "max_tokens": self.max_tokens,
+            "candidates": self.candidates,
+            "dropped_ids": self.dropped_ids,
+        }
+
+
+class TokenCountCache:
+    """
+    Token counts keyed by a hash of the counted text.
+    """
+
+    def __init__(self,
+                 count_fn: Callable[[str], int],
+                 namespace: str = "",
+                 db_path: Optional[str] = None,
+                 max_entries: int = 100_000):
+        """
+        Initialize the cache.
+
+        Args:
+            count_fn: Tokenizer-backed counting function
+            namespace: Tokenizer name, so counts of different encodings never mix
+            db_path: SQLite database to persist counts to (None for memory only)
+            max_entries: Maximum number of counts kept in memory
+        """
+        self.count_fn = count_fn
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS token_counts "
+                    "(key TEXT PRIMARY KEY, tokens INTEGER NOT NULL) WITHOUT ROWID"
+                )
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        """
+        Count tokens of several texts, tokenizing only unseen ones.
+
+        Args:
+            texts: Texts to count
+
+        Returns:
+            Token counts in the same order
+        """
+        keys = [self._key(text) for text in texts]
+        counts: Dict[str, int] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    counts[key] = self._memory[key]
+
+            missing = [key for key in dict.fromkeys(keys) if key not in counts]
+            if missing and self._conn:
+                placeholders = ", ".join("?" * len(missing))
+                for key, tokens in self._conn.execute(
+                    f"SELECT key, tokens FROM token_counts WHERE key IN ({placeholders})",
+                    missing
+                ):
+                    counts[key] = tokens
+                    self._remember(key, tokens)
+
+            new_rows = []
+            for key, text in zip(keys, texts):
+                if key in counts:
+                    continue
+                counts[key] = self.count_fn(text)
+                self._remember(key, counts[key])
+                new_rows.append((key, counts[key]))
+
+            self.misses += len(new_rows)
+            self.hits += len(keys) - len(new_rows)
+            if new_rows and self._conn:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO token_counts VALUES (?, ?)", new_rows
+                    )
+
+        return [counts[key] for key in keys]
+
+    def count(self, text: str) -> int:
+        """Count tokens of one text."""
+        return self.count_many([text])[0]
+
+    def _remember(self, key: str, tokens: int):
+        self._memory[key] = tokens
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Close the persistent store."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+
+def knapsack(weights: Sequence[int], values: Sequence[float], capacity: int) -> List[int]:
+    """
+    Solve a 0/1 knapsack.
+
+    Weights are rounded up to a coarse grid of at most _KNAPSACK_BUCKETS
+    steps, which keeps the table small and never overshoots the capacity.
+
+    Args:
+        weights: Item weights (tokens)
+        values: Item values (relevance scores)
+        capacity: Maximum total weight
+
+    Returns:
+        Indices of the chosen items, in input order
+    """
+    if capacity <= 0:
+        return []
+
+    step = max(1, math.ceil(capacity / _KNAPSACK_BUCKETS))
+    slots = capacity // step
+    scaled = [math.ceil(w / step) for w in weights]
+
+    best = [0.0] * (slots + 1)
+    taken = [[False] * (slots + 1) for _ in weights]
+    for i, (weight, value) in enumerate(zip(scaled, values)):
+        if weight > slots:
+            continue
+        for slot in range(slots, weight - 1, -1):
+            candidate = best[slot - weight] + value
+            if candidate > best[slot]:
+                best[slot] = candidate
+                taken[i][slot] = True
+
+    chosen = []
+    slot = slots
+    for i in range(len(weights) - 1, -1, -1):
+        if taken[i][slot]:
+            chosen.append(i)
+            slot -= scaled[i]
+    return sorted(chosen)
+
+
+class ContextPacker:
+    """
+    Packs search results into a token budget.
+    """
+
+    def __init__(self, token_counts: TokenCountCache):
+        """
+        Initialize the packer.
+
+        Args:
+            token_counts: Cached token counter
+        """
+        self.token_counts = token_counts
+
+    def pack(self, results: Sequence[SearchResult], max_tokens: int) -> PackedContext:
+        """
+        Select and merge results that fit in max_tokens.
+
+        Args:
+            results: Search results, best first
+            max_tokens: Token budget
+
+        Returns:
+            Packed context with spans ordered by relevance
+        """
+        # Drop duplicate chunks (e.g. the same chunk from two search legs)
+        unique = list({r.chunk.id: r for r in reversed(results)}.values())[::-1]
+
+        texts = [
+            format_span(c.file_path, c.start_line, c.end_line, c.language, c.content)
+            for c in (r.chunk for r in unique)
+        ]
+        tokens = self.token_counts.count_many(texts)
+
+        # Clamp scores so zero-score results still beat leaving budget unused
+        values = [max(r.score, 1e-6) for r in unique]
+        chosen = set(knapsack(tokens, values, max_tokens))
+
+        # Fill what the coarse grid left over, best score per token first
+        used = sum(tokens[i] for i in chosen)
+        for i in sorted(
+            (i for i in range(len(unique)) if i not in chosen),
+            key=lambda i: values[i] / max(tokens[i], 1),
+            reverse=True
+        ):
+            if used + tokens[i] <= max_tokens:
+                chosen.add(i)
+                used += tokens[i]
+
+        spans = self._merge([unique[i] for i in sorted(chosen)])
+        span_tokens = self.token_counts.count_many([span.text for span in spans])
+        for span, count in zip(spans, span_tokens):
+            span.tokens = count
+
+        return PackedContext(
+            spans=spans,
+            max_tokens=max_tokens,
+            tokens_used=sum(span_tokens),
+            candidates=len(unique),
+            dropped_ids=[unique[i].chunk.id for i in range(len(unique)) if i not in chosen],
+        )
+
+    def _merge(self, results: List[SearchResult]) -> List[ContextSpan]:
+        """Merge adjacent or overlapping chunks of the same file."""
+        by_file: Dict[str, List[SearchResult]] = {}
+        for result in results:
+            by_file.setdefault(result.chunk.file_path, []).append(result)
+
+        spans = []
+        for file_path, file_results in by_file.items():
+            file_results.sort(key=lambda r: (r.chunk.start_line, r.chunk.end_line))
+            current: Optional[ContextSpan] = None
+
+            for result in file_results:
+                chunk = result.chunk
+                if current and chunk.start_line <= current.end_line + 1:
+                    if chunk.end_line > current.end_line:
+                        # Append the lines past the current span's end
+                        lines = chunk.content.split("\n")
+                        skip = current.end_line - chunk.start_line + 1
+                        current.content = "\n".join(
+                            [current.content] + lines[skip:]
+                        )
+                        current.end_line = chunk.end_line
+                    current.score = max(current.score, result.score)
+                    current.chunk_ids.append(chunk.id)
+                    continue
+
+                current = ContextSpan(
+                    file_path=file_path,
+                    start_line=chunk.start_line,
+                    end_line=chunk.end_line,
+                    language=chunk.language,
+                    content=chunk.content,
+                    score=result.score,
+                    chunk_ids=[chunk.id],
+                )
+                spans.append(current)
+
+        spans.sort(key=lambda span: span.score, reverse=True)
+        return spans
@@ -0,0 +1,249 @@
+"""
+Embedding backends for the RAG service.
+
+A backend turns a batch of texts into vectors of a fixed dimension:
+
+- ``openai``: OpenAI embeddings API (needs OPENAI_API_KEY)
+- ``sentence-transformers``: a small local model on CPU (optional dependency)
+- ``hashing``: hashed word and character n-gram features projected into a
+  fixed-size vector; needs only numpy, so vector search works offline
+
+``create_embedding_backend("auto")`` picks the first one that is available,
+in that order.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
+
+from .keyword_index import tokenize
+
+# sentence-transformers is optional
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPENAI_MODEL = "text-embedding-3-small"
+DEFAULT_LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+EMBEDDING_BACKENDS = ("auto", "openai", "sentence-transformers", "hashing")
+
+
+class EmbeddingBackend(ABC):
+    """
+    Interface of embedding providers.
+    """
+
+    name: str = ""
+    model: str = ""
+    dimension: int = 0
+    max_batch_size: int = 100
+    max_input_tokens: Optional[int] = None  # Inputs are truncated to this many tokens
+    max_batch_tokens: Optional[int] = None  # Total tokens per request
+    coalesce_window: float = 0.0  # Seconds to gather concurrent single-text requests
+    cacheable: bool = True  # Whether embeddings are worth caching
+
+    @property
+    def model_id(self) -> str:
+        """Identifier recorded on collections embedded with this backend."""
+        return f"{self.name}:{self.model}"
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: At most max_batch_size texts
+
+        Returns:
+            One vector per text
+
+        Raises:
+            Exception: If the batch could not be embedded
+        """
+        pass
+
+    async def embed_async(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts without blocking the event loop."""
+        return await asyncio.to_thread(self.embed, texts)
+
+
+class OpenAIBackend(EmbeddingBackend):
+    """
+    Embeddings from the OpenAI API.
+    """
+
+    name = "openai"
+    max_batch_size = 2048
+    max_input_tokens = 8000
+    max_batch_tokens = 300_000
+    coalesce_window = 0.005
+
+    _DIMENSIONS = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "text-embedding-ada-002": 1536,
+    }
+
+    def __init__(self, model: str = DEFAULT_OPENAI_MODEL, api_key: Optional[str] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            model: OpenAI embedding model
+            api_key: API key (defaults to OPENAI_API_KEY)
+        """
+        self.model = model
+        self.dimension = self._DIMENSIONS.get(model, 1536)
+        self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.embeddings.create(input=texts, model=self.model)
+        return [item.embedding for item in response.data]
+
+    async def embed_async(self, texts: List[str]) -> List[List[float]]:
+        response = await self.async_client.embeddings.create(input=texts, model=self.model)
+        return [item.embedding for item in response.data]
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    Embeddings from a local sentence-transformers model on CPU.
+    """
+
+    name = "sentence-transformers"
+    max_batch_size = 256
+
+    def __init__(self, model: str = DEFAULT_LOCAL_MODEL, device: str = "cpu", encode_batch_size: int = 32):
+        """
+        Initialize the backend.
+
+        Args:
+            model: Model name or path
+            device: Torch device
+            encode_batch_size: Texts per forward pass
+        """
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError("sentence-transformers is not installed")
+
+        self.model = model
+        self.encode_batch_size = encode_batch_size
+        self._model = SentenceTransformer(model, device=device)
+        self.dimension = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._model.encode(
+            texts,
+            batch_size=self.encode_batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return vectors.tolist()
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Hashed n-gram projection (feature hashing).
+
+    Each text is split into the same identifier tokens the keyword index
+    uses, and every token and character trigram is hashed into one of
+    ``dimension`` signed buckets with log-scaled counts. The result is an
+    L2-normalized vector. Similarity is lexical rather than semantic, but it
+    needs no model or network, and token parts and misspellings still
+    overlap.
+    """
+
+    name = "hashing"
+    max_batch_size = 1024
+    cacheable = False  # Hashing is cheaper than a cache lookup
+
+    def __init__(self, dimension: int = 384, ngram_size: int = 3):
+        """
+        Initialize the backend.
+
+        Args:
+            dimension: Output dimension
+            ngram_size: Character n-gram length
+        """
+        self.dimension = dimension
+        self.ngram_size = ngram_size
+        self.model = f"ngram{ngram_size}-{dimension}"
+
+    def _features(self, text: str) -> Counter:
+        """Count token and character n-gram features of a text."""
+        features: Counter = Counter()
+        n = self.ngram_size
+        for token in tokenize(text):
+            features["w:" + token] += 1
+            padded = f"#{token}#"
+            for i in range(len(padded) - n + 1):
+                features["c:" + padded[i:i + n]] += 1
+        return features
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text).items():
+                # crc32 is stable across processes, unlike hash()
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dimension] += sign * (1.0 + math.log(count))
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+        return vectors.tolist()
+
+
+def create_embedding_backend(backend: str = "auto",
+                             openai_model: str = DEFAULT_OPENAI_MODEL,
+                             local_model: str = DEFAULT_LOCAL_MODEL) -> Optional[EmbeddingBackend]:
+    """
+    Create an embedding backend.
+
+    Args:
+        backend: "openai", "sentence-transformers", "hashing" or "auto"
+            (the first of those that is available)
+        openai_model: Model for the OpenAI backend
+        local_model: Model for the sentence-transformers backend
+
+    Returns:
+        Backend instance, or None if the requested backend is unavailable
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    if backend in ("auto", "openai"):
+        if os.getenv("OPENAI_API_KEY"):
+            return OpenAIBackend(openai_model)
+        if backend == "openai":
+            logger.warning("OpenAI API key not found, embedding service disabled")
+            return None
+
+    if backend in ("auto", "sentence-transformers") and SENTENCE_TRANSFORMERS_AVAILABLE:
+        try:
+            return SentenceTransformerBackend(local_model)
+        except Exception as e:
+            logger.warning(f"Failed to load local embedding model {local_model}: {e}")
+    if backend == "sentence-transformers":
+        logger.warning("Local embedding model not available, embedding service disabled")
+        return None
+
+    return HashingBackend()
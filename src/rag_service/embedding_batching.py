@@ -0,0 +1,127 @@
+"""
+Request batching for embedding backends.
+
+- ``pack_batches`` groups texts into requests bounded by both the number of
+  inputs and their total token count, so short texts share large requests
+  and long texts don't exceed the provider's per-request token limit.
+- ``RequestCoalescer`` merges single-text requests made concurrently from
+  different threads (e.g. query embeddings of parallel searches) into one
+  upstream call.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def pack_batches(token_counts: Sequence[int],
+                 max_items: int,
+                 max_tokens: Optional[int] = None) -> List[List[int]]:
+    """
+    Pack texts into batches, keeping their order.
+
+    Args:
+        token_counts: Token count of each text
+        max_items: Maximum texts per batch
+        max_tokens: Maximum total tokens per batch (None for no limit)
+
+    Returns:
+        Lists of text indexes, one per batch. A text larger than max_tokens
+        gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, count in enumerate(token_counts):
+        if current and (
+            len(current) >= max_items
+            or (max_tokens is not None and current_tokens + count > max_tokens)
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += count
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+class RequestCoalescer:
+    """
+    Coalesces concurrent single-text embedding requests.
+
+    The first caller to arrive waits up to ``window`` seconds for others,
+    then embeds everything that queued up in one call on behalf of all of
+    them; the other callers block until their result is ready. Identical
+    texts are embedded once.
+    """
+
+    def __init__(self,
+                 embed_many: Callable[[List[str]], List[Optional[List[float]]]],
+                 window: float = 0.005,
+                 max_items: int = 100):
+        """
+        Initialize the coalescer.
+
+        Args:
+            embed_many: Embeds a list of texts (None for failed texts)
+            window: Seconds the first request waits for others
+            max_items: Queue size that triggers an early flush
+        """
+        self.embed_many = embed_many
+        self.window = window
+        self.max_items = max_items
+
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+        self._full = threading.Event()
+        self._leader = False
+
+        self.stats = {"requests": 0, "upstream_calls": 0}
+
+    def submit(self, text: str) -> Optional[List[float]]:
+        """
+        Embed a text, possibly together with concurrent requests.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector or None if embedding failed
+        """
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            self.stats["requests"] += 1
+            lead = not self._leader
+            self._leader = True
+            if len(self._pending) >= self.max_items:
+                self._full.set()
+
+        if lead:
+            self._full.wait(self.window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._leader = False
+                self._full.clear()
+                self.stats["upstream_calls"] += 1
+            self._dispatch(batch)
+
+        return future.result()
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]):
+        """Embed a batch of queued requests and resolve their futures."""
+        unique: Dict[str, Optional[List[float]]] = dict.fromkeys(text for text, _ in batch)
+        texts = list(unique)
+        try:
+            unique.update(zip(texts, self.embed_many(texts)))
+        except Exception as e:
+            logger.error(f"Error generating coalesced embeddings: {e}")
+
+        for text, future in batch:
+            future.set_result(unique[text])
@@ -0,0 +1,404 @@
+"""
+Persistent, content-addressed cache for embeddings.
+
+Embeddings are keyed by ``(model, sha256(text))`` and stored as rows of a
+float32 memory-mapped array, with a small SQLite table mapping keys to
+array slots. The SQLite index serializes writers, so several processes
+(and several RAGService instances in one process) can share the cache
+stored under the same ``.rag`` directory.
+
+Each row also stores a tag derived from its key. Vectors are written
+outside of index transactions, so readers only trust a row whose tag
+matches the key they looked up, before and after copying the vector; a
+slot that is being evicted and rewritten concurrently reads as a miss.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+_INITIAL_CAPACITY = 1024
+
+# Tag of a row whose vector is being written
+_WRITING = 0
+
+
+def text_hash(text: str) -> str:
+    """Get the content hash used as cache key for a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _slot_tag(key: str) -> int:
+    """Get the nonzero 64-bit tag stored with a key's vector."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache for a single model.
+
+    Vectors live in ``<model>-<dimension>.vec`` (capacity rows of a key tag
+    and dimension float32 values) and the key index in ``index.db``. When the cache holds ``max_entries``
+    vectors, the least recently used entries are evicted and their slots
+    reused.
+    """
+
+    def __init__(self,
+                 cache_dir: str,
+                 model: str,
+                 dimension: int,
+                 max_entries: int = 100_000):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            cache_dir: Directory holding the cache files
+            model: Embedding model the vectors belong to
+            dimension: Embedding dimension
+            max_entries: Maximum number of cached vectors
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.model = model
+        self.dimension = dimension
+        self.max_entries = max_entries
+
+        safe_model = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        self.vectors_path = self.cache_dir / f"{safe_model}-{dimension}.vec"
+        self._row_dtype = np.dtype([("tag", "<u8"), ("vector", "<f4", (dimension,))])
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "index.db"),
+            timeout=30,
+            check_same_thread=False,
+            isolation_level=None,  # Explicit transactions only
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                slot INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_lru "
+            "ON embeddings(model, last_used)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS slots (
+                model TEXT PRIMARY KEY,
+                next_slot INTEGER NOT NULL
+            )
+            """
+        )
+
+        self._rows: Optional[np.memmap] = None
+        self._tags: Optional[np.ndarray] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._capacity = 0
+
+    def _map_vectors(self, min_capacity: int = 0):
+        """(Re)map the vector file, growing it to hold min_capacity rows."""
+        row_bytes = self._row_dtype.itemsize
+        current = (
+            self.vectors_path.stat().st_size // row_bytes
+            if self.vectors_path.exists() else 0
+        )
+
+        if current < min_capacity:
+            capacity = max(current, _INITIAL_CAPACITY)
+            while capacity < min_capacity:
+                capacity *= 2
+            capacity = min(capacity, max(self.max_entries, min_capacity))
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+            current = capacity
+
+        if current == 0:
+            self._rows = self._tags = self._vectors = None
+            self._capacity = 0
+            return
+
+        if self._rows is None or current != self._capacity:
+            self._rows = np.memmap(
+                self.vectors_path, dtype=self._row_dtype, mode="r+", shape=(current,)
+            )
+            self._tags = self._rows["tag"]
+            self._vectors = self._rows["vector"]
+            self._capacity = current
+
+    def _read_slot(self, key: str, slot: int) -> Optional[List[float]]:
+        """Read a key's vector, or None if its slot holds another (or a partial) vector."""
+        if slot >= self._capacity:
+            return None
+        tag = _slot_tag(key)
+        if self._tags[slot] != tag:
+            return None
+        vector = self._vectors[slot].tolist()
+        # Rewritten while copying: the tag changed in between
+        if self._tags[slot] != tag:
+            return None
+        return vector
+
+    def _write_slot(self, key: str, slot: int, embedding: List[float]):
+        """Write a key's vector, invalidating the slot while it is partial."""
+        self._tags[slot] = _WRITING
+        self._vectors[slot] = embedding
+        self._tags[slot] = _slot_tag(key)
+
+    def _touch(self, keys: List[str]):
+        """
+        Mark entries as recently used.
+
+        Best effort: LRU order is only a hint, so the update is skipped
+        rather than waited for when another process holds the write lock.
+        """
+        now = time.time()
+        self._conn.execute("PRAGMA busy_timeout = 0")
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? "
+                "WHERE model = ? AND text_hash = ?",
+                [(now, self.model, key) for key in keys]
+            )
+            self._conn.execute("COMMIT")
+        except sqlite3.OperationalError as e:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            logger.debug(f"Skipped embedding cache LRU update: {e}")
+        finally:
+            self._conn.execute("PRAGMA busy_timeout = 30000")
+
+    def get_many(self, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            hashes: Content hashes of the texts
+
+        Returns:
+            Mapping of hash -> embedding for the cached entries
+        """
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+
+        with self._lock:
+            slots: Dict[str, int] = {}
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, slot FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(batch))})",
+                    [self.model] + batch
+                )
+                slots.update(rows)
+
+            if slots:
+                max_slot = max(slots.values())
+                if max_slot >= self._capacity:
+                    self._map_vectors()
+                for key, slot in slots.items():
+                    vector = self._read_slot(key, slot)
+                    if vector is not None:
+                        found[key] = vector
+
+                if found:
+                    self._touch(list(found))
+
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+
+        return found
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Look up a single cached embedding."""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Sequence[Tuple[str, List[float]]]):
+        """
+        Store embeddings in the cache.
+
+        Args:
+            items: Sequence of (hash, embedding) pairs
+        """
+        items = [
+            (key, embedding) for key, embedding in dict(items).items()
+            if embedding is not None and len(embedding) == self.dimension
+        ]
+        if not items:
+            return
+
+        with self._lock:
+            # Assign slots and evict in one committed transaction, so the
+            # slots written below are not referenced by any other key
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                existing: Dict[str, int] = {}
+                for start in range(0, len(items), 500):
+                    batch = [key for key, _ in items[start:start + 500]]
+                    existing.update(self._conn.execute(
+                        f"SELECT text_hash, slot FROM embeddings WHERE model = ? "
+                        f"AND text_hash IN ({','.join('?' * len(batch))})",
+                        [self.model] + batch
+                    ))
+                now = time.time()
+                # Keep existing entries from being evicted for the new ones
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? "
+                    "WHERE model = ? AND text_hash = ?",
+                    [(now, self.model, key) for key in existing]
+                )
+                # A batch larger than the cache only caches what fits
+                new_keys = [key for key, _ in items if key not in existing]
+                new_keys = new_keys[:max(0, self.max_entries - len(existing))]
+                assigned = dict(existing)
+                assigned.update(zip(new_keys, self._allocate_slots(len(new_keys), existing)))
+                new_keys = [key for key in new_keys if key in assigned]
+
+                if assigned:
+                    self._map_vectors(min_capacity=max(assigned.values()) + 1)
+
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                    [(self.model, key, assigned[key], now) for key in new_keys]
+                )
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.error(f"Error writing embedding cache: {e}")
+                return
+
+            # Until its tag is written, a new entry reads as a miss
+            for key, embedding in items:
+                slot = assigned.get(key)
+                if slot is None:
+                    continue
+                if self._read_slot(key, slot) is None:
+                    self._write_slot(key, slot, embedding)
+            self._rows.flush()
+
+    def put(self, key: str, embedding: List[float]):
+        """Store a single embedding in the cache."""
+        self.put_many([(key, embedding)])
+
+    def _allocate_slots(self, count: int, keep: Collection[str] = ()) -> List[int]:
+        """
+        Allocate slots, evicting LRU entries; caller holds a write txn.
+
+        Args:
+            count: Number of slots wanted
+            keep: Keys that must not be evicted
+
+        Returns:
+            Up to count slots (fewer if the cache cannot make room)
+        """
+        if count == 0:
+            return []
+
+        row = self._conn.execute(
+            "SELECT next_slot FROM slots WHERE model = ?", (self.model,)
+        ).fetchone()
+        next_slot = row[0] if row else 0
+
+        fresh = list(range(next_slot, min(next_slot + count, self.max_entries)))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO slots VALUES (?, ?)",
+            (self.model, next_slot + len(fresh))
+        )
+
+        reused: List[int] = []
+        evict = count - len(fresh)
+        if evict > 0:
+            rows = self._conn.execute(
+                "SELECT text_hash, slot FROM embeddings WHERE model = ? "
+                "ORDER BY last_used LIMIT ?",
+                (self.model, evict + len(keep))
+            )
+            victims = [(key, slot) for key, slot in rows if key not in keep][:evict]
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND text_hash = ?",
+                [(self.model, key) for key, _ in victims]
+            )
+            reused = [slot for _, slot in victims]
+
+        return fresh + reused
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model,)
+            ).fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and size information."""
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Flush vectors and close the key index."""
+        with self._lock:
+            if self._rows is not None:
+                self._rows.flush()
+                self._rows = self._tags = self._vectors = None
+                self._capacity = 0
+            self._conn.close()
+
+
+# Caches shared by every EmbeddingService in this process
+_shared_caches: Dict[Tuple[str, str, int], EmbeddingCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(cache_dir: str,
+                     model: str,
+                     dimension: int,
+                     max_entries: int = 100_000) -> EmbeddingCache:
+    """
+    Get the process-wide cache for a directory and model.
+
+    Args:
+        cache_dir: Directory holding the cache files
+        model: Embedding model
+        dimension: Embedding dimension
+        max_entries: Maximum number of cached vectors
+
+    Returns:
+        Shared EmbeddingCache instance
+    """
+    key = (str(Path(cache_dir).resolve()), model, dimension)
+    with _shared_lock:
+        if key not in _shared_caches:
+            _shared_caches[key] = EmbeddingCache(
+                cache_dir, model, dimension, max_entries=max_entries
+            )
+        return _shared_caches[key]
@@ -2,15 +2,18 @@
 Embedding generation for the RAG service.
 """
 
-import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+import asyncio
 import logging
-from functools import lru_cache
-import hashlib
 
-from openai import OpenAI
 import tiktoken
 
+from .embedding_backends import (
+    DEFAULT_LOCAL_MODEL, EmbeddingBackend, create_embedding_backend
+)
+from .embedding_batching import RequestCoalescer, pack_batches
+from .embedding_cache import EmbeddingCache, get_shared_cache, text_hash
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,35 +21,62 @@ class EmbeddingService:
     """
     Service for generating embeddings from text.
     
-    Supports OpenAI embeddings with caching.
+    Embeddings come from a pluggable backend (OpenAI, a local model or
+    hashed n-grams, see embedding_backends) and are cached.
     """
     
-    def __init__(self, model: str = "text-embedding-3-small"):
+    def __init__(self,
+                 model: str = "text-embedding-3-small",
+                 cache_dir: Optional[str] = None,
+                 cache_max_entries: int = 100_000,
+                 backend: Union[str, EmbeddingBackend] = "auto",
+                 local_model: str = DEFAULT_LOCAL_MODEL):
         """
         Initialize the embedding service.
         
         Args:
-            model: The embedding model to use
+            model: The OpenAI embedding model to use
+            cache_dir: Directory for the persistent embedding cache
+                (None disables caching)
+            cache_max_entries: Maximum number of cached embeddings
+            backend: Backend instance or name ("auto", "openai",
+                "sentence-transformers" or "hashing")
+            local_model: Model for the sentence-transformers backend
         """
-        self.model = model
-        self.dimension = 1536  # Default for text-embedding-3-small
-        
-        # Initialize OpenAI client if available
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
-            self.client = OpenAI(api_key=api_key)
-            self.enabled = True
-            logger.info(f"Embedding service initialized with model: {model}")
-        else:
-            self.client = None
-            self.enabled = False
-            logger.warning("OpenAI API key not found, embedding service disabled")
+        if isinstance(backend, str):
+            backend = create_embedding_backend(backend, openai_model=model, local_model=local_model)
+        self.backend: Optional[EmbeddingBackend] = backend
+        self.enabled = backend is not None
+        self.model = backend.model if backend else model
+        self.dimension = backend.dimension if backend else 1536
+        
+        if backend:
+            logger.info(
+                f"Embedding service initialized with {backend.name} model: "
+                f"{self.model} ({self.dimension} dimensions)"
+            )
+        
+        # Persistent embedding cache, shared by services using the same directory
+        self.cache: Optional[EmbeddingCache] = None
+        if cache_dir and backend and backend.cacheable:
+            self.cache = get_shared_cache(
+                cache_dir, self.model, self.dimension, max_entries=cache_max_entries
+            )
         
         # Token counting
         try:
             self.encoding = tiktoken.encoding_for_model("gpt-4")
         except:
             self.encoding = tiktoken.get_encoding("cl100k_base")
+        
+        # Concurrent embed_text calls share upstream requests
+        self._coalescer: Optional[RequestCoalescer] = None
+        if backend and backend.coalesce_window > 0:
+            self._coalescer = RequestCoalescer(
+                self._embed_uncached,
+                window=backend.coalesce_window,
+                max_items=backend.max_batch_size
+            )
     
     def embed_text(self, text: str, cache_key: Optional[str] = None) -> Optional[List[float]]:
         """
@@ -54,7 +84,8 @@ class EmbeddingService:
         
         Args:
             text: Text to embed
-            cache_key: Optional cache key for the embedding
+            cache_key: Optional cache key for the embedding (defaults to
+                the content hash of the text)
             
         Returns:
             Embedding vector or None if service is disabled
@@ -63,32 +94,19 @@ class EmbeddingService:
             return None
         
         # Check cache first
-        if cache_key:
-            cached = self._get_cached_embedding(cache_key)
-            if cached:
-                return cached
+        cache_key = cache_key or self._get_cache_key(text)
+        cached = self._get_cached_embedding(cache_key)
+        if cached:
+            return cached
         
-        try:
-            # Truncate text if too long
-            text = self._truncate_text(text, max_tokens=8000)
-            
-            # Generate embedding
-            response = self.client.embeddings.create(
-                input=text,
-                model=self.model
-            )
-            
-            embedding = response.data[0].embedding
-            
-            # Cache if key provided
-            if cache_key:
-                self._cache_embedding(cache_key, embedding)
-            
-            return embedding
-            
-        except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
-            return None
+        if self._coalescer is not None:
+            embedding = self._coalescer.submit(text)
+        else:
+            embedding = self._embed_uncached([text])[0]
+        
+        self._cache_embedding(cache_key, embedding)
+        
+        return embedding
     
     def embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
         """
@@ -103,32 +121,118 @@ class EmbeddingService:
         if not self.enabled:
             return [None] * len(texts)
         
-        embeddings = []
+        # Serve what we can from the cache; only misses go upstream
+        keys = [self._get_cache_key(text) for text in texts]
+        found = self.cache.get_many(keys) if self.cache is not None else {}
+        
+        # Identical texts are only sent once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        
+        fresh = self._embed_uncached(list(missing.values()))
+        fresh_by_key = dict(zip(missing, fresh))
+        
+        if self.cache is not None:
+            self.cache.put_many([
+                (key, embedding) for key, embedding in fresh_by_key.items()
+                if embedding is not None
+            ])
+        
+        found.update(fresh_by_key)
+        return [found.get(key) for key in keys]
+    
+    async def embed_text_async(self, text: str) -> Optional[List[float]]:
+        """
+        Generate embedding for text without blocking the event loop.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector or None if service is disabled
+        """
+        if not self.enabled:
+            return None
+        
+        # The cache is SQLite-backed (reads may take its write lock for LRU
+        # updates), so lookups and stores run off the event loop
+        cache_key = self._get_cache_key(text)
+        cached = await asyncio.to_thread(self._get_cached_embedding, cache_key)
+        if cached:
+            return cached
         
-        # Process in batches (OpenAI supports up to 2048 inputs)
-        batch_size = 100
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        try:
+            embeddings = await self.backend.embed_async([self._truncate_for_backend(text)])
+            embedding = embeddings[0]
+            
+            await asyncio.to_thread(self._cache_embedding, cache_key, embedding)
             
-            # Truncate texts
-            batch = [self._truncate_text(text, max_tokens=8000) for text in batch]
+            return embedding
             
-            try:
-                response = self.client.embeddings.create(
-                    input=batch,
-                    model=self.model
-                )
-                
-                batch_embeddings = [item.embedding for item in response.data]
-                embeddings.extend(batch_embeddings)
-                
-            except Exception as e:
-                logger.error(f"Error generating batch embeddings: {e}")
-                # Add None for failed embeddings
-                embeddings.extend([None] * len(batch))
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}")
+            return None
+    
+    def _embed_uncached(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Generate embeddings upstream, bypassing the cache."""
+        texts, token_counts = self._prepare_texts(texts)
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        
+        # Requests are bounded by the backend's input count and token budget
+        for batch in pack_batches(
+            token_counts, self.backend.max_batch_size, self.backend.max_batch_tokens
+        ):
+            batch_embeddings = self._embed_with_retry([texts[i] for i in batch])
+            for i, embedding in zip(batch, batch_embeddings):
+                embeddings[i] = embedding
         
         return embeddings
     
+    def _embed_with_retry(self, batch: List[str]) -> List[Optional[List[float]]]:
+        """Embed a batch; if it fails, retry its halves so only bad inputs are lost."""
+        try:
+            embeddings = self.backend.embed(batch)
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(embeddings)}")
+            return embeddings
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"Error generating embedding: {e}")
+                return [None]
+            logger.warning(f"Error embedding batch of {len(batch)}, retrying in halves: {e}")
+        
+        middle = len(batch) // 2
+        return self._embed_with_retry(batch[:middle]) + self._embed_with_retry(batch[middle:])
+    
+    def _prepare_texts(self, texts: List[str]) -> Tuple[List[str], List[int]]:
+        """
+        Truncate texts to the backend's input limit and count their tokens.
+        
+        Each text is encoded once; the counts are only needed (and only
+        computed) for backends with token limits.
+        """
+        backend = self.backend
+        if backend.max_input_tokens is None and backend.max_batch_tokens is None:
+            return texts, [0] * len(texts)
+        
+        prepared, counts = [], []
+        for text in texts:
+            tokens = self.encoding.encode(text)
+            if backend.max_input_tokens is not None and len(tokens) > backend.max_input_tokens:
+                tokens = tokens[:backend.max_input_tokens]
+                text = self.encoding.decode(tokens)
+            prepared.append(text)
+            counts.append(len(tokens))
+        return prepared, counts
+    
+    def _truncate_for_backend(self, text: str) -> str:
+        """Truncate text to the backend's input limit, if it has one."""
+        if self.backend.max_input_tokens is None:
+            return text
+        return self._truncate_text(text, max_tokens=self.backend.max_input_tokens)
+    
     def _truncate_text(self, text: str, max_tokens: int) -> str:
         """Truncate text to maximum token length."""
         tokens = self.encoding.encode(text)
@@ -140,19 +244,31 @@ class EmbeddingService:
         return self.encoding.decode(truncated_tokens)
     
     def _get_cache_key(self, text: str) -> str:
-        """Generate cache key for text."""
-        return hashlib.sha256(f"{self.model}:{text}".encode()).hexdigest()
+        """Generate cache key for text (the model is part of the cache key)."""
+        return text_hash(text)
     
-    @lru_cache(maxsize=10000)
     def _get_cached_embedding(self, cache_key: str) -> Optional[List[float]]:
-        """Get cached embedding (in-memory cache for now)."""
-        # TODO: Implement Redis caching
-        return None
+        """Get cached embedding from the persistent cache."""
+        if self.cache is None:
+            return None
+        return self.cache.get(cache_key)
     
     def _cache_embedding(self, cache_key: str, embedding: List[float]):
-        """Cache embedding (in-memory for now)."""
-        # TODO: Implement Redis caching
-        pass
+        """Store embedding in the persistent cache."""
+        if self.cache is not None and embedding is not None:
+            self.cache.put(cache_key, embedding)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get embedding cache hit/miss statistics."""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+    
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get counts of coalesced embed_text requests and upstream calls."""
+        if self._coalescer is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._coalescer.stats}
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text."""
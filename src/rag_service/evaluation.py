@@ -0,0 +1,135 @@
+"""
+Offline evaluation of hybrid search.
+
+Runs a labelled query set against an index and reports recall@k, MRR and
+latency for each fusion strategy, so ranking changes can be measured.
+"""
+
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from .fusion import FUSION_STRATEGIES
+from .models import SearchRequest
+from .search import HybridSearch
+
+
+@dataclass
+class EvalQuery:
+    """A query with the files that answer it."""
+    query: str
+    relevant_files: List[str]
+    filters: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class StrategyReport:
+    """Evaluation results for one fusion strategy."""
+    strategy: str
+    k: int
+    queries: int = 0
+    recall: float = 0.0
+    mrr: float = 0.0
+    latency_p50_ms: float = 0.0
+    latency_p95_ms: float = 0.0
+    misses: List[str] = field(default_factory=list)  # Queries with no relevant hit
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "strategy": self.strategy,
+            "k": self.k,
+            "queries": self.queries,
+            f"recall@{self.k}": round(self.recall, 4),
+            "mrr": round(self.mrr, 4),
+            "latency_p50_ms": round(self.latency_p50_ms, 2),
+            "latency_p95_ms": round(self.latency_p95_ms, 2),
+            "misses": self.misses,
+        }
+
+
+def load_queries(path: str) -> List[EvalQuery]:
+    """Load a labelled query set from JSON."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    return [EvalQuery(**entry) for entry in data["queries"]]
+
+
+def recall_at_k(retrieved_files: Sequence[str], relevant_files: Sequence[str]) -> float:
+    """Fraction of relevant files among the retrieved files."""
+    if not relevant_files:
+        return 0.0
+    retrieved = set(retrieved_files)
+    return sum(1 for f in relevant_files if f in retrieved) / len(relevant_files)
+
+
+def reciprocal_rank(retrieved_files: Sequence[str], relevant_files: Sequence[str]) -> float:
+    """Reciprocal rank of the first relevant file (0 if none)."""
+    relevant = set(relevant_files)
+    for rank, file_path in enumerate(retrieved_files, start=1):
+        if file_path in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def evaluate_search(search: HybridSearch,
+                    queries: Sequence[EvalQuery],
+                    k: int = 10,
+                    strategies: Sequence[str] = FUSION_STRATEGIES,
+                    alpha: float = 0.5) -> Dict[str, StrategyReport]:
+    """
+    Evaluate fusion strategies on a labelled query set.
+
+    Args:
+        search: Hybrid search over the indexed repository
+        queries: Labelled queries
+        k: Result cutoff
+        strategies: Fusion strategies to compare
+        alpha: Vector weight for hybrid fusion
+
+    Returns:
+        Report per strategy
+    """
+    reports = {}
+    original = search.fusion
+
+    try:
+        for strategy in strategies:
+            search.fusion = strategy
+            report = StrategyReport(strategy=strategy, k=k, queries=len(queries))
+            recalls, ranks, latencies = [], [], []
+
+            for item in queries:
+                start = time.perf_counter()
+                results = search.search(SearchRequest(
+                    query=item.query, k=k, filters=dict(item.filters), alpha=alpha
+                ))
+                latencies.append((time.perf_counter() - start) * 1000)
+
+                files = [r.chunk.file_path for r in results]
+                recalls.append(recall_at_k(files, item.relevant_files))
+                ranks.append(reciprocal_rank(files, item.relevant_files))
+                if ranks[-1] == 0:
+                    report.misses.append(item.query)
+
+            if queries:
+                report.recall = statistics.mean(recalls)
+                report.mrr = statistics.mean(ranks)
+                report.latency_p50_ms = _percentile(latencies, 50)
+                report.latency_p95_ms = _percentile(latencies, 95)
+            reports[strategy] = report
+    finally:
+        search.fusion = original
+
+    return reports
@@ -0,0 +1,45 @@
+"""
+Factory functions for creating vector store instances.
+"""
+
+from typing import Optional
+
+from .vector_store import BaseVectorStore, VectorStore, CHROMADB_AVAILABLE
+from .local_vector_store import LocalVectorStore
+
+
+def create_vector_store(backend: str = "auto",
+                        persist_directory: Optional[str] = None,
+                        collection_name: str = "code_chunks",
+                        **kwargs) -> BaseVectorStore:
+    """
+    Create a vector store for the requested backend.
+    
+    Args:
+        backend: "chroma", "local", or "auto" (chroma when installed)
+        persist_directory: Directory for persistence (None for in-memory)
+        collection_name: Name of the collection
+        **kwargs: Backend specific options (e.g. nprobe for "local")
+        
+    Returns:
+        Vector store instance
+        
+    Raises:
+        ImportError: If the chroma backend is requested but not installed
+        ValueError: If the backend is unknown
+    """
+    if backend == "auto":
+        backend = "chroma" if CHROMADB_AVAILABLE else "local"
+    
+    if backend == "chroma":
+        return VectorStore(persist_directory=persist_directory, collection_name=collection_name)
+    
+    elif backend == "local":
+        return LocalVectorStore(
+            persist_directory=persist_directory,
+            collection_name=collection_name,
+            **kwargs
+        )
+    
+    else:
+        raise ValueError(f"Unknown vector store backend: {backend}")
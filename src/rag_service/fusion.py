@@ -0,0 +1,144 @@
+"""
+Result fusion for hybrid search.
+
+Vector similarities and BM25 scores live on different scales, so the two
+result lists are combined either by rank (reciprocal rank fusion) or after
+normalizing each list's scores (min-max or z-score), then weighted.
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .models import CodeChunk
+
+# Ranked (chunk, score) list returned by a search leg
+RankedList = List[Tuple[CodeChunk, float]]
+
+FUSION_STRATEGIES = ("rrf", "minmax", "zscore")
+
+# Rank offset from Cormack et al.; dampens the weight of the very top ranks
+RRF_K = 60
+
+
+def normalize_scores(results: RankedList, method: str) -> RankedList:
+    """
+    Normalize the scores of one result list.
+
+    Args:
+        results: (chunk, score) pairs
+        method: "minmax" (scale to 0-1) or "zscore" (standardize, squashed to 0-1)
+
+    Returns:
+        (chunk, normalized score) pairs in the same order
+    """
+    if not results:
+        return []
+
+    scores = [score for _, score in results]
+
+    if method == "minmax":
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [(chunk, 1.0) for chunk, _ in results]
+        return [(chunk, (score - low) / (high - low)) for chunk, score in results]
+
+    if method == "zscore":
+        mean = sum(scores) / len(scores)
+        std = math.sqrt(sum((s - mean) ** 2 for s in scores) / len(scores))
+        if std == 0:
+            return [(chunk, 0.5) for chunk, _ in results]
+        # Logistic squash keeps fused scores in 0-1
+        return [
+            (chunk, 1.0 / (1.0 + math.exp(-(score - mean) / std)))
+            for chunk, score in results
+        ]
+
+    raise ValueError(f"Unknown normalization: {method}")
+
+
+def _leg_weights(legs: Sequence[RankedList], weights: Sequence[float]) -> List[float]:
+    """Renormalize weights over the legs that returned results."""
+    active = [w if results else 0.0 for results, w in zip(legs, weights)]
+    total = sum(active)
+    if total == 0:
+        # Only zero-weight legs returned anything: use them rather than nothing
+        active = [1.0 if results else 0.0 for results in legs]
+        total = sum(active) or 1.0
+    return [w / total for w in active]
+
+
+def fuse(legs: Sequence[RankedList],
+         weights: Sequence[float],
+         strategy: str = "rrf",
+         rrf_k: int = RRF_K) -> RankedList:
+    """
+    Fuse ranked result lists into one ranking.
+
+    Args:
+        legs: Ranked (chunk, score) lists, best first
+        weights: Weight of each list
+        strategy: "rrf", "minmax" or "zscore"
+        rrf_k: Rank offset for reciprocal rank fusion
+
+    Returns:
+        (chunk, fused score) pairs sorted by score, scores in 0-1
+    """
+    if strategy not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion strategy: {strategy}")
+
+    weights = _leg_weights(legs, weights)
+    chunks: Dict[str, CodeChunk] = {}
+    fused: Dict[str, float] = defaultdict(float)
+
+    for results, weight in zip(legs, weights):
+        if weight == 0:
+            continue
+
+        if strategy == "rrf":
+            # Scale so that rank 1 in every leg scores 1.0
+            scored = [
+                (chunk, (rrf_k + 1) / (rrf_k + rank))
+                for rank, (chunk, _) in enumerate(results, start=1)
+            ]
+        else:
+            scored = normalize_scores(results, strategy)
+
+        for chunk, score in scored:
+            chunks.setdefault(chunk.id, chunk)
+            fused[chunk.id] += weight * score
+
+    return sorted(
+        ((chunks[chunk_id], score) for chunk_id, score in fused.items()),
+        key=lambda item: item[1],
+        reverse=True
+    )
+
+
+def diversify(results: RankedList,
+              k: int,
+              max_per_file: Optional[int] = None) -> RankedList:
+    """
+    Take the top k results, keeping at most max_per_file chunks per file.
+
+    Args:
+        results: Ranked (chunk, score) pairs
+        k: Number of results
+        max_per_file: Chunk cap per file (None for no cap)
+
+    Returns:
+        Up to k (chunk, score) pairs
+    """
+    if not max_per_file:
+        return list(results[:k])
+
+    per_file: Dict[str, int] = defaultdict(int)
+    selected = []
+    for chunk, score in results:
+        if per_file[chunk.file_path] >= max_per_file:
+            continue
+        per_file[chunk.file_path] += 1
+        selected.append((chunk, score))
+        if len(selected) == k:
+            break
+    return selected
@@ -0,0 +1,227 @@
+"""
+Index a commit straight from the git object database.
+
+Blobs are enumerated with ``git ls-tree -r`` and streamed through one
+``git cat-file --batch`` process, so no checkout is needed. Chunks are
+keyed by blob SHA: a blob that is already indexed (in any branch, commit
+or path) is skipped, which makes indexing a new commit cost proportional
+to what changed since the last indexed one. The tree of every indexed
+commit is recorded in the service's RefManifest so searches can be scoped
+to it.
+"""
+
+import fnmatch
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from ..git_integration import GitAdapter
+from .indexer import DEFAULT_EXCLUDE_PATTERNS, DEFAULT_EXTENSIONS, IndexingStats
+from .models import CodeChunk
+
+if TYPE_CHECKING:
+    from .service import RAGService
+
+logger = logging.getLogger(__name__)
+
+
+def blob_chunk_id(blob_sha: str, chunk: CodeChunk) -> str:
+    """Deterministic id of a chunk of a git blob."""
+    return f"{blob_sha}:{chunk.start_line}:{chunk.end_line}"
+
+
+def is_excluded(path: str, exclude_patterns: Sequence[str]) -> bool:
+    """Check whether any path component matches an exclude pattern."""
+    return any(
+        fnmatch.fnmatchcase(part, pattern)
+        for part in PurePosixPath(path).parts
+        for pattern in exclude_patterns
+    )
+
+
+class GitIndexer:
+    """
+    Indexes the tree of a git ref without checking it out.
+    """
+
+    def __init__(self,
+                 service: "RAGService",
+                 max_inflight_requests: int = 4,
+                 max_batch_size: int = 256,
+                 write_batch_size: int = 512,
+                 max_blob_size: int = 1_000_000):
+        """
+        Initialize the indexer.
+
+        Args:
+            service: RAG service whose components are used
+            max_inflight_requests: Concurrent embedding requests
+            max_batch_size: Maximum texts per embedding request
+            write_batch_size: Chunks per vector store write
+            max_blob_size: Larger blobs (generated or vendored files) are skipped
+        """
+        self.service = service
+        self.max_inflight_requests = max(1, max_inflight_requests)
+        self.max_batch_size = max_batch_size
+        self.write_batch_size = write_batch_size
+        self.max_blob_size = max_blob_size
+
+    def index_ref(self,
+                  repo_path: str,
+                  ref: str = "HEAD",
+                  extensions: Optional[List[str]] = None,
+                  exclude_patterns: Optional[List[str]] = None) -> Tuple[Dict[str, int], IndexingStats]:
+        """
+        Index every matching blob in the tree of a ref.
+
+        Args:
+            repo_path: Repository (may be bare)
+            ref: Commit, branch or tag
+            extensions: File extensions to include
+            exclude_patterns: Path component patterns to exclude
+
+        Returns:
+            Tuple of (path -> chunk count, run statistics)
+        """
+        start_time = time.time()
+        extensions = set(extensions or DEFAULT_EXTENSIONS)
+        if exclude_patterns is None:
+            exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+
+        self.results: Dict[str, int] = {}
+        self.stats = IndexingStats()
+
+        adapter = GitAdapter(repo_path)
+        commit = adapter.resolve_ref(ref)
+        if not commit:
+            logger.error(f"Cannot resolve git ref {ref} in {repo_path}")
+            return self.results, self.stats
+
+        entries = [
+            entry for entry in adapter.list_files(commit)
+            if PurePosixPath(entry.path).suffix in extensions
+            and not is_excluded(entry.path, exclude_patterns)
+        ]
+        self.stats.files_total = len(entries)
+
+        # Blobs not indexed yet, with every path they appear at
+        blobs = self.service.blob_manifest
+        self._paths: Dict[str, List[str]] = {}
+        for entry in entries:
+            if entry.sha in blobs:
+                self.results[entry.path] = len(blobs.blobs[entry.sha])
+                self.stats.files_unchanged += 1
+            elif entry.size > self.max_blob_size:
+                logger.info(f"Skipping large blob {entry.path} ({entry.size} bytes)")
+                self.results[entry.path] = 0
+                self.stats.files_failed += 1
+            else:
+                self._paths.setdefault(entry.sha, []).append(entry.path)
+
+        logger.info(
+            f"Indexing {len(self._paths)} new blobs from {ref} ({commit[:12]}), "
+            f"{self.stats.files_unchanged} files already indexed"
+        )
+
+        pending: List[Tuple[str, List[CodeChunk]]] = []
+        pending_chunks = 0
+        with ThreadPoolExecutor(max_workers=self.max_inflight_requests) as embed_pool:
+            for sha, data in adapter.iter_blobs(list(self._paths)):
+                chunks = self._chunk_blob(sha, data)
+                if chunks is None:
+                    continue
+                pending.append((sha, chunks))
+                pending_chunks += len(chunks)
+                if pending_chunks >= self.write_batch_size:
+                    self._write(pending, embed_pool)
+                    pending, pending_chunks = [], 0
+            self._write(pending, embed_pool)
+
+        self.service.ref_manifest.set_tree(
+            commit, [(entry.path, entry.sha) for entry in entries], ref=ref
+        )
+        self.stats.duration = time.time() - start_time
+        return self.results, self.stats
+
+    def _chunk_blob(self, sha: str, data: Optional[bytes]) -> Optional[List[CodeChunk]]:
+        """Decode and chunk a blob; None if it cannot be indexed."""
+        path = self._paths[sha][0]
+        if data is None:
+            logger.error(f"Blob {sha} for {path} is missing")
+            self._finish(sha, 0, failed=True)
+            return None
+
+        try:
+            content = data.decode("utf-8")
+        except UnicodeDecodeError:
+            # Binary content never changes for this SHA: record it as empty
+            self.service.blob_manifest.add_many([(sha, path, [])])
+            self._finish(sha, 0, failed=True)
+            return None
+
+        chunks = {}
+        for chunk in self.service.chunker.chunk_file(content=content, file_path=path):
+            chunk.id = blob_chunk_id(sha, chunk)
+            chunk.metadata["blob_sha"] = sha
+            chunks[chunk.id] = chunk
+        return list(chunks.values())
+
+    def _write(self,
+               pending: List[Tuple[str, List[CodeChunk]]],
+               embed_pool: ThreadPoolExecutor):
+        """Embed and store the chunks of a batch of blobs."""
+        if not pending:
+            return
+
+        service = self.service
+        chunks = [chunk for _, blob_chunks in pending for chunk in blob_chunks]
+
+        if chunks and service.embedding_service.enabled:
+            batches = [
+                chunks[i:i + self.max_batch_size]
+                for i in range(0, len(chunks), self.max_batch_size)
+            ]
+            futures = [
+                embed_pool.submit(
+                    service.embedding_service.embed_batch,
+                    [chunk.text_for_embedding for chunk in batch]
+                )
+                for batch in batches
+            ]
+            self.stats.embedding_requests += len(futures)
+            for batch, future in zip(batches, futures):
+                try:
+                    embeddings = future.result()
+                except Exception as e:
+                    logger.error(f"Error generating batch embeddings: {e}")
+                    embeddings = [None] * len(batch)
+                for chunk, embedding in zip(batch, embeddings):
+                    chunk.embedding = embedding
+                    if embedding is not None:
+                        self.stats.chunks_embedded += 1
+
+        added = service.vector_store.add_chunks(chunks)
+        stored = sum(1 for chunk in chunks if chunk.embedding is not None)
+        self.stats.chunks_written += added
+
+        # Blobs with chunks that were not stored are retried on the next run
+        complete = []
+        for sha, blob_chunks in pending:
+            written = all(chunk.embedding is not None for chunk in blob_chunks) and added == stored
+            if written:
+                complete.append((sha, self._paths[sha][0], [c.id for c in blob_chunks]))
+            self._finish(sha, len(blob_chunks) if written else 0, failed=not written)
+
+        service.blob_manifest.add_many(complete)
+        service._index_changed()
+
+    def _finish(self, sha: str, chunk_count: int, failed: bool = False):
+        """Record the outcome for every path of a blob."""
+        for path in self._paths[sha]:
+            self.results[path] = chunk_count
+            if failed:
+                self.stats.files_failed += 1
+            else:
+                self.stats.files_indexed += 1
@@ -0,0 +1,429 @@
+"""
+Pipelined directory indexing for the RAG service.
+
+Indexing runs as three overlapping stages:
+
+1. Read, hash and chunk files on a process pool.
+2. Pack chunks from many files into token-budgeted embedding batches and
+   keep a bounded number of embedding requests in flight on a thread pool.
+3. Write embedded chunks to the vector store in large batches and record
+   the files in the index manifest.
+
+The number of files being prepared and chunks waiting to be embedded or
+written is bounded, so memory stays flat on huge repositories.
+"""
+
+import logging
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+import multiprocessing as mp
+
+from .chunker import CodeChunker
+from .manifest import FileUpdate, content_hash, plan_file_update
+from .models import CodeChunk
+
+if TYPE_CHECKING:
+    from .service import RAGService
+
+logger = logging.getLogger(__name__)
+
+# Files indexed by default
+DEFAULT_EXTENSIONS = [
+    '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c',
+    '.h', '.hpp', '.cs', '.go', '.rs', '.rb', '.php', '.swift'
+]
+
+# Paths skipped by default
+DEFAULT_EXCLUDE_PATTERNS = [
+    '__pycache__', '.git', 'node_modules', '.venv', 'venv',
+    'build', 'dist', '.pytest_cache', '.mypy_cache'
+]
+
+
+@dataclass
+class PrepareTask:
+    """A file to read and chunk in a worker process."""
+    abs_path: str
+    stored_path: str
+    known_hash: str = ""
+
+
+@dataclass
+class PreparedFile:
+    """Result of reading and chunking a file."""
+    stored_path: str
+    content_hash: str = ""
+    mtime_ns: int = 0
+    size: int = 0
+    chunks: Optional[List[CodeChunk]] = None  # None when content is unchanged
+    error: Optional[str] = None
+
+
+@dataclass
+class IndexingStats:
+    """Throughput statistics for an indexing run."""
+    files_total: int = 0
+    files_indexed: int = 0
+    files_unchanged: int = 0
+    files_failed: int = 0
+    chunks_embedded: int = 0
+    chunks_written: int = 0
+    embedding_requests: int = 0
+    duration: float = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files_total / self.duration if self.duration else 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks_written / self.duration if self.duration else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for reporting."""
+        return {
+            "files_total": self.files_total,
+            "files_indexed": self.files_indexed,
+            "files_unchanged": self.files_unchanged,
+            "files_failed": self.files_failed,
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_written": self.chunks_written,
+            "embedding_requests": self.embedding_requests,
+            "duration": self.duration,
+            "files_per_sec": self.files_per_sec,
+            "chunks_per_sec": self.chunks_per_sec,
+        }
+
+
+# Chunker owned by each worker process, created by the pool initializer
+_worker_chunker: Optional[CodeChunker] = None
+
+
+def _init_prepare_worker(chunker: CodeChunker):
+    """Pool initializer: keep one chunker per worker process."""
+    global _worker_chunker
+    _worker_chunker = chunker
+
+
+def prepare_file_worker(task: PrepareTask) -> PreparedFile:
+    """
+    Read, hash and chunk a file.
+
+    Runs in a worker process and must be picklable.
+    """
+    try:
+        path = Path(task.abs_path)
+        stat = path.stat()
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        prepared = PreparedFile(
+            stored_path=task.stored_path,
+            content_hash=content_hash(content),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+        if prepared.content_hash != task.known_hash:
+            prepared.chunks = _worker_chunker.chunk_file(
+                content=content,
+                file_path=task.stored_path
+            )
+        return prepared
+
+    except Exception as e:
+        return PreparedFile(stored_path=task.stored_path, error=str(e))
+
+
+class _InlineExecutor:
+    """Executor stand-in that runs work in the calling process."""
+
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait: bool = True):
+        pass
+
+
+@dataclass
+class _PendingFile:
+    """A file update waiting for its chunks to be embedded and written."""
+    update: FileUpdate
+    remaining: int  # chunks not yet embedded
+
+
+@dataclass
+class _EmbeddingBatch:
+    """Chunks (with their owning files) sent in one embedding request."""
+    chunks: List[CodeChunk] = field(default_factory=list)
+    owners: List[_PendingFile] = field(default_factory=list)
+    tokens: int = 0
+
+
+class PipelinedIndexer:
+    """
+    Indexes many files with overlapping read/chunk, embed and write stages.
+    """
+
+    def __init__(self,
+                 service: "RAGService",
+                 max_workers: Optional[int] = None,
+                 max_inflight_requests: int = 4,
+                 max_batch_tokens: int = 100_000,
+                 max_batch_size: int = 256,
+                 write_batch_size: int = 512,
+                 max_pending_chunks: int = 8192,
+                 min_files_for_pool: int = 16):
+        """
+        Initialize the indexer.
+
+        Args:
+            service: RAG service whose components are used
+            max_workers: Worker processes for reading/chunking (None for cpu_count)
+            max_inflight_requests: Concurrent embedding requests
+            max_batch_tokens: Approximate token budget per embedding request
+            max_batch_size: Maximum texts per embedding request
+            write_batch_size: Chunks per vector store write
+            max_pending_chunks: Chunks buffered between stages before the
+                reading stage is paused
+            min_files_for_pool: Below this many files, chunk in-process
+        """
+        self.service = service
+        self.max_workers = max_workers or mp.cpu_count()
+        self.max_inflight_requests = max(1, max_inflight_requests)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.write_batch_size = write_batch_size
+        self.max_pending_chunks = max_pending_chunks
+        self.min_files_for_pool = min_files_for_pool
+
+    def index_files(self,
+                    files: List[Tuple[str, str]]) -> Tuple[Dict[str, int], IndexingStats]:
+        """
+        Index files through the pipeline.
+
+        Args:
+            files: List of (absolute path, stored path) pairs
+
+        Returns:
+            Tuple of (stored path -> chunk count, run statistics)
+        """
+        start_time = time.time()
+        self.stats = IndexingStats(files_total=len(files))
+        self.results: Dict[str, int] = {}
+
+        manifest = self.service.manifest
+        tasks = []
+
+        # Cheap stat check on the main thread before any file is read
+        for abs_path, stored_path in files:
+            record = manifest.get(stored_path)
+            try:
+                stat = Path(abs_path).stat()
+            except OSError as e:
+                logger.error(f"Error indexing file {abs_path}: {e}")
+                self.results[stored_path] = 0
+                self.stats.files_failed += 1
+                continue
+
+            if record and record.matches_stat(stat.st_mtime_ns, stat.st_size):
+                self.results[stored_path] = len(record.chunks)
+                self.stats.files_unchanged += 1
+            else:
+                tasks.append(PrepareTask(
+                    abs_path=abs_path,
+                    stored_path=stored_path,
+                    known_hash=record.content_hash if record else ""
+                ))
+
+        # Files without a usable record are diffed against the store by
+        # chunk id; look up their stored chunks in bulk up front
+        stored_files = self.service.vector_store.file_chunk_counts()
+        self._stored_ids = self.service.vector_store.ids_for_files([
+            task.stored_path for task in tasks
+            if not task.known_hash and task.stored_path in stored_files
+        ])
+
+        if tasks:
+            self._run(tasks)
+
+        self.stats.duration = time.time() - start_time
+        return self.results, self.stats
+
+    def _run(self, tasks: List[PrepareTask]):
+        """Drive the three stages until every task is written."""
+        if self.max_workers > 1 and len(tasks) >= self.min_files_for_pool:
+            prepare_pool = ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(tasks)),
+                initializer=_init_prepare_worker,
+                initargs=(self.service.chunker,)
+            )
+        else:
+            _init_prepare_worker(self.service.chunker)
+            prepare_pool = _InlineExecutor()
+
+        embed_pool = ThreadPoolExecutor(max_workers=self.max_inflight_requests)
+
+        queue: Deque[PrepareTask] = deque(tasks)
+        preparing: Dict[Future, PrepareTask] = {}
+        embedding: Dict[Future, _EmbeddingBatch] = {}
+        self._batch = _EmbeddingBatch()
+        self._ready: List[FileUpdate] = []
+        self._ready_chunks = 0
+        self._pending_chunks = 0
+
+        max_preparing = self.max_workers * 2
+
+        try:
+            while queue or preparing or embedding or self._batch.chunks or self._ready:
+                # Stage 1: keep the process pool busy unless downstream is full
+                while (queue and len(preparing) < max_preparing
+                       and self._pending_chunks < self.max_pending_chunks):
+                    task = queue.popleft()
+                    preparing[prepare_pool.submit(prepare_file_worker, task)] = task
+
+                # Flush a partial batch once nothing else can fill it
+                if self._batch.chunks and (not preparing or
+                                           self._pending_chunks >= self.max_pending_chunks):
+                    self._submit_batch(embed_pool, embedding)
+
+                # Stage 3: write whatever is ready
+                if self._ready and (self._ready_chunks >= self.write_batch_size
+                                    or not (preparing or embedding)):
+                    self._write_ready()
+                    continue
+
+                if not (preparing or embedding):
+                    continue
+
+                done, _ = wait(
+                    list(preparing) + list(embedding),
+                    return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    if future in preparing:
+                        preparing.pop(future)
+                        self._handle_prepared(future.result(), embed_pool, embedding)
+                    else:
+                        self._handle_embedded(future, embedding.pop(future))
+        finally:
+            prepare_pool.shutdown(wait=True)
+            embed_pool.shutdown(wait=True)
+
+    def _handle_prepared(self,
+                         prepared: PreparedFile,
+                         embed_pool: ThreadPoolExecutor,
+                         embedding: Dict[Future, _EmbeddingBatch]):
+        """Plan the update for a chunked file and queue its new chunks."""
+        manifest = self.service.manifest
+        record = manifest.get(prepared.stored_path)
+
+        if prepared.error:
+            logger.error(f"Error indexing file {prepared.stored_path}: {prepared.error}")
+            self.results[prepared.stored_path] = 0
+            self.stats.files_failed += 1
+            return
+
+        if prepared.chunks is None:
+            # Touched but not modified
+            record.mtime_ns, record.size = prepared.mtime_ns, prepared.size
+            manifest.set(record)
+            self.results[prepared.stored_path] = len(record.chunks)
+            self.stats.files_unchanged += 1
+            return
+
+        update = plan_file_update(
+            record, prepared.stored_path, prepared.content_hash,
+            prepared.mtime_ns, prepared.size, prepared.chunks
+        )
+        self.service._reconcile_with_store([update], self._stored_ids)
+        pending = _PendingFile(update=update, remaining=len(update.new_chunks))
+        self._pending_chunks += len(update.new_chunks)
+
+        if not update.new_chunks or not self.service.embedding_service.enabled:
+            self._mark_ready(update)
+            return
+
+        for chunk in update.new_chunks:
+            tokens = len(chunk.text_for_embedding) // 4 + 1
+            if self._batch.chunks and (
+                self._batch.tokens + tokens > self.max_batch_tokens
+                or len(self._batch.chunks) >= self.max_batch_size
+            ):
+                self._submit_batch(embed_pool, embedding)
+            self._batch.chunks.append(chunk)
+            self._batch.owners.append(pending)
+            self._batch.tokens += tokens
+
+    def _submit_batch(self,
+                      embed_pool: ThreadPoolExecutor,
+                      embedding: Dict[Future, _EmbeddingBatch]):
+        """Send the current batch, waiting if too many requests are in flight."""
+        while len(embedding) >= self.max_inflight_requests:
+            done, _ = wait(list(embedding), return_when=FIRST_COMPLETED)
+            for future in done:
+                self._handle_embedded(future, embedding.pop(future))
+
+        batch, self._batch = self._batch, _EmbeddingBatch()
+        texts = [chunk.text_for_embedding for chunk in batch.chunks]
+        future = embed_pool.submit(self.service.embedding_service.embed_batch, texts)
+        embedding[future] = batch
+        self.stats.embedding_requests += 1
+
+    def _handle_embedded(self, future: Future, batch: _EmbeddingBatch):
+        """Attach embeddings and release files whose chunks are all embedded."""
+        try:
+            embeddings = future.result()
+        except Exception as e:
+            logger.error(f"Error generating batch embeddings: {e}")
+            embeddings = [None] * len(batch.chunks)
+
+        for chunk, owner, embedding in zip(batch.chunks, batch.owners, embeddings):
+            chunk.embedding = embedding
+            if embedding is not None:
+                self.stats.chunks_embedded += 1
+            owner.remaining -= 1
+            if owner.remaining == 0:
+                self._mark_ready(owner.update)
+
+    def _mark_ready(self, update: FileUpdate):
+        """Queue a fully embedded file update for writing."""
+        self._ready.append(update)
+        self._ready_chunks += len(update.new_chunks)
+
+    def _write_ready(self):
+        """Write ready file updates to the vector store in one batch."""
+        updates, self._ready = self._ready, []
+        self._pending_chunks -= self._ready_chunks
+        self._ready_chunks = 0
+
+        service = self.service
+        service._delete_stale_chunks(updates)
+
+        new_chunks = [chunk for update in updates for chunk in update.new_chunks]
+        added = service.vector_store.upsert_chunks(new_chunks)
+        stored = sum(1 for chunk in new_chunks if chunk.embedding is not None)
+        self.stats.chunks_written += added
+
+        for update in updates:
+            # upsert_chunks writes all embedded chunks or none of them
+            written = sum(1 for c in update.new_chunks if c.embedding is not None)
+            record = update.to_record(written if added == stored else 0)
+            service.manifest.set(record)
+            self.results[update.path] = len(record.chunks)
+            self.stats.files_indexed += 1
+
+        # Commit the bookkeeping together with the write it describes
+        service.manifest.flush()
+        service._index_changed()
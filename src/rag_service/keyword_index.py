@@ -0,0 +1,482 @@
+"""
+Persistent inverted index for keyword search in the RAG service.
+
+Documents are tokenized with an identifier-aware tokenizer (camelCase and
+snake_case identifiers are indexed both whole and split into their parts),
+stored as postings lists in SQLite next to the vector store, and ranked
+with BM25. The index is maintained incrementally as chunks are added and
+deleted, so keyword queries never need to materialize the corpus. Chunk
+counts per file, language and chunk type are maintained alongside, which
+makes index statistics exact without scanning the store.
+"""
+
+import heapq
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models import CodeChunk
+
+logger = logging.getLogger(__name__)
+
+
+# Identifiers (including snake_case) and standalone numbers
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+
+# Pieces of a camelCase / PascalCase identifier ("HTTPServerError" ->
+# "HTTP", "Server", "Error")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+# Metadata fields that can be used to filter keyword queries
+FILTER_FIELDS = ("file_path", "language", "chunk_type")
+
+# Metadata field holding the git blob a chunk was indexed from. Chunks of
+# the working tree have none, so filtering on None excludes indexed refs.
+SCOPE_FIELD = "blob_sha"
+
+_MIN_TOKEN_LENGTH = 2
+
+
+def _count_key(value: Any) -> str:
+    """Counter key for a metadata value (missing values count as "unknown")."""
+    return "unknown" if value is None else str(getattr(value, "value", value))
+
+
+def scope_condition(column: str, value: Any) -> Tuple[str, List[Any]]:
+    """
+    Build an SQL condition restricting a query to a ref scope.
+
+    Args:
+        column: Column holding the blob sha
+        value: Blob shas to match (a string, or any iterable of them),
+            or None for working tree chunks only
+
+    Returns:
+        (condition, params) tuple
+    """
+    if value is None:
+        return f"{column} IS NULL", []
+    values = [value] if isinstance(value, str) else list(value)
+    # One JSON parameter, as a ref can hold more blobs than SQLite allows variables
+    return f"{column} IN (SELECT value FROM json_each(?))", [json.dumps(values)]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for keyword indexing.
+
+    Every identifier is emitted lowercased as a whole, followed by its
+    camelCase/snake_case parts, so that ``parseHttpRequest`` matches
+    queries for ``parsehttprequest``, ``parse``, ``http`` and ``request``.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens (with repetitions)
+    """
+    tokens = []
+
+    for identifier in _IDENTIFIER_RE.findall(text):
+        whole = identifier.lower()
+        if len(whole) >= _MIN_TOKEN_LENGTH:
+            tokens.append(whole)
+
+        parts = [
+            part.lower()
+            for piece in identifier.split("_")
+            for part in _CAMEL_RE.findall(piece)
+        ]
+        if len(parts) > 1:
+            tokens.extend(
+                part for part in parts
+                if len(part) >= _MIN_TOKEN_LENGTH and part != whole
+            )
+
+    return tokens
+
+
+class KeywordIndex:
+    """
+    BM25 keyword index backed by SQLite postings lists.
+
+    The index stores one row per (term, chunk) pair plus per-chunk length
+    and filter metadata. Corpus statistics (document count and total
+    length) are kept in memory and updated incrementally.
+    """
+
+    def __init__(self,
+                 db_path: Optional[str] = None,
+                 k1: float = 1.2,
+                 b: float = 0.75):
+        """
+        Initialize the keyword index.
+
+        Args:
+            db_path: Path to the SQLite database (None for in-memory)
+            k1: BM25 term frequency saturation parameter
+            b: BM25 length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self.db_path = str(db_path)
+        else:
+            self.db_path = ":memory:"
+
+        # Searches may run on worker threads, so share one connection
+        # guarded by a lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._create_schema()
+
+        row = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents"
+        ).fetchone()
+        self._doc_count, self._total_length = row[0], row[1]
+
+        # Chunk counts per filter field value, mirrored from field_counts
+        self._field_counts: Dict[str, Counter] = {f: Counter() for f in FILTER_FIELDS}
+        for field, value, count in self._conn.execute(
+            "SELECT field, value, count FROM field_counts"
+        ):
+            self._field_counts[field][value] = count
+
+    def _create_schema(self):
+        """Create tables and indexes if they do not exist."""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            has_counts = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'field_counts'"
+            ).fetchone()
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    chunk_id TEXT PRIMARY KEY,
+                    file_path TEXT,
+                    language TEXT,
+                    chunk_type TEXT,
+                    length INTEGER NOT NULL,
+                    blob_sha TEXT
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS documents_file_path "
+                "ON documents(file_path)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, chunk_id)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS postings_chunk_id "
+                "ON postings(chunk_id)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS field_counts (
+                    field TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (field, value)
+                ) WITHOUT ROWID
+                """
+            )
+            if not has_counts:
+                # Indexes created before counters existed: count once
+                for field in FILTER_FIELDS:
+                    self._conn.executemany(
+                        "INSERT INTO field_counts VALUES (?, ?, ?) "
+                        "ON CONFLICT(field, value) DO UPDATE SET count = count + excluded.count",
+                        [
+                            (field, _count_key(value), count)
+                            for value, count in self._conn.execute(
+                                f"SELECT {field}, COUNT(*) FROM documents GROUP BY {field}"
+                            )
+                        ]
+                    )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+            if SCOPE_FIELD not in columns:
+                # Indexes created before ref scoping do not know which chunks
+                # came from refs: empty them so the store rebuilds them
+                self._conn.execute(f"ALTER TABLE documents ADD COLUMN {SCOPE_FIELD} TEXT")
+                self._conn.execute("DELETE FROM postings")
+                self._conn.execute("DELETE FROM documents")
+                self._conn.execute("DELETE FROM field_counts")
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    def add_chunks(self, chunks: Iterable[CodeChunk]) -> int:
+        """
+        Index code chunks, replacing any existing entries with the same id.
+
+        Args:
+            chunks: Chunks to index
+
+        Returns:
+            Number of chunks indexed
+        """
+        documents = []
+        for chunk in chunks:
+            documents.append((
+                chunk.id,
+                chunk.content,
+                {
+                    "file_path": chunk.file_path,
+                    "language": chunk.language,
+                    "chunk_type": getattr(chunk.chunk_type, "value", chunk.chunk_type),
+                    SCOPE_FIELD: chunk.metadata.get(SCOPE_FIELD),
+                },
+            ))
+        return self.add_documents(documents)
+
+    def add_documents(self,
+                      documents: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """
+        Index raw documents.
+
+        Args:
+            documents: Iterable of (chunk_id, text, metadata) tuples
+
+        Returns:
+            Number of documents indexed
+        """
+        doc_rows = []
+        posting_rows = []
+
+        for chunk_id, text, metadata in documents:
+            term_counts = Counter(tokenize(text or ""))
+            doc_rows.append((
+                chunk_id,
+                metadata.get("file_path"),
+                metadata.get("language"),
+                metadata.get("chunk_type"),
+                sum(term_counts.values()),
+                metadata.get(SCOPE_FIELD),
+            ))
+            posting_rows.extend(
+                (term, chunk_id, tf) for term, tf in term_counts.items()
+            )
+
+        if not doc_rows:
+            return 0
+
+        with self._lock, self._conn:
+            # Drop stale postings for re-indexed ids so statistics stay exact
+            self._remove_ids_locked([row[0] for row in doc_rows])
+            self._conn.executemany(
+                "INSERT INTO documents (chunk_id, file_path, language, chunk_type, "
+                "length, blob_sha) VALUES (?, ?, ?, ?, ?, ?)",
+                doc_rows
+            )
+            self._conn.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?)", posting_rows
+            )
+            self._update_field_counts([row[1:4] for row in doc_rows], 1)
+            self._doc_count += len(doc_rows)
+            self._total_length += sum(row[4] for row in doc_rows)
+
+        return len(doc_rows)
+
+    def remove_ids(self, chunk_ids: List[str]) -> int:
+        """
+        Remove documents by chunk id.
+
+        Args:
+            chunk_ids: Ids of the chunks to remove
+
+        Returns:
+            Number of documents removed
+        """
+        if not chunk_ids:
+            return 0
+        with self._lock, self._conn:
+            return self._remove_ids_locked(chunk_ids)
+
+    def remove_file(self, file_path: str) -> int:
+        """
+        Remove all documents belonging to a file.
+
+        Args:
+            file_path: Stored path of the file
+
+        Returns:
+            Number of documents removed
+        """
+        with self._lock, self._conn:
+            ids = [
+                row[0] for row in self._conn.execute(
+                    "SELECT chunk_id FROM documents WHERE file_path = ?",
+                    (file_path,)
+                )
+            ]
+            return self._remove_ids_locked(ids)
+
+    def _remove_ids_locked(self, chunk_ids: List[str]) -> int:
+        """Remove documents; caller must hold the lock and a transaction."""
+        removed = 0
+        for start in range(0, len(chunk_ids), 500):
+            batch = chunk_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT file_path, language, chunk_type, length FROM documents "
+                f"WHERE chunk_id IN ({placeholders})",
+                batch
+            ).fetchall()
+            if not rows:
+                continue
+            self._conn.execute(
+                f"DELETE FROM postings WHERE chunk_id IN ({placeholders})", batch
+            )
+            self._conn.execute(
+                f"DELETE FROM documents WHERE chunk_id IN ({placeholders})", batch
+            )
+            self._update_field_counts([row[:3] for row in rows], -1)
+            removed += len(rows)
+            self._doc_count -= len(rows)
+            self._total_length -= sum(row[3] for row in rows)
+        return removed
+
+    def _update_field_counts(self, rows: List[Tuple[Any, ...]], sign: int):
+        """Apply (file_path, language, chunk_type) rows to the field counters."""
+        deltas = Counter()
+        for row in rows:
+            for field, value in zip(FILTER_FIELDS, row):
+                deltas[(field, _count_key(value))] += sign
+
+        for (field, value), delta in deltas.items():
+            counts = self._field_counts[field]
+            counts[value] += delta
+            if counts[value] <= 0:
+                del counts[value]
+
+        self._conn.executemany(
+            "INSERT INTO field_counts VALUES (?, ?, ?) "
+            "ON CONFLICT(field, value) DO UPDATE SET count = count + excluded.count",
+            [(field, value, delta) for (field, value), delta in deltas.items()]
+        )
+        self._conn.execute("DELETE FROM field_counts WHERE count <= 0")
+
+    def field_counts(self, field: str) -> Dict[str, int]:
+        """
+        Get the number of indexed chunks per value of a metadata field.
+
+        Args:
+            field: One of FILTER_FIELDS
+
+        Returns:
+            Dictionary of value -> chunk count
+        """
+        with self._lock:
+            return dict(self._field_counts[field])
+
+    def search(self,
+               query: str,
+               k: int = 10,
+               filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Rank documents against a query with BM25.
+
+        Args:
+            query: Search query
+            k: Number of results
+            filters: Optional equality filters on file_path, language
+                or chunk_type (a list value matches any of its items), and
+                a ref scope on blob_sha (see scope_condition)
+
+        Returns:
+            List of (chunk_id, score) tuples, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+
+        where, params = self._filter_clause(filters)
+
+        with self._lock:
+            if not self._doc_count:
+                return []
+
+            doc_count = self._doc_count
+            avg_length = self._total_length / doc_count or 1.0
+            scores: Dict[str, float] = {}
+
+            for term in terms:
+                df = self._conn.execute(
+                    "SELECT COUNT(*) FROM postings WHERE term = ?", (term,)
+                ).fetchone()[0]
+                if not df:
+                    continue
+
+                idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+                rows = self._conn.execute(
+                    "SELECT p.chunk_id, p.tf, d.length FROM postings p "
+                    "JOIN documents d ON d.chunk_id = p.chunk_id "
+                    f"WHERE p.term = ?{where}",
+                    [term] + params
+                )
+                for chunk_id, tf, length in rows:
+                    norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[chunk_id] = (
+                        scores.get(chunk_id, 0.0)
+                        + idf * tf * (self.k1 + 1) / (tf + norm)
+                    )
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    @staticmethod
+    def _filter_clause(filters: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """Build an SQL condition suffix for metadata filters."""
+        clauses = []
+        params: List[Any] = []
+
+        for key, value in (filters or {}).items():
+            if key == SCOPE_FIELD:
+                clause, values = scope_condition(f"d.{key}", value)
+                clauses.append(clause)
+                params.extend(values)
+                continue
+            if key not in FILTER_FIELDS:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                clauses.append(f"d.{key} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"d.{key} = ?")
+                params.append(value)
+
+        where = "".join(f" AND {clause}" for clause in clauses)
+        return where, params
+
+    def clear(self):
+        """Remove every document from the index."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM field_counts")
+            for counts in self._field_counts.values():
+                counts.clear()
+            self._doc_count = 0
+            self._total_length = 0
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
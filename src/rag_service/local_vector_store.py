@@ -0,0 +1,540 @@
+"""
+Local vector store backend built on NumPy.
+
+Vectors are L2-normalized and kept on disk twice, both memory-mapped:
+
+- ``<collection>.i8``: int8 rows with a per-row scale, scanned for candidates
+- ``<collection>.f32``: float32 rows, read only to re-rank the shortlist
+
+Scanning touches the int8 rows only, a quarter of the float32 footprint.
+Once the store holds ``ivf_min_rows`` vectors an IVF index (spherical
+k-means centroids) restricts the scan to the ``nprobe`` closest lists.
+Documents and metadata live in SQLite; the filterable fields are mirrored
+in memory as integer codes so that filters are applied as vector masks.
+"""
+
+import json
+import logging
+import shutil
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .keyword_index import FILTER_FIELDS, SCOPE_FIELD
+from .models import CodeChunk
+from .vector_store import BaseVectorStore
+
+logger = logging.getLogger(__name__)
+
+
+_INITIAL_CAPACITY = 1024
+_SCAN_BLOCK = 65536
+
+# Fields mirrored as integer codes for filtering; the ref scope field lives
+# only in the stored metadata
+_CODED_FIELDS = (*FILTER_FIELDS, SCOPE_FIELD)
+
+
+def _field_value(value: Any) -> str:
+    """Normalize a filter field value (enums store their value)."""
+    return str(getattr(value, "value", value) or "")
+
+
+class LocalVectorStore(BaseVectorStore):
+    """
+    Vector store with int8-quantized vectors, IVF and exact re-ranking.
+    """
+
+    backend = "local"
+
+    def __init__(self,
+                 persist_directory: Optional[str] = None,
+                 collection_name: str = "code_chunks",
+                 nlist: Optional[int] = None,
+                 nprobe: int = 16,
+                 ivf_min_rows: int = 20_000,
+                 rerank_factor: int = 4):
+        """
+        Initialize the vector store.
+
+        Args:
+            persist_directory: Directory for persistence (None for a temporary store)
+            collection_name: Name of the collection
+            nlist: Number of IVF lists (defaults to sqrt of the row count)
+            nprobe: Number of IVF lists scanned per query
+            ivf_min_rows: Row count from which the IVF index is built
+            rerank_factor: Shortlist size as a multiple of k for exact re-ranking
+        """
+        super().__init__(persist_directory, collection_name)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+        self.rerank_factor = rerank_factor
+
+        # Temporary stores own their directory and remove it on close
+        self._temp_dir = None if self.persist_directory else Path(tempfile.mkdtemp(prefix="rag-vectors-"))
+        data_dir = self.persist_directory or self._temp_dir
+        self._f32_path = data_dir / f"{collection_name}.f32"
+        self._i8_path = data_dir / f"{collection_name}.i8"
+        self._ivf_path = data_dir / f"{collection_name}.ivf.npy"
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(data_dir / f"{collection_name}.db") if self.persist_directory else ":memory:",
+            check_same_thread=False
+        )
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    row INTEGER PRIMARY KEY,
+                    id TEXT UNIQUE NOT NULL,
+                    document TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    file_path TEXT,
+                    language TEXT,
+                    chunk_type TEXT,
+                    scale REAL NOT NULL,
+                    list_id INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS chunks_file ON chunks(file_path)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        self.dimension: Optional[int] = int(meta["dimension"]) if "dimension" in meta else None
+        self._trained_rows = int(meta.get("trained_rows", 0))
+
+        # Row bookkeeping, mirrored from SQLite
+        self._capacity = 0
+        self._f32: Optional[np.memmap] = None
+        self._i8: Optional[np.memmap] = None
+        self._ids: List[Optional[str]] = []
+        self._row_of: Dict[str, int] = {}
+        self._free_rows: List[int] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._codes = {f: np.zeros(0, dtype=np.int32) for f in _CODED_FIELDS}
+        self._vocab: Dict[str, Dict[str, int]] = {f: {} for f in _CODED_FIELDS}
+
+        # IVF centroids and the inverted lists derived from row assignments
+        self._centroids: Optional[np.ndarray] = None
+        self._inverted: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        self._load()
+        self._init_keyword_index()
+        self._init_symbol_index()
+
+    # Storage
+
+    def _load(self):
+        """Load row bookkeeping and IVF centroids from disk."""
+        rows = self._conn.execute(
+            "SELECT row, id, file_path, language, chunk_type, "
+            f"json_extract(metadata, '$.{SCOPE_FIELD}'), scale, list_id FROM chunks"
+        ).fetchall()
+        if self.dimension is None:
+            return
+
+        next_row = max((r[0] for r in rows), default=-1) + 1
+        self._ensure_capacity(next_row)
+        self._ids = [None] * next_row
+        for row, chunk_id, file_path, language, chunk_type, blob_sha, scale, list_id in rows:
+            self._ids[row] = chunk_id
+            self._row_of[chunk_id] = row
+            self._alive[row] = True
+            self._scales[row] = scale
+            self._lists[row] = list_id
+            for field, value in zip(_CODED_FIELDS, (file_path, language, chunk_type, blob_sha)):
+                self._codes[field][row] = self._code(field, value)
+        self._free_rows = [row for row in range(next_row) if self._ids[row] is None]
+
+        if self._ivf_path.exists():
+            self._centroids = np.load(self._ivf_path)
+
+    def _ensure_capacity(self, rows: int):
+        """Grow the vector files and row arrays to hold rows entries."""
+        if rows <= self._capacity and self._f32 is not None:
+            return
+
+        dim = self.dimension
+        on_disk = self._f32_path.stat().st_size // (dim * 4) if self._f32_path.exists() else 0
+        capacity = max(self._capacity, on_disk, _INITIAL_CAPACITY)
+        while capacity < rows:
+            capacity *= 2
+
+        for path, itemsize in ((self._f32_path, 4), (self._i8_path, 1)):
+            with open(path, "ab") as f:
+                f.truncate(capacity * dim * itemsize)
+        self._f32 = np.memmap(self._f32_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+        self._i8 = np.memmap(self._i8_path, dtype=np.int8, mode="r+", shape=(capacity, dim))
+
+        grow = capacity - len(self._alive)
+        if grow > 0:
+            self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+            self._scales = np.concatenate([self._scales, np.zeros(grow, dtype=np.float32)])
+            self._lists = np.concatenate([self._lists, np.full(grow, -1, dtype=np.int32)])
+            for field in _CODED_FIELDS:
+                self._codes[field] = np.concatenate(
+                    [self._codes[field], np.full(grow, -1, dtype=np.int32)]
+                )
+        self._capacity = capacity
+
+    def _code(self, field: str, value: Any) -> int:
+        """Get the integer code of a filter field value."""
+        vocab = self._vocab[field]
+        return vocab.setdefault(_field_value(value), len(vocab))
+
+    def _allocate_row(self) -> int:
+        """Get a free row, reusing deleted rows first."""
+        if self._free_rows:
+            return self._free_rows.pop()
+        self._ids.append(None)
+        return len(self._ids) - 1
+
+    def _add(self, ids, embeddings, metadatas, documents):
+        """Store records, replacing existing records with the same ids."""
+        # Last occurrence wins for ids repeated within the batch
+        latest = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        order = sorted(latest.values())
+
+        vectors = np.asarray([embeddings[i] for i in order], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta VALUES ('dimension', ?)",
+                        (str(self.dimension),)
+                    )
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"store dimension {self.dimension}"
+                )
+
+            rows = []
+            for i in order:
+                row = self._row_of.get(ids[i])
+                rows.append(self._allocate_row() if row is None else row)
+            row_index = np.asarray(rows)
+            self._ensure_capacity(int(row_index.max()) + 1)
+
+            # Vectors first, so committed rows always have their vectors
+            self._f32[row_index] = vectors
+            self._i8[row_index] = quantized
+            self._f32.flush()
+            self._i8.flush()
+
+            lists = (
+                self._assign_lists(vectors) if self._centroids is not None
+                else np.full(len(rows), -1, dtype=np.int32)
+            )
+
+            records = []
+            for j, i in enumerate(order):
+                row, metadata = rows[j], metadatas[i]
+                self._ids[row] = ids[i]
+                self._row_of[ids[i]] = row
+                self._alive[row] = True
+                self._scales[row] = scales[j]
+                self._lists[row] = lists[j]
+                fields = [_field_value(metadata.get(f)) for f in FILTER_FIELDS]
+                for field in _CODED_FIELDS:
+                    self._codes[field][row] = self._code(field, metadata.get(field))
+                records.append((
+                    row, ids[i], documents[i], json.dumps(metadata), *fields,
+                    float(scales[j]), int(lists[j])
+                ))
+            self._inverted = None
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    records
+                )
+
+            live = len(self._row_of)
+            if live >= self.ivf_min_rows and live >= 4 * self._trained_rows:
+                self.build_index()
+
+    def _delete(self, chunk_ids: List[str]):
+        """Delete records by id."""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                row = self._row_of.pop(chunk_id, None)
+                if row is None:
+                    continue
+                self._ids[row] = None
+                self._alive[row] = False
+                self._free_rows.append(row)
+
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM chunks WHERE id = ?", [(i,) for i in chunk_ids]
+                )
+
+    def _get_collection_meta(self) -> Dict[str, str]:
+        """Get embedding metadata from the meta table."""
+        with self._lock:
+            meta = dict(self._conn.execute(
+                "SELECT key, value FROM meta WHERE key IN "
+                "('embedding_model', 'embedding_dimension', 'dimension')"
+            ))
+        # Stores created before the model was recorded still know their dimension
+        dimension = meta.pop("dimension", None)
+        if dimension is not None:
+            meta.setdefault("embedding_dimension", dimension)
+        return meta
+
+    def _set_collection_meta(self, meta: Dict[str, str]):
+        """Store embedding metadata in the meta table."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", list(meta.items())
+            )
+
+    # IVF index
+
+    def build_index(self, iterations: int = 10, seed: int = 0):
+        """
+        (Re)build the IVF index with spherical k-means over a sample.
+
+        Args:
+            iterations: k-means iterations
+            seed: Random seed for sampling and initialization
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._alive)
+            if rows.size == 0:
+                return
+
+            nlist = min(self.nlist or max(1, int(np.sqrt(rows.size))), rows.size)
+            rng = np.random.default_rng(seed)
+            sample = np.sort(rng.choice(rows, min(rows.size, nlist * 64), replace=False))
+            data = np.asarray(self._f32[sample])
+
+            centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assign = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, data)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # Empty lists keep their previous centroid
+                centroids = np.where(norms > 0, sums / np.where(norms == 0, 1.0, norms), centroids)
+
+            self._centroids = centroids.astype(np.float32)
+            for start in range(0, rows.size, _SCAN_BLOCK):
+                block = rows[start:start + _SCAN_BLOCK]
+                self._lists[block] = self._assign_lists(np.asarray(self._f32[block]))
+            self._inverted = None
+            self._trained_rows = int(rows.size)
+
+            np.save(self._ivf_path, self._centroids)
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE chunks SET list_id = ? WHERE row = ?",
+                    [(int(self._lists[row]), int(row)) for row in rows]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('trained_rows', ?)",
+                    (str(self._trained_rows),)
+                )
+            logger.info(f"Built IVF index with {nlist} lists over {rows.size} vectors")
+
+    def _assign_lists(self, vectors: np.ndarray) -> np.ndarray:
+        """Assign normalized vectors to their closest IVF list."""
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _probe(self, query: np.ndarray) -> np.ndarray:
+        """Get the rows in the IVF lists closest to the query."""
+        if self._inverted is None:
+            used = len(self._ids)
+            order = np.argsort(self._lists[:used], kind="stable").astype(np.int64)
+            bounds = np.searchsorted(
+                self._lists[:used][order], np.arange(len(self._centroids) + 1)
+            )
+            self._inverted = (order, bounds)
+
+        order, bounds = self._inverted
+        nprobe = min(self.nprobe, len(self._centroids))
+        probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([order[bounds[p]:bounds[p + 1]] for p in probe])
+
+    # Search
+
+    def _filter_mask(self, rows: Optional[np.ndarray], filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Get the alive-and-matching mask for rows (all rows if None)."""
+        alive = self._alive[:len(self._ids)] if rows is None else self._alive[rows]
+        mask = alive.copy()
+        for key, value in (filters or {}).items():
+            if key not in _CODED_FIELDS:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            codes = [
+                self._vocab[key][_field_value(v)] for v in values
+                if _field_value(v) in self._vocab[key]
+            ]
+            column = self._codes[key][:len(self._ids)] if rows is None else self._codes[key][rows]
+            mask &= np.isin(column, codes)
+        return mask
+
+    def _candidates(self, query: np.ndarray, k: int, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Select the rows to scan for a query."""
+        if self._centroids is not None:
+            rows = self._probe(query)
+            rows = rows[self._filter_mask(rows, filters)]
+            if rows.size >= k:
+                return rows
+            # Selective filters: scan every matching row instead
+        return np.flatnonzero(self._filter_mask(None, filters))
+
+    def search(self,
+               query_embedding: List[float],
+               k: int = 10,
+               filters: Optional[Dict[str, Any]] = None) -> List[Tuple[CodeChunk, float]]:
+        """
+        Search for similar code chunks.
+
+        Candidates are scored on the int8 vectors, then the best
+        ``rerank_factor * k`` are re-ranked with the float32 vectors.
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            filters: Optional metadata filters (list values match any item)
+
+        Returns:
+            List of (chunk, score) tuples, score being cosine similarity
+        """
+        try:
+            with self._lock:
+                if self.dimension is None or not self._row_of or k <= 0:
+                    return []
+
+                query = np.asarray(query_embedding, dtype=np.float32)
+                query = query / (np.linalg.norm(query) or 1.0)
+
+                candidates = self._candidates(query, k, filters)
+                if candidates.size == 0:
+                    return []
+
+                approx = np.empty(candidates.size, dtype=np.float32)
+                for start in range(0, candidates.size, _SCAN_BLOCK):
+                    block = candidates[start:start + _SCAN_BLOCK]
+                    approx[start:start + len(block)] = (
+                        self._i8[block].astype(np.float32) @ query
+                    ) * self._scales[block]
+
+                size = min(candidates.size, k * self.rerank_factor)
+                shortlist = np.sort(candidates[np.argpartition(-approx, size - 1)[:size]])
+                exact = np.asarray(self._f32[shortlist]) @ query
+                best = np.argsort(-exact)[:k]
+                hits = [(self._ids[shortlist[i]], float(exact[i])) for i in best]
+
+            records = self.get_records([chunk_id for chunk_id, _ in hits])
+            return [
+                (self._chunk_from_record(chunk_id, *records[chunk_id]), score)
+                for chunk_id, score in hits if chunk_id in records
+            ]
+
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}")
+            return []
+
+    # Records
+
+    def get_records(self, chunk_ids: Sequence[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Get (document, metadata) for the stored chunks among chunk_ids."""
+        records = {}
+        chunk_ids = list(chunk_ids)
+        with self._lock:
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                for chunk_id, document, metadata in self._conn.execute(
+                    f"SELECT id, document, metadata FROM chunks "
+                    f"WHERE id IN ({','.join('?' * len(batch))})",
+                    batch
+                ):
+                    records[chunk_id] = (document, json.loads(metadata))
+        return records
+
+    def _ids_for_files(self, file_paths: List[str]) -> Dict[str, List[str]]:
+        """Get the ids of the working-tree chunks stored for each of the files."""
+        ids_by_file: Dict[str, List[str]] = {}
+        with self._lock:
+            for file_path, chunk_id in self._conn.execute(
+                f"SELECT file_path, id FROM chunks "
+                f"WHERE file_path IN ({','.join('?' * len(file_paths))}) "
+                f"AND json_extract(metadata, '$.{SCOPE_FIELD}') IS NULL",
+                file_paths
+            ):
+                ids_by_file.setdefault(file_path, []).append(chunk_id)
+        return ids_by_file
+
+    def count(self) -> int:
+        """Get the number of stored chunks."""
+        return len(self._row_of)
+
+    def _iter_records(self,
+                      page_size: int = 1000,
+                      documents: bool = True) -> Iterator[Tuple[List[str], List[Optional[str]], List[Dict[str, Any]]]]:
+        """Iterate over (ids, documents, metadatas) pages of all records."""
+        last_row = -1
+        document_column = "document" if documents else "NULL"
+        while True:
+            with self._lock:
+                page = self._conn.execute(
+                    f"SELECT row, id, {document_column}, metadata FROM chunks "
+                    "WHERE row > ? ORDER BY row LIMIT ?",
+                    (last_row, page_size)
+                ).fetchall()
+            if not page:
+                return
+            last_row = page[-1][0]
+            yield (
+                [r[1] for r in page],
+                [r[2] for r in page],
+                [json.loads(r[3]) for r in page]
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about the vector store."""
+        stats = super().get_stats()
+        if stats:
+            stats.update({
+                "dimension": self.dimension,
+                "quantization": "int8",
+                "ivf_lists": len(self._centroids) if self._centroids is not None else 0,
+            })
+        return stats
+
+    def close(self):
+        """Flush vectors and close the database."""
+        with self._lock:
+            for vectors in (self._f32, self._i8):
+                if vectors is not None:
+                    vectors.flush()
+            self._conn.close()
+            if self._temp_dir is not None:
+                self._f32 = self._i8 = None
+                shutil.rmtree(self._temp_dir, ignore_errors=True)
+                self._temp_dir = None
+        super().close()
@@ -0,0 +1,588 @@
+"""
+Index manifest for incremental indexing.
+
+The manifest records, for every indexed file, the content hash, mtime and
+size seen at indexing time together with the ids and fingerprints of the
+chunks stored for it. This lets the RAG service skip unchanged files with
+a single ``stat`` call and re-embed only the chunks that changed. Records
+are persisted to SQLite with write-behind batching. Files indexed straight
+from the git object database are tracked per blob SHA instead, with a
+per-commit listing of their trees for ref-scoped search. A generation
+counter stored alongside is bumped by every change to the index.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .models import CodeChunk
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    """Hash file content for change detection."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def chunk_fingerprint(chunk: CodeChunk) -> str:
+    """
+    Fingerprint a chunk by everything that ends up in the vector store.
+
+    Two chunks with the same fingerprint have identical embeddings text and
+    metadata, so a stored chunk can be kept as-is.
+    """
+    digest = hashlib.sha256(chunk.text_for_embedding.encode("utf-8")).hexdigest()
+    return f"{digest[:32]}:{chunk.start_line}:{chunk.end_line}"
+
+
+def file_chunk_id(path: str, chunk: CodeChunk) -> str:
+    """
+    Deterministic id of a chunk of a working-tree file.
+
+    Built from the path, line span and a hash of the embedded text, so
+    re-chunking unchanged content yields the same ids and stored chunks can
+    be matched without the manifest.
+    """
+    digest = hashlib.sha256(chunk.text_for_embedding.encode("utf-8")).hexdigest()
+    return f"{path}:{chunk.start_line}:{chunk.end_line}:{digest[:16]}"
+
+
+@dataclass
+class FileRecord:
+    """Manifest entry for a single indexed file."""
+    path: str
+    content_hash: str
+    mtime_ns: int = 0
+    size: int = 0
+    chunks: Dict[str, str] = field(default_factory=dict)  # chunk id -> fingerprint
+
+    def matches_stat(self, mtime_ns: int, size: int) -> bool:
+        """Check whether file stat information is unchanged."""
+        return bool(self.content_hash) and self.mtime_ns == mtime_ns and self.size == size
+
+
+@dataclass
+class FileUpdate:
+    """Planned vector store changes for re-indexing one file."""
+    path: str
+    content_hash: str
+    mtime_ns: int
+    size: int
+    kept: Dict[str, str]  # stored chunk id -> fingerprint, left untouched
+    new_chunks: List[CodeChunk]  # chunks to embed and add
+    fingerprints: Dict[str, str]  # new chunk id -> fingerprint
+    stale_ids: List[str]  # stored chunk ids to delete
+    replace_all: bool = False  # prior state unknown, diff against the store before writing
+
+    def to_record(self, added: int) -> FileRecord:
+        """
+        Build the manifest record once the new chunks were written.
+
+        Files with chunks that could not be stored (no embedding, write
+        error) get no hash, so they are re-indexed on the next pass.
+        """
+        chunks = dict(self.kept)
+        chunks.update(
+            (chunk.id, self.fingerprints[chunk.id])
+            for chunk in self.new_chunks if chunk.embedding is not None
+        )
+        return FileRecord(
+            path=self.path,
+            content_hash=self.content_hash if added == len(self.new_chunks) else "",
+            mtime_ns=self.mtime_ns,
+            size=self.size,
+            chunks=chunks,
+        )
+
+
+def plan_file_update(record: Optional[FileRecord],
+                     path: str,
+                     file_hash: str,
+                     mtime_ns: int,
+                     size: int,
+                     chunks: List[CodeChunk]) -> FileUpdate:
+    """
+    Diff freshly chunked file content against its manifest record.
+
+    Stored chunks with the same fingerprint as a new chunk are kept; every
+    other new chunk must be embedded and every other stored chunk deleted.
+    New chunks get deterministic ids (see file_chunk_id).
+    """
+    for chunk in chunks:
+        chunk.id = file_chunk_id(path, chunk)
+
+    update = FileUpdate(
+        path=path,
+        content_hash=file_hash,
+        mtime_ns=mtime_ns,
+        size=size,
+        kept={},
+        new_chunks=[],
+        fingerprints={},
+        stale_ids=[],
+    )
+
+    if not record or not record.content_hash:
+        # Unknown prior state: drop whatever is stored for the file
+        update.replace_all = True
+        update.new_chunks = list(chunks)
+        update.fingerprints = {chunk.id: chunk_fingerprint(chunk) for chunk in chunks}
+        return update
+
+    old_by_fingerprint = {fp: chunk_id for chunk_id, fp in record.chunks.items()}
+    for chunk in chunks:
+        fingerprint = chunk_fingerprint(chunk)
+        if fingerprint in old_by_fingerprint:
+            update.kept[old_by_fingerprint.pop(fingerprint)] = fingerprint
+        else:
+            update.fingerprints[chunk.id] = fingerprint
+            update.new_chunks.append(chunk)
+
+    update.stale_ids = list(old_by_fingerprint.values())
+    return update
+
+
+class IndexManifest:
+    """
+    Tracks indexed files and their chunks.
+
+    Records are held in memory and persisted to a small SQLite table with
+    write-behind: changes are buffered and committed in one transaction at
+    explicit flush points (end of a directory pass, after each pipeline
+    write batch, on shutdown) or once ``flush_threshold`` changes are
+    pending. Per-file bookkeeping is therefore O(1), and a crash loses at
+    most the unflushed records, whose files are simply re-indexed.
+    """
+
+    def __init__(self, path: Optional[Path] = None, flush_threshold: int = 256):
+        """
+        Initialize the manifest.
+
+        Args:
+            path: SQLite database to persist to (None for in-memory)
+            flush_threshold: Pending changes that trigger an automatic flush
+        """
+        self.path = Path(path) if path else None
+        self.flush_threshold = flush_threshold
+        self.records: Dict[str, FileRecord] = {}
+        self._dirty: Dict[str, Optional[FileRecord]] = {}
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS files (
+                        path TEXT PRIMARY KEY,
+                        content_hash TEXT NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        chunks TEXT NOT NULL
+                    )
+                    """
+                )
+        self.load()
+
+    def load(self):
+        """Load the manifest from disk, migrating older formats."""
+        if not self._conn:
+            return
+
+        with self._lock:
+            for path, file_hash, mtime_ns, size, chunks in self._conn.execute(
+                "SELECT path, content_hash, mtime_ns, size, chunks FROM files"
+            ):
+                self.records[path] = FileRecord(
+                    path=path,
+                    content_hash=file_hash,
+                    mtime_ns=mtime_ns,
+                    size=size,
+                    chunks=json.loads(chunks),
+                )
+
+            if not self.records:
+                self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """Import the plain file list used before the manifest existed."""
+        legacy = self.path.parent / "indexed_files.txt"
+        if not legacy.exists():
+            return
+
+        # Files indexed before the manifest existed have no hash, so
+        # they are re-indexed (and their chunks replaced) on the next pass
+        with open(legacy, "r") as f:
+            for line in f:
+                if line.strip():
+                    self.set(FileRecord(path=line.strip(), content_hash=""))
+
+        self.flush()
+        legacy.rename(legacy.with_suffix(legacy.suffix + ".migrated"))
+
+    def flush(self):
+        """Commit all pending changes in a single transaction."""
+        with self._lock:
+            if not self._conn or not self._dirty:
+                self._dirty.clear()
+                return
+
+            dirty, self._dirty = self._dirty, {}
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (r.path, r.content_hash, r.mtime_ns, r.size, json.dumps(r.chunks))
+                        for r in dirty.values() if r is not None
+                    ]
+                )
+                self._conn.executemany(
+                    "DELETE FROM files WHERE path = ?",
+                    [(path,) for path, r in dirty.items() if r is None]
+                )
+
+    def _mark_dirty(self, path: str, record: Optional[FileRecord]):
+        """Buffer a change, flushing once enough changes are pending."""
+        self._dirty[path] = record
+        if len(self._dirty) >= self.flush_threshold:
+            self.flush()
+
+    def get(self, path: str) -> Optional[FileRecord]:
+        """Get the record for a file."""
+        return self.records.get(path)
+
+    def set(self, record: FileRecord):
+        """Add or replace the record for a file."""
+        with self._lock:
+            self.records[record.path] = record
+            self._mark_dirty(record.path, record)
+
+    def remove(self, path: str) -> Optional[FileRecord]:
+        """Remove and return the record for a file."""
+        with self._lock:
+            record = self.records.pop(path, None)
+            if record is not None:
+                self._mark_dirty(path, None)
+            return record
+
+    def paths(self) -> List[str]:
+        """Get all tracked file paths."""
+        return list(self.records)
+
+    def clear(self):
+        """Forget all files."""
+        with self._lock:
+            self.records.clear()
+            self._dirty.clear()
+            if self._conn:
+                with self._conn:
+                    self._conn.execute("DELETE FROM files")
+
+    def close(self):
+        """Flush pending changes and close the database."""
+        with self._lock:
+            self.flush()
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.records
+
+    def __iter__(self) -> Iterator[FileRecord]:
+        return iter(list(self.records.values()))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class IndexGeneration:
+    """
+    Counter bumped by every change to the index.
+
+    Persisted in the manifest database, so every process indexing the same
+    ``.rag`` directory (services, watchers, CLI runs) sees the changes of
+    the others. The query cache tags results with it.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize the generation counter.
+
+        Args:
+            path: SQLite database to persist to (None for in-memory)
+        """
+        self.path = Path(path) if path else None
+        self._value = 0
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)"
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO meta VALUES ('generation', 0)"
+                )
+
+    @property
+    def value(self) -> int:
+        """Current generation (read from the database when persistent)."""
+        with self._lock:
+            if self._conn:
+                self._value = self._conn.execute(
+                    "SELECT value FROM meta WHERE key = 'generation'"
+                ).fetchone()[0]
+            return self._value
+
+    def bump(self) -> int:
+        """Record an index change, returning the new generation."""
+        with self._lock:
+            if self._conn:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE meta SET value = value + 1 WHERE key = 'generation'"
+                    )
+                    self._value = self._conn.execute(
+                        "SELECT value FROM meta WHERE key = 'generation'"
+                    ).fetchone()[0]
+            else:
+                self._value += 1
+            return self._value
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+
+class BlobManifest:
+    """
+    Tracks git blobs whose chunks are in the vector store.
+
+    Chunks indexed from the git object database are keyed by blob SHA, so
+    a blob is chunked and embedded once no matter how many paths, branches
+    or commits contain it.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize the blob manifest.
+
+        Args:
+            path: SQLite database to persist to (None for in-memory)
+        """
+        self.path = Path(path) if path else None
+        self.blobs: Dict[str, List[str]] = {}  # blob sha -> chunk ids
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS blobs (
+                        sha TEXT PRIMARY KEY,
+                        path TEXT NOT NULL,
+                        chunks TEXT NOT NULL
+                    )
+                    """
+                )
+            for sha, chunks in self._conn.execute("SELECT sha, chunks FROM blobs"):
+                self.blobs[sha] = json.loads(chunks)
+
+    def add_many(self, blobs: List[Tuple[str, str, List[str]]]):
+        """
+        Record indexed blobs in one transaction.
+
+        Args:
+            blobs: (sha, path first seen at, chunk ids) tuples
+        """
+        with self._lock:
+            for sha, _, chunk_ids in blobs:
+                self.blobs[sha] = chunk_ids
+            if self._conn:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)",
+                        [(sha, path, json.dumps(ids)) for sha, path, ids in blobs]
+                    )
+
+    def remove(self, sha: str) -> Optional[List[str]]:
+        """Forget a blob, returning its chunk ids."""
+        with self._lock:
+            chunk_ids = self.blobs.pop(sha, None)
+            if chunk_ids is not None and self._conn:
+                with self._conn:
+                    self._conn.execute("DELETE FROM blobs WHERE sha = ?", (sha,))
+            return chunk_ids
+
+    def clear(self):
+        """Forget all blobs."""
+        with self._lock:
+            self.blobs.clear()
+            if self._conn:
+                with self._conn:
+                    self._conn.execute("DELETE FROM blobs")
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self.blobs
+
+    def __len__(self) -> int:
+        return len(self.blobs)
+
+
+class RefManifest:
+    """
+    Maps git refs to the files (and blobs) of their trees.
+
+    Chunks are stored once per blob (see BlobManifest); a ref manifest is
+    just the ``path -> blob sha`` listing of one commit, so indexing many
+    branches and commits costs storage only for their unique content.
+    Ref names (branches, tags, ``HEAD``) point at indexed commits.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_cached_scopes: int = 8):
+        """
+        Initialize the ref manifest.
+
+        Args:
+            path: SQLite database to persist to (None for in-memory)
+            max_cached_scopes: Commit trees kept in memory for scoped search
+        """
+        self.max_cached_scopes = max_cached_scopes
+        self._scopes: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path) if path else ":memory:", check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS refs (name TEXT PRIMARY KEY, commit_sha TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ref_files (
+                    commit_sha TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    blob_sha TEXT NOT NULL,
+                    PRIMARY KEY (commit_sha, path)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def set_tree(self, commit: str, files: List[Tuple[str, str]], ref: Optional[str] = None):
+        """
+        Record the indexed tree of a commit.
+
+        Args:
+            commit: Commit SHA
+            files: (path, blob sha) pairs
+            ref: Ref name that points at the commit (optional)
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM ref_files WHERE commit_sha = ?", (commit,))
+            self._conn.executemany(
+                "INSERT INTO ref_files VALUES (?, ?, ?)",
+                [(commit, path, sha) for path, sha in files]
+            )
+            if ref and ref != commit:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO refs VALUES (?, ?)", (ref, commit)
+                )
+            self._scopes.pop(commit, None)
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """
+        Find the indexed commit for a ref name, commit SHA or SHA prefix.
+
+        Returns:
+            Commit SHA, or None if the ref is not indexed
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT commit_sha FROM refs WHERE name = ?", (ref,)
+            ).fetchone()
+            if row:
+                return row[0]
+
+            if len(ref) >= 7:
+                rows = self._conn.execute(
+                    "SELECT DISTINCT commit_sha FROM ref_files "
+                    "WHERE commit_sha >= ? AND commit_sha < ? LIMIT 2",
+                    (ref, ref + "\uffff")
+                ).fetchall()
+                if len(rows) == 1:
+                    return rows[0][0]
+        return None
+
+    def scope(self, commit: str) -> Dict[str, str]:
+        """
+        Get the blobs of an indexed commit.
+
+        Returns:
+            Dictionary of blob sha -> path (the first path for blobs that
+            appear more than once)
+        """
+        with self._lock:
+            if commit in self._scopes:
+                self._scopes.move_to_end(commit)
+                return self._scopes[commit]
+
+            scope: Dict[str, str] = {}
+            for path, sha in self._conn.execute(
+                "SELECT path, blob_sha FROM ref_files WHERE commit_sha = ? ORDER BY path",
+                (commit,)
+            ):
+                scope.setdefault(sha, path)
+
+            self._scopes[commit] = scope
+            if len(self._scopes) > self.max_cached_scopes:
+                self._scopes.popitem(last=False)
+            return scope
+
+    def commits(self) -> List[str]:
+        """Get all indexed commits."""
+        with self._lock:
+            return [
+                row[0] for row in self._conn.execute(
+                    "SELECT DISTINCT commit_sha FROM ref_files"
+                )
+            ]
+
+    def clear(self):
+        """Forget all refs."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM refs")
+            self._conn.execute("DELETE FROM ref_files")
+            self._scopes.clear()
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
@@ -57,8 +57,9 @@ class SearchResult:
     """A search result from the RAG service."""
     chunk: CodeChunk
     score: float
-    match_type: str = "hybrid"  # "vector", "keyword", or "hybrid"
+    match_type: str = "hybrid"  # "vector", "keyword", "hybrid" or "symbol"
     highlights: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)  # Per-leg latency in ms
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses."""
@@ -72,10 +73,24 @@ class SearchResult:
             "symbol_name": self.chunk.symbol_name,
             "score": self.score,
             "match_type": self.match_type,
-            "highlights": self.highlights
+            "highlights": self.highlights,
+            "timings": self.timings
         }
 
 
+class SearchResults(list):
+    """
+    List of search results that knows whether every search leg finished.
+    
+    Results of a search whose vector or keyword leg timed out or failed
+    (including a failed query embedding) are incomplete and not cached.
+    """
+    
+    def __init__(self, results=(), complete: bool = True):
+        super().__init__(results)
+        self.complete = complete
+
+
 @dataclass
 class SearchRequest:
     """A search request to the RAG service."""
@@ -85,6 +100,8 @@ class SearchRequest:
     alpha: float = 0.5  # Weight for hybrid search (0=keyword only, 1=vector only)
     include_code: bool = True
     include_docs: bool = True
+    scope: Optional[Dict[str, str]] = None  # Blob sha -> path of one git tree; restricts results to it
+    query_embedding: Optional[List[float]] = None  # Precomputed (e.g. by AsyncRAGClient); skips embedding the query
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -106,4 +123,5 @@ class IndexStats:
     total_embeddings: int = 0
     languages: Dict[str, int] = field(default_factory=dict)
     chunk_types: Dict[str, int] = field(default_factory=dict)
+    cache_stats: Dict[str, Any] = field(default_factory=dict)
     last_updated: Optional[datetime] = None
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+Query result cache for the RAG service.
+
+Results are cached per (normalized query, k, filters, search type) and
+tagged with the index generation they were computed at. The generation is
+kept with the index (see IndexGeneration) and bumped by every process that
+changes it, which invalidates every cached result at once. Entries are kept
+in an in-memory LRU bounded by serialized size and, optionally, in a SQLite
+table shared by all processes using the same ``.rag`` directory.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .manifest import IndexGeneration
+from .models import ChunkType, CodeChunk, SearchResult
+
+logger = logging.getLogger(__name__)
+
+
+def _result_to_dict(result: SearchResult) -> Dict[str, Any]:
+    """Serialize a search result, including the full chunk."""
+    chunk = result.chunk
+    return {
+        "chunk": {
+            "id": chunk.id,
+            "content": chunk.content,
+            "file_path": chunk.file_path,
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line,
+            "chunk_type": getattr(chunk.chunk_type, "value", chunk.chunk_type),
+            "language": chunk.language,
+            "symbol_name": chunk.symbol_name,
+            "metadata": chunk.metadata,
+        },
+        "score": result.score,
+        "match_type": result.match_type,
+        "highlights": result.highlights,
+        "timings": result.timings,
+    }
+
+
+def _result_from_dict(data: Dict[str, Any]) -> SearchResult:
+    """Rebuild a search result serialized by _result_to_dict."""
+    chunk = dict(data["chunk"])
+    try:
+        chunk["chunk_type"] = ChunkType(chunk["chunk_type"])
+    except ValueError:
+        pass
+    return SearchResult(
+        chunk=CodeChunk(**chunk),
+        score=data["score"],
+        match_type=data["match_type"],
+        highlights=data["highlights"],
+        timings=data.get("timings", {}),
+    )
+
+
+class QueryCache:
+    """
+    Generation-invalidated LRU cache of search results.
+    """
+
+    def __init__(self,
+                 max_bytes: int = 32 * 1024 * 1024,
+                 db_path: Optional[str] = None,
+                 generation: Optional[IndexGeneration] = None):
+        """
+        Initialize the query cache.
+
+        Args:
+            max_bytes: Maximum serialized size of cached results
+            db_path: SQLite database shared across processes (None for memory only)
+            generation: Generation counter of the index (defaults to one
+                stored in db_path, or in memory)
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._owns_generation = generation is None
+        self._index_generation = generation or IndexGeneration(db_path)
+        self._generation = self._index_generation.value
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS results (
+                        key TEXT PRIMARY KEY,
+                        generation INTEGER NOT NULL,
+                        payload BLOB NOT NULL,
+                        last_used REAL NOT NULL
+                    )
+                    """
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS results_lru ON results(last_used)"
+                )
+
+    @staticmethod
+    def make_key(query: str,
+                 k: int,
+                 filters: Optional[Dict[str, Any]],
+                 search_type: str) -> str:
+        """
+        Build the cache key for a search.
+
+        Queries are normalized by collapsing whitespace, and filters by
+        sorting keys (and list values), so equivalent searches share a key.
+        """
+        normalized_filters = {
+            key: sorted(map(str, value)) if isinstance(value, (list, tuple, set)) else value
+            for key, value in (filters or {}).items()
+        }
+        payload = json.dumps(
+            [re.sub(r"\s+", " ", query).strip(), k, normalized_filters, search_type],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def generation(self) -> int:
+        """Current index generation, read on every lookup."""
+        with self._lock:
+            generation = self._index_generation.value
+            if generation != self._generation:
+                # Another process changed the index
+                self._generation = generation
+                self._clear_memory()
+            return self._generation
+
+    def bump_generation(self) -> int:
+        """Invalidate all cached results after an index change."""
+        with self._lock:
+            self._generation = self._index_generation.bump()
+            if self._conn:
+                with self._conn:
+                    self._conn.execute(
+                        "DELETE FROM results WHERE generation < ?", (self._generation,)
+                    )
+            self._clear_memory()
+            return self._generation
+
+    def get(self, key: str) -> Optional[List[SearchResult]]:
+        """
+        Look up cached results.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Cached results for the current generation, or None
+        """
+        with self._lock:
+            generation = self.generation
+            payload = None
+
+            entry = self._entries.get(key)
+            if entry and entry[0] == generation:
+                self._entries.move_to_end(key)
+                payload = entry[1]
+            elif self._conn:
+                row = self._conn.execute(
+                    "SELECT payload FROM results WHERE key = ? AND generation = ?",
+                    (key, generation)
+                ).fetchone()
+                if row:
+                    payload = row[0]
+                    with self._conn:
+                        self._conn.execute(
+                            "UPDATE results SET last_used = ? WHERE key = ?",
+                            (time.time(), key)
+                        )
+                    self._remember(key, generation, payload)
+
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return [_result_from_dict(item) for item in json.loads(payload)]
+
+    def put(self, key: str, results: List[SearchResult], generation: Optional[int] = None):
+        """
+        Cache results.
+
+        Args:
+            key: Key from make_key
+            results: Search results
+            generation: Generation the results were computed at; results
+                computed before a concurrent index change are dropped
+        """
+        try:
+            payload = json.dumps([_result_to_dict(r) for r in results]).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Not caching unserializable results: {e}")
+            return
+
+        if len(payload) > self.max_bytes:
+            return
+
+        with self._lock:
+            current = self.generation
+            if generation is not None and generation != current:
+                return
+
+            self._remember(key, current, payload)
+            if self._conn:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                        (key, current, payload, time.time())
+                    )
+                    self._evict_persistent()
+
+    def _remember(self, key: str, generation: int, payload: bytes):
+        """Add an entry to the memory LRU, evicting to stay within max_bytes."""
+        previous = self._entries.pop(key, None)
+        if previous:
+            self._bytes -= len(previous[1])
+        self._entries[key] = (generation, payload)
+        self._bytes += len(payload)
+
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _evict_persistent(self):
+        """Keep the persistent table within max_bytes; caller holds a txn."""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM results"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, LENGTH(payload) FROM results ORDER BY last_used"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    def _clear_memory(self):
+        """Drop all in-memory entries."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and size information."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "generation": self._generation,
+            "persistent": self._conn is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Close the persistent store."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+            if self._owns_generation:
+                self._index_generation.close()
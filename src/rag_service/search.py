@@ -5,32 +5,184 @@ Search algorithms for the RAG service.
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 import re
+import threading
+import time
 
-from .models import CodeChunk, SearchResult, SearchRequest
+from .models import CodeChunk, SearchResult, SearchResults, SearchRequest
 from .embeddings import EmbeddingService
-from .vector_store import VectorStore
+from .keyword_index import SCOPE_FIELD
+from .vector_store import BaseVectorStore
+from .fusion import FUSION_STRATEGIES, diversify, fuse
 
 logger = logging.getLogger(__name__)
 
 
+def _elapsed_ms(start: float) -> float:
+    """Milliseconds elapsed since a perf_counter timestamp."""
+    return (time.perf_counter() - start) * 1000
+
+
+# Timing names of legs that did not finish (their results are missing)
+_DEGRADED_SUFFIXES = ("_timeout", "_error", "_failed")
+
+
+def _add_timings(timings: Dict[str, float], leg_timings: Dict[str, float]):
+    """Accumulate leg timings (legs may run more than once per query)."""
+    for name, elapsed in leg_timings.items():
+        timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def _scope_filters(filters: Optional[Dict[str, Any]],
+                   scope: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Add a ref scope to store filters, so that stores only return chunks in it.
+
+    Args:
+        filters: Request filters
+        scope: Blob sha -> path of a git tree (None for the working tree)
+
+    Returns:
+        Filters with a blob_sha condition
+    """
+    scoped = dict(filters or {})
+    scoped[SCOPE_FIELD] = None if scope is None else list(scope)
+    return scoped
+
+
 class HybridSearch:
     """
     Implements hybrid search combining vector similarity and keyword matching.
+    
+    In parallel mode the keyword leg runs concurrently with the embedding
+    call and vector search. Each leg has a timeout measured from the start
+    of the query; a leg that misses it is dropped, so a slow embedding API
+    degrades to keyword-only results.
+    
+    Legs are fused by rank (RRF) or by normalized score, and results are
+    capped per file. Each leg first fetches ``overfetch * k`` candidates;
+    when filters, the per-file cap or a ref scope leave fewer than k
+    results, the fetch size doubles up to ``max_overfetch * k``.
     """
     
     def __init__(self, 
-                 vector_store: VectorStore,
-                 embedding_service: EmbeddingService):
+                 vector_store: BaseVectorStore,
+                 embedding_service: EmbeddingService,
+                 parallel: bool = True,
+                 vector_timeout: Optional[float] = 10.0,
+                 keyword_timeout: Optional[float] = 5.0,
+                 max_workers: int = 8,
+                 fusion: str = "rrf",
+                 max_chunks_per_file: Optional[int] = 3,
+                 overfetch: int = 2,
+                 max_overfetch: int = 16):
         """
         Initialize the hybrid search.
         
         Args:
             vector_store: Vector store instance
             embedding_service: Embedding service instance
+            parallel: Run the keyword and vector legs concurrently
+            vector_timeout: Seconds to wait for embedding + vector search (None waits)
+            keyword_timeout: Seconds to wait for keyword search (None waits)
+            max_workers: Threads shared by the search legs
+            fusion: Fusion strategy ("rrf", "minmax" or "zscore")
+            max_chunks_per_file: Cap on results from one file (None for no cap)
+            overfetch: Initial candidates per leg as a multiple of k
+            max_overfetch: Largest candidates per leg as a multiple of k
         """
+        if fusion not in FUSION_STRATEGIES:
+            raise ValueError(f"Unknown fusion strategy: {fusion}")
+        
         self.vector_store = vector_store
         self.embedding_service = embedding_service
+        self.parallel = parallel
+        self.vector_timeout = vector_timeout
+        self.keyword_timeout = keyword_timeout
+        self.max_workers = max_workers
+        self.fusion = fusion
+        self.max_chunks_per_file = max_chunks_per_file
+        self.overfetch = overfetch
+        self.max_overfetch = max_overfetch
+        
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool for search legs, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="hybrid-search"
+                )
+            return self._executor
+    
+    def _vector_leg(self, request: SearchRequest, fetch_k: int) -> Tuple[List[Tuple[CodeChunk, float]], Dict[str, float]]:
+        """Embed the query and run the vector search."""
+        timings = {}
+        if not self.embedding_service.enabled:
+            return [], timings
+        
+        query_embedding = request.query_embedding
+        if query_embedding is None:
+            start = time.perf_counter()
+            query_embedding = self.embedding_service.embed_text(request.query)
+            timings["embedding"] = _elapsed_ms(start)
+        if not query_embedding:
+            timings["embedding_failed"] = timings.get("embedding", 0.0)
+            return [], timings
+        
+        start = time.perf_counter()
+        results = self.vector_store.search(
+            query_embedding=query_embedding,
+            k=fetch_k,
+            filters=_scope_filters(request.filters, request.scope)
+        )
+        timings["vector"] = _elapsed_ms(start)
+        return results, timings
+    
+    def _keyword_leg(self, request: SearchRequest, fetch_k: int) -> Tuple[List[Tuple[CodeChunk, float]], Dict[str, float]]:
+        """Run the keyword search."""
+        start = time.perf_counter()
+        results = self.vector_store.keyword_search(
+            query=request.query,
+            k=fetch_k,
+            filters=_scope_filters(request.filters, request.scope)
+        )
+        return results, {"keyword": _elapsed_ms(start)}
+    
+    def _run_parallel(self,
+                      request: SearchRequest,
+                      fetch_k: int,
+                      timings: Dict[str, float]) -> Tuple[List[Tuple[CodeChunk, float]], List[Tuple[CodeChunk, float]]]:
+        """Run both legs on the thread pool, dropping legs that time out."""
+        executor = self._get_executor()
+        start = time.perf_counter()
+        legs = {
+            "vector": (executor.submit(self._vector_leg, request, fetch_k), self.vector_timeout),
+            "keyword": (executor.submit(self._keyword_leg, request, fetch_k), self.keyword_timeout),
+        }
+        
+        results = {}
+        for name, (future, timeout) in legs.items():
+            remaining = None
+            if timeout is not None:
+                remaining = max(0.0, timeout - (time.perf_counter() - start))
+            try:
+                results[name], leg_timings = future.result(timeout=remaining)
+                _add_timings(timings, leg_timings)
+            except FuturesTimeout:
+                logger.warning(f"{name.capitalize()} search timed out after {timeout}s, continuing without it")
+                _add_timings(timings, {f"{name}_timeout": _elapsed_ms(start)})
+                results[name] = []
+            except Exception as e:
+                logger.error(f"{name.capitalize()} search failed: {e}")
+                _add_timings(timings, {f"{name}_error": _elapsed_ms(start)})
+                results[name] = []
+        
+        return results["vector"], results["keyword"]
     
     def search(self, request: SearchRequest) -> List[SearchResult]:
         """
@@ -40,97 +192,114 @@ class HybridSearch:
             request: Search request
             
         Returns:
-            List of search results
+            Search results, each carrying the per-leg timings; incomplete
+            if a leg timed out or failed
         """
-        # Generate query embedding if embedding service is available
-        query_embedding = None
-        if self.embedding_service.enabled:
-            query_embedding = self.embedding_service.embed_text(request.query)
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        fetch_k = request.k * self.overfetch
         
-        # Perform searches
-        vector_results = []
-        keyword_results = []
-        
-        # Vector search if embedding available
-        if query_embedding:
-            vector_results = self.vector_store.search(
-                query_embedding=query_embedding,
-                k=request.k * 2,  # Get more results for merging
+        while True:
+            if self.parallel:
+                vector_results, keyword_results = self._run_parallel(request, fetch_k, timings)
+            else:
+                vector_results, leg_timings = self._vector_leg(request, fetch_k)
+                _add_timings(timings, leg_timings)
+                keyword_results, leg_timings = self._keyword_leg(request, fetch_k)
+                _add_timings(timings, leg_timings)
+            
+            # Merge results
+            merged_results = self._merge_results(
+                vector_results=self._apply_scope(vector_results, request.scope),
+                keyword_results=self._apply_scope(keyword_results, request.scope),
+                alpha=request.alpha,
+                k=request.k,
                 filters=request.filters
             )
+            
+            # Fetch deeper only if a leg may have more candidates to offer,
+            # never re-running a leg that already timed out
+            exhausted = all(len(r) < fetch_k for r in (vector_results, keyword_results))
+            timed_out = any(name.endswith("_timeout") for name in timings)
+            if (len(merged_results) >= request.k or exhausted or timed_out or
+                    fetch_k >= request.k * self.max_overfetch):
+                break
+            fetch_k *= 2
         
-        # Keyword search
-        keyword_results = self.vector_store.keyword_search(
-            query=request.query,
-            k=request.k * 2,
-            filters=request.filters
-        )
+        # Extract highlights
+        highlights = [
+            self._extract_highlights(chunk.content, request.query)
+            for chunk, _ in merged_results
+        ]
+        timings["total"] = _elapsed_ms(start)
         
-        # Merge results
-        merged_results = self._merge_results(
-            vector_results=vector_results,
-            keyword_results=keyword_results,
-            alpha=request.alpha,
-            k=request.k
+        # Convert to SearchResult objects, each with its own timings
+        search_results = SearchResults(
+            complete=not any(name.endswith(_DEGRADED_SUFFIXES) for name in timings)
         )
-        
-        # Convert to SearchResult objects
-        search_results = []
-        for chunk, score in merged_results:
-            # Extract highlights
-            highlights = self._extract_highlights(chunk.content, request.query)
-            
+        for (chunk, score), chunk_highlights in zip(merged_results, highlights):
             result = SearchResult(
                 chunk=chunk,
                 score=score,
                 match_type="hybrid" if vector_results and keyword_results else 
                           "vector" if vector_results else "keyword",
-                highlights=highlights
+                highlights=chunk_highlights,
+                timings=dict(timings)
             )
             search_results.append(result)
         
         return search_results
     
+    @staticmethod
+    def _apply_scope(results: List[Tuple[CodeChunk, float]],
+                     scope: Optional[Dict[str, str]]) -> List[Tuple[CodeChunk, float]]:
+        """
+        Keep results from the blobs of a git tree, under their paths in it.
+        
+        Without a scope only working-tree chunks are kept: chunks indexed
+        from git refs duplicate the working tree's and are only searched
+        within a ref. Stores already apply the scope as a filter; this
+        maps paths and drops what a store could not filter.
+        
+        Args:
+            results: (chunk, score) pairs
+            scope: Blob sha -> path (None for the working tree)
+        """
+        if scope is None:
+            return [(chunk, score) for chunk, score in results if "blob_sha" not in chunk.metadata]
+        
+        scoped = []
+        for chunk, score in results:
+            path = scope.get(chunk.metadata.get("blob_sha"))
+            if path is not None:
+                chunk.file_path = path
+                scoped.append((chunk, score))
+        return scoped
+    
     def _merge_results(self,
                       vector_results: List[Tuple[CodeChunk, float]],
                       keyword_results: List[Tuple[CodeChunk, float]],
                       alpha: float,
-                      k: int) -> List[Tuple[CodeChunk, float]]:
+                      k: int,
+                      filters: Optional[Dict[str, Any]] = None) -> List[Tuple[CodeChunk, float]]:
         """
         Merge vector and keyword search results.
         
-        Uses reciprocal rank fusion with alpha weighting.
+        Fuses both rankings with the configured strategy, weighting the
+        vector leg by alpha, then applies the per-file cap (unless the
+        filters pin a single file).
         """
-        # Build score maps
-        vector_scores = {chunk.id: score for chunk, score in vector_results}
-        keyword_scores = {chunk.id: score for chunk, score in keyword_results}
-        
-        # Collect all unique chunks
-        all_chunks = {}
-        for chunk, _ in vector_results:
-            all_chunks[chunk.id] = chunk
-        for chunk, _ in keyword_results:
-            all_chunks[chunk.id] = chunk
-        
-        # Calculate combined scores
-        combined_scores = {}
-        for chunk_id, chunk in all_chunks.items():
-            vector_score = vector_scores.get(chunk_id, 0.0)
-            keyword_score = keyword_scores.get(chunk_id, 0.0)
-            
-            # Weighted combination
-            combined_score = alpha * vector_score + (1 - alpha) * keyword_score
-            combined_scores[chunk_id] = (chunk, combined_score)
-        
-        # Sort by score
-        sorted_results = sorted(
-            combined_scores.values(),
-            key=lambda x: x[1],
-            reverse=True
+        fused = fuse(
+            [vector_results, keyword_results],
+            [alpha, 1 - alpha],
+            strategy=self.fusion
         )
         
-        # Return top k
-        return sorted_results[:k]
+        max_per_file = self.max_chunks_per_file
+        if filters and isinstance(filters.get("file_path"), str):
+            max_per_file = None
+        
+        return diversify(fused, k, max_per_file)
     
     def _extract_highlights(self, content: str, query: str, context_chars: int = 100) -> List[str]:
         """
@@ -190,24 +359,28 @@ class CodeSearch:
     """
     
     def __init__(self,
-                 vector_store: VectorStore,
-                 embedding_service: EmbeddingService):
+                 vector_store: BaseVectorStore,
+                 embedding_service: EmbeddingService,
+                 **hybrid_options):
         """
         Initialize the code search.
         
         Args:
             vector_store: Vector store instance
             embedding_service: Embedding service instance
+            **hybrid_options: HybridSearch options (parallel, timeouts)
         """
         self.vector_store = vector_store
         self.embedding_service = embedding_service
-        self.hybrid_search = HybridSearch(vector_store, embedding_service)
+        self.hybrid_search = HybridSearch(vector_store, embedding_service, **hybrid_options)
     
     def search(self, 
                query: str,
                k: int = 10,
                filters: Optional[Dict[str, Any]] = None,
-               search_type: str = "hybrid") -> List[SearchResult]:
+               search_type: str = "hybrid",
+               scope: Optional[Dict[str, str]] = None,
+               query_embedding: Optional[List[float]] = None) -> List[SearchResult]:
         """
         Search for code.
         
@@ -216,6 +389,8 @@ class CodeSearch:
             k: Number of results
             filters: Optional filters
             search_type: Type of search ("hybrid", "vector", "keyword")
+            scope: Blob sha -> path of a git tree to restrict results to
+            query_embedding: Embedding of the query, if already computed
             
         Returns:
             List of search results
@@ -226,7 +401,9 @@ class CodeSearch:
             k=k,
             filters=filters or {},
             alpha=0.5 if search_type == "hybrid" else 
-                  1.0 if search_type == "vector" else 0.0
+                  1.0 if search_type == "vector" else 0.0,
+            scope=scope,
+            query_embedding=query_embedding
         )
         
         # Perform search
@@ -266,7 +443,7 @@ class CodeSearch:
         results = self.vector_store.search(
             query_embedding=chunk.embedding,
             k=k + 1,  # Get one extra to exclude self
-            filters=filters
+            filters=_scope_filters(filters, None)
         )
         
         # Convert to SearchResult and exclude self
@@ -283,13 +460,22 @@ class CodeSearch:
     
     def search_by_symbol(self,
                         symbol_name: str,
-                        filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+                        filters: Optional[Dict[str, Any]] = None,
+                        k: int = 20,
+                        prefix: bool = False,
+                        scope: Optional[Dict[str, str]] = None) -> List[SearchResult]:
         """
         Search for a specific symbol (function, class, etc).
         
+        Definitions are looked up in the symbol index first; a hybrid
+        search is only run when no indexed symbol matches.
+        
         Args:
-            symbol_name: Name of the symbol
+            symbol_name: Name of the symbol, optionally qualified (Class.method)
             filters: Optional filters
+            k: Number of results
+            prefix: Also match symbols starting with symbol_name
+            scope: Blob sha -> path of a git tree to restrict results to
             
         Returns:
             List of search results
@@ -298,12 +484,23 @@ class CodeSearch:
         if filters is None:
             filters = {}
         
+        matches = self.vector_store.symbol_search(
+            symbol_name, k=k, filters=_scope_filters(filters, scope), prefix=prefix
+        )
+        matches = HybridSearch._apply_scope(matches, scope)
+        if matches:
+            return [
+                SearchResult(chunk=chunk, score=score, match_type="symbol")
+                for chunk, score in matches
+            ]
+        
         # Search with symbol-focused query
         query = f"function {symbol_name} class {symbol_name} def {symbol_name}"
         
         return self.search(
             query=query,
-            k=20,
+            k=k,
             filters=filters,
-            search_type="hybrid"
+            search_type="hybrid",
+            scope=scope
         )
\ No newline at end of file
@@ -3,22 +3,41 @@ Main RAG service implementation.
 """
 
 import os
+import weakref
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 import logging
 import asyncio
 from concurrent.futures import ProcessPoolExecutor
 import time
 
+from ..git_integration import GitAdapter
 from .models import CodeChunk, SearchResult, SearchRequest, IndexStats
 from .embeddings import EmbeddingService
-from .vector_store import VectorStore
+from .embedding_backends import DEFAULT_LOCAL_MODEL, EmbeddingBackend
+from .factory import create_vector_store
 from .chunker import CodeChunker
 from .search import CodeSearch
+from .manifest import (
+    BlobManifest, IndexGeneration, IndexManifest, FileUpdate, RefManifest, content_hash,
+    plan_file_update
+)
+from .indexer import (
+    DEFAULT_EXCLUDE_PATTERNS, DEFAULT_EXTENSIONS, IndexingStats, PipelinedIndexer
+)
+from .git_indexer import GitIndexer
+from .query_cache import QueryCache
+from .context_packer import ContextPacker, PackedContext, TokenCountCache
 
 logger = logging.getLogger(__name__)
 
 
+def _close_all(*resources):
+    """Close resources in order."""
+    for resource in resources:
+        resource.close()
+
+
 class RAGService:
     """
     Main RAG service for code search and retrieval.
@@ -35,7 +54,14 @@ class RAGService:
                  embedding_model: str = "text-embedding-3-small",
                  chunk_size: int = 1500,
                  chunk_overlap: int = 200,
-                 repo_path: Optional[str] = None):
+                 repo_path: Optional[str] = None,
+                 index_workers: Optional[int] = None,
+                 chunk_strategy: str = "auto",
+                 vector_backend: str = "auto",
+                 query_cache_bytes: int = 32 * 1024 * 1024,
+                 persist_query_cache: bool = False,
+                 embedding_backend: Union[str, EmbeddingBackend] = "auto",
+                 local_embedding_model: str = DEFAULT_LOCAL_MODEL):
         """
         Initialize the RAG service.
         
@@ -44,6 +70,15 @@ class RAGService:
             embedding_model: OpenAI embedding model to use
             chunk_size: Size of code chunks
             chunk_overlap: Overlap between chunks
+            repo_path: Repository root for relative paths
+            index_workers: Worker processes used by index_directory
+            chunk_strategy: Chunking strategy ("auto", "tree_sitter" or "regex")
+            vector_backend: Vector store backend ("auto", "chroma" or "local")
+            query_cache_bytes: Size bound of the query result cache (0 disables it)
+            persist_query_cache: Share cached results across processes via SQLite
+            embedding_backend: Embedding backend instance or name ("auto",
+                "openai", "sentence-transformers" or "hashing")
+            local_embedding_model: Model for the sentence-transformers backend
         """
         # Set up persistence directory
         if persist_directory:
@@ -55,44 +90,111 @@ class RAGService:
             vector_store_dir = None
         
         # Initialize components
-        self.embedding_service = EmbeddingService(model=embedding_model)
-        self.vector_store = VectorStore(
+        self.embedding_service = EmbeddingService(
+            model=embedding_model,
+            cache_dir=str(self.persist_dir / "embedding_cache") if self.persist_dir else None,
+            backend=embedding_backend,
+            local_model=local_embedding_model
+        )
+        self.vector_store = create_vector_store(
+            backend=vector_backend,
             persist_directory=vector_store_dir,
             collection_name="code_chunks"
         )
+        self._bind_embedding_model()
         self.chunker = CodeChunker(
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            strategy=chunk_strategy
         )
         self.search = CodeSearch(
             vector_store=self.vector_store,
             embedding_service=self.embedding_service
         )
+
+        # Prompt context packing with cached per-chunk token counts
+        self.token_counts = TokenCountCache(
+            self.embedding_service.count_tokens,
+            namespace=getattr(self.embedding_service.encoding, "name", embedding_model),
+            db_path=str(self.persist_dir / "token_counts.db") if self.persist_dir else None
+        )
+        self.context_packer = ContextPacker(self.token_counts)
 
         # Repository root for relative path handling
         self.repo_path = Path(repo_path).resolve() if repo_path else Path.cwd()
         
-        # Track indexed files
-        self.indexed_files = set()
-        self._load_indexed_files()
+        # Track indexed files (content hash, stat info and chunk ids)
+        self.manifest = IndexManifest(
+            self.persist_dir / "index_manifest.db" if self.persist_dir else None
+        )
+        
+        # Git blobs indexed without a checkout (see index_git_ref)
+        self.blob_manifest = BlobManifest(
+            self.persist_dir / "index_manifest.db" if self.persist_dir else None
+        )
+        
+        # Trees of indexed commits, for searches scoped to a ref
+        self.ref_manifest = RefManifest(
+            self.persist_dir / "index_manifest.db" if self.persist_dir else None
+        )
+        # Bumped by every index change, by this or any other process
+        self.index_generation = IndexGeneration(
+            self.persist_dir / "index_manifest.db" if self.persist_dir else None
+        )
+        
+        # Refs searched without being indexed (warned about once)
+        self._unindexed_refs: Set[str] = set()
+        
+        # Flush pending manifest writes when the service is collected or the
+        # interpreter exits without close(); holds no reference to the service
+        self._close_manifests = weakref.finalize(
+            self, _close_all, self.manifest, self.blob_manifest, self.ref_manifest,
+            self.index_generation
+        )
+        
+        # Search results, invalidated whenever the index generation changes
+        self.query_cache = QueryCache(
+            max_bytes=query_cache_bytes,
+            db_path=(
+                str(self.persist_dir / "query_cache.db")
+                if self.persist_dir and persist_query_cache else None
+            ),
+            generation=self.index_generation
+        )
+        
+        # Directory indexing pipeline settings and last run statistics
+        self.index_workers = index_workers
+        self.last_indexing_stats: Optional[IndexingStats] = None
         
         logger.info("RAG service initialized")
     
+    @property
+    def indexed_files(self) -> Set[str]:
+        """Paths of all indexed files."""
+        return set(self.manifest.paths())
+    
     def index_file(
         self,
         file_path: str,
         content: Optional[str] = None,
         repo_root: Optional[str] = None,
+        force: bool = False,
     ) -> int:
         """
         Index a single file.
         
+        Unchanged files (same size and mtime, or same content hash) are
+        skipped. For changed files only chunks whose content or position
+        changed are re-embedded; the rest stay in the vector store.
+        
         Args:
             file_path: Path to the file
             content: File content (read from disk if None)
+            repo_root: Root that stored paths are made relative to
+            force: Re-index even if the file looks unchanged
             
         Returns:
-            Number of chunks indexed
+            Number of chunks stored for the file
         """
         try:
             root = Path(repo_root).resolve() if repo_root else self.repo_path
@@ -102,14 +204,25 @@ class RAGService:
                 if abs_path.is_relative_to(root)
                 else str(abs_path)
             )
+            record = self.manifest.get(stored_path)
 
-            # Read content if not provided
+            # Read content if not provided, skipping files whose stat is unchanged
+            mtime_ns, size = 0, 0
             if content is None:
+                stat = abs_path.stat()
+                mtime_ns, size = stat.st_mtime_ns, stat.st_size
+                if record and not force and record.matches_stat(mtime_ns, size):
+                    return len(record.chunks)
+                
                 with open(abs_path, "r", encoding="utf-8") as f:
                     content = f.read()
             
-            # Delete existing chunks for this file
-            self.vector_store.delete_by_file(stored_path)
+            file_hash = content_hash(content)
+            if record and not force and record.content_hash == file_hash:
+                # Touched but not modified
+                record.mtime_ns, record.size = mtime_ns, size
+                self.manifest.set(record)
+                return len(record.chunks)
             
             # Chunk the file
             chunks = self.chunker.chunk_file(
@@ -119,29 +232,39 @@ class RAGService:
             
             if not chunks:
                 logger.warning(f"No chunks created for {file_path}")
-                return 0
+            
+            # Keep stored chunks that are identical to a new chunk
+            update = plan_file_update(
+                record, stored_path, file_hash, mtime_ns, size, chunks
+            )
+            self._reconcile_with_store([update])
+            self._delete_stale_chunks([update])
             
             # Generate embeddings if service is available
-            if self.embedding_service.enabled:
+            if update.new_chunks and self.embedding_service.enabled:
                 # Prepare texts for embedding
-                texts = [chunk.text_for_embedding for chunk in chunks]
+                texts = [chunk.text_for_embedding for chunk in update.new_chunks]
                 
                 # Generate embeddings in batch
                 embeddings = self.embedding_service.embed_batch(texts)
                 
                 # Assign embeddings to chunks
-                for chunk, embedding in zip(chunks, embeddings):
+                for chunk, embedding in zip(update.new_chunks, embeddings):
                     chunk.embedding = embedding
             
             # Add to vector store
-            added = self.vector_store.add_chunks(chunks)
-
-            # Track indexed file
-            self.indexed_files.add(stored_path)
-            self._save_indexed_files()
+            added = self.vector_store.upsert_chunks(update.new_chunks)
             
-            logger.info(f"Indexed {added} chunks from {file_path}")
-            return added
+            # Track indexed file
+            record = update.to_record(added)
+            self.manifest.set(record)
+            self._index_changed()
+            
+            logger.info(
+                f"Indexed {added} new chunks from {file_path} "
+                f"({len(update.kept)} unchanged)"
+            )
+            return len(record.chunks)
             
         except Exception as e:
             logger.error(f"Error indexing file {file_path}: {e}")
@@ -150,14 +273,21 @@ class RAGService:
     def index_directory(self, 
                        directory: str,
                        extensions: Optional[List[str]] = None,
-                       exclude_patterns: Optional[List[str]] = None) -> Dict[str, int]:
+                       exclude_patterns: Optional[List[str]] = None,
+                       max_workers: Optional[int] = None) -> Dict[str, int]:
         """
         Index all files in a directory.
         
+        Only new and changed files are re-indexed, and chunks of files that
+        were removed from the directory are deleted. Files are chunked on a
+        process pool while embeddings for chunks from many files are batched
+        and requested concurrently (see PipelinedIndexer).
+        
         Args:
             directory: Directory to index
             extensions: File extensions to include
             exclude_patterns: Patterns to exclude
+            max_workers: Worker processes for reading and chunking
             
         Returns:
             Dictionary of file_path -> chunk_count
@@ -166,17 +296,11 @@ class RAGService:
         
         # Default extensions
         if extensions is None:
-            extensions = [
-                '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c',
-                '.h', '.hpp', '.cs', '.go', '.rs', '.rb', '.php', '.swift'
-            ]
+            extensions = DEFAULT_EXTENSIONS
         
         # Default exclude patterns
         if exclude_patterns is None:
-            exclude_patterns = [
-                '__pycache__', '.git', 'node_modules', '.venv', 'venv',
-                'build', 'dist', '.pytest_cache', '.mypy_cache'
-            ]
+            exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
         
         root = directory.resolve()
 
@@ -194,54 +318,322 @@ class RAGService:
                 if not skip and file_path.is_file():
                     files_to_index.append(str(file_path))
         
-        # Index files
-        results = {}
-        total_chunks = 0
+        # Index files through the read/embed/write pipeline
+        files = []
+        for file_path in files_to_index:
+            abs_path = Path(file_path).resolve()
+            stored_path = (
+                str(abs_path.relative_to(root))
+                if abs_path.is_relative_to(root)
+                else str(abs_path)
+            )
+            files.append((str(abs_path), stored_path))
+        
+        logger.info(f"Indexing {len(files)} files from {directory}")
+        
+        indexer = PipelinedIndexer(self, max_workers=max_workers or self.index_workers)
+        results, stats = indexer.index_files(files)
+        self.last_indexing_stats = stats
+        total_chunks = sum(results.values())
         
-        logger.info(f"Indexing {len(files_to_index)} files from {directory}")
+        # Drop chunks of files that were deleted from the directory
+        removed = self._prune_removed_files(root, extensions, set(results))
         
-        for i, file_path in enumerate(files_to_index):
-            if i % 10 == 0:
-                logger.info(f"Progress: {i}/{len(files_to_index)} files")
+        self.flush()
+        
+        logger.info(
+            f"Indexed {total_chunks} chunks from {len(files)} files "
+            f"({stats.files_indexed} changed, {stats.files_unchanged} unchanged, "
+            f"{stats.files_failed} failed, {removed} removed) in {stats.duration:.2f}s: "
+            f"{stats.files_per_sec:.1f} files/s, {stats.chunks_per_sec:.1f} chunks/s"
+        )
+        return results
+    
+    def index_git_ref(self,
+                      ref: str = "HEAD",
+                      repo_path: Optional[str] = None,
+                      extensions: Optional[List[str]] = None,
+                      exclude_patterns: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Index the tree of a git ref straight from the object database.
+        
+        No checkout is needed (bare repositories work). Chunks are keyed by
+        blob SHA and blobs that are already indexed are skipped, so indexing
+        a new commit only embeds the files that changed. The commit's tree
+        is recorded so searches can be scoped to it (see the ``ref``
+        argument of search_code); unscoped searches only cover the working
+        tree, so indexed refs do not duplicate its results.
+        
+        Args:
+            ref: Commit, branch or tag
+            repo_path: Repository (defaults to the service's repo_path)
+            extensions: File extensions to include
+            exclude_patterns: Path component patterns to exclude
             
-            chunks = self.index_file(file_path, repo_root=str(root))
-            rel_path = (
-                str(Path(file_path).resolve().relative_to(root))
-                if Path(file_path).resolve().is_relative_to(root)
-                else str(Path(file_path).resolve())
-            )
-            results[rel_path] = chunks
-            total_chunks += chunks
+        Returns:
+            Dictionary of file_path -> chunk_count
+        """
+        indexer = GitIndexer(self)
+        results, stats = indexer.index_ref(
+            str(repo_path or self.repo_path),
+            ref=ref,
+            extensions=extensions,
+            exclude_patterns=exclude_patterns
+        )
+        self.last_indexing_stats = stats
+        
+        logger.info(
+            f"Indexed {ref}: {stats.files_indexed} new files, "
+            f"{stats.files_unchanged} already indexed, {stats.files_failed} failed, "
+            f"{stats.chunks_written} chunks written in {stats.duration:.2f}s"
+        )
+        return results
+    
+    def _ref_scope(self, ref: str) -> Tuple[Optional[str], Optional[Dict[str, str]]]:
+        """
+        Resolve a ref to an indexed commit and its blobs.
+        
+        Searches never index: refs must be indexed with index_git_ref
+        first. Searches scoped to a ref that is not indexed fall back to
+        the working-tree index.
+        
+        Returns:
+            Tuple of (commit SHA, blob sha -> path), or (None, None)
+        """
+        commit = GitAdapter(str(self.repo_path)).resolve_ref(ref)
+        if not commit:
+            # Not in the repository (e.g. a deleted branch); try what was indexed
+            commit = self.ref_manifest.resolve(ref)
+        
+        if not commit or self.ref_manifest.resolve(commit) is None:
+            if ref not in self._unindexed_refs:
+                self._unindexed_refs.add(ref)
+                logger.warning(
+                    f"Ref {ref} is not indexed (see index_git_ref), searching the working tree"
+                )
+            return None, None
+        return commit, self.ref_manifest.scope(commit)
+    
+    def _reconcile_with_store(self,
+                              updates: List[FileUpdate],
+                              stored_ids: Optional[Dict[str, List[str]]] = None):
+        """
+        Diff updates of files without a usable manifest record against the store.
+        
+        Chunk ids are deterministic, so a stored chunk with the id of a new
+        chunk is identical to it and is kept without being re-embedded or
+        re-written; the file's other stored chunks become stale.
+        
+        Args:
+            updates: Planned file updates
+            stored_ids: Prefetched ids_for_files result (queried if None)
+        """
+        unknown = [update for update in updates if update.replace_all]
+        if not unknown:
+            return
+        if stored_ids is None:
+            stored_ids = self.vector_store.ids_for_files([update.path for update in unknown])
+        
+        for update in unknown:
+            existing = set(stored_ids.get(update.path, ()))
+            new_chunks = []
+            for chunk in update.new_chunks:
+                if chunk.id in existing:
+                    existing.discard(chunk.id)
+                    update.kept[chunk.id] = update.fingerprints.pop(chunk.id)
+                else:
+                    new_chunks.append(chunk)
+            update.new_chunks = new_chunks
+            update.stale_ids = list(existing)
+            update.replace_all = False
+    
+    def _delete_stale_chunks(self, updates: List[FileUpdate]):
+        """Delete stored chunks that planned file updates replace."""
+        stale_ids = []
+        replaced = []
+        for update in updates:
+            if update.replace_all:
+                replaced.append(update.path)
+            else:
+                stale_ids.extend(update.stale_ids)
+        self.vector_store.delete_by_files(replaced)
+        self.vector_store.delete_ids(stale_ids)
+    
+    def _prune_removed_files(self,
+                             root: Path,
+                             extensions: List[str],
+                             seen: Set[str]) -> int:
+        """Remove index entries for files under root that no longer exist."""
+        removed = []
+        for path in self.manifest.paths():
+            if path in seen or Path(path).is_absolute():
+                continue
+            if Path(path).suffix not in extensions or (root / path).exists():
+                continue
+            removed.append(path)
+        
+        if removed:
+            self.vector_store.delete_by_files(removed)
+            for path in removed:
+                self.manifest.remove(path)
+            self._index_changed()
+        return len(removed)
+    
+    def delete_by_file(self, file_path: str) -> int:
+        """
+        Remove a file from the index.
+        
+        Args:
+            file_path: Stored (repository-relative) path of the file
+            
+        Returns:
+            Number of chunks deleted
+        """
+        deleted = self.vector_store.delete_by_file(file_path)
+        self.manifest.remove(file_path)
+        self._index_changed()
+        return deleted
+    
+    def update_files(self, file_paths: List[str]) -> Dict[str, int]:
+        """
+        Bring the index up to date for files that changed on disk.
+        
+        Existing files go through the pipelined indexer together, so
+        embedding requests are batched across files; files that no longer
+        exist are removed from the index.
         
-        logger.info(f"Indexed {total_chunks} chunks from {len(files_to_index)} files")
+        Args:
+            file_paths: Paths of changed files (relative to repo_path or absolute)
+            
+        Returns:
+            Dictionary of file_path -> chunk_count (0 for removed files)
+        """
+        files, removed = [], {}
+        for file_path in file_paths:
+            abs_path = (self.repo_path / file_path).resolve()
+            stored_path = (
+                str(abs_path.relative_to(self.repo_path))
+                if abs_path.is_relative_to(self.repo_path)
+                else str(abs_path)
+            )
+            if abs_path.is_file():
+                files.append((str(abs_path), stored_path))
+            elif self.manifest.get(stored_path) is not None:
+                removed[stored_path] = 0
+        
+        if removed:
+            self.vector_store.delete_by_files(list(removed))
+            for stored_path in removed:
+                self.manifest.remove(stored_path)
+            self._index_changed()
+        
+        results = {}
+        if files:
+            indexer = PipelinedIndexer(self, max_workers=self.index_workers)
+            results, self.last_indexing_stats = indexer.index_files(files)
+        
+        self.flush()
+        results.update(removed)
         return results
     
+    def _index_changed(self):
+        """Invalidate cached search results after a vector store write."""
+        self.query_cache.bump_generation()
+    
+    def _cached_search(self, search_type: str, query: str, k: int,
+                       filters: Optional[Dict[str, Any]], run) -> List[SearchResult]:
+        """Serve a search from the query cache, running it on a miss."""
+        if not self.query_cache.max_bytes:
+            return run()
+        
+        key = QueryCache.make_key(query, k, filters, search_type)
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            return cached
+        
+        # Results computed while the index changes must not be cached
+        generation = self.query_cache.generation
+        results = run()
+        # Nor results missing a timed-out or failed search leg
+        if getattr(results, "complete", True):
+            self.query_cache.put(key, results, generation=generation)
+        return results
+    
+    def _cache_lookup(self, key: str) -> Optional[List[SearchResult]]:
+        """Get cached results, timed as this lookup."""
+        start = time.perf_counter()
+        cached = self.query_cache.get(key)
+        if cached is not None:
+            # Report this lookup, not the timings of the search that filled the cache
+            elapsed = (time.perf_counter() - start) * 1000
+            for result in cached:
+                result.timings = {"query_cache": elapsed, "total": elapsed}
+        return cached
+    
+    def cached_search_code(self,
+                           query: str,
+                           k: int = 10,
+                           filters: Optional[Dict[str, Any]] = None,
+                           ref: Optional[str] = None) -> Optional[List[SearchResult]]:
+        """
+        Get the cached results of a search_code call without searching.
+        
+        Lets callers that embed queries themselves skip the embedding
+        when the results are already cached.
+        
+        Returns:
+            Cached results, or None on a miss
+        """
+        if not self.query_cache.max_bytes:
+            return None
+        commit, _ = self._ref_scope(ref) if ref else (None, None)
+        key = QueryCache.make_key(
+            query, k, filters, f"hybrid@{commit}" if commit else "hybrid"
+        )
+        return self._cache_lookup(key)
+    
     def search_code(self,
                    query: str,
                    k: int = 10,
-                   filters: Optional[Dict[str, Any]] = None) -> List[SearchResult]:
+                   filters: Optional[Dict[str, Any]] = None,
+                   ref: Optional[str] = None,
+                   query_embedding: Optional[List[float]] = None) -> List[SearchResult]:
         """
         Search for code.
         
+        Results are cached until the index next changes.
+        
         Args:
             query: Search query
             k: Number of results
             filters: Optional filters
+            ref: Git ref (branch, tag or commit) indexed with index_git_ref to
+                restrict results to; results carry the file paths of that
+                ref's tree. Without a ref the working-tree index is searched.
+            query_embedding: Embedding of the query, if already computed
             
         Returns:
             List of search results
         """
-        return self.search.search(
-            query=query,
-            k=k,
-            filters=filters,
-            search_type="hybrid"
+        commit, scope = self._ref_scope(ref) if ref else (None, None)
+        
+        return self._cached_search(
+            f"hybrid@{commit}" if commit else "hybrid", query, k, filters,
+            lambda: self.search.search(
+                query=query,
+                k=k,
+                filters=filters,
+                search_type="hybrid",
+                scope=scope,
+                query_embedding=query_embedding
+            )
         )
     
     def get_context(self,
                    query: str,
                    k: int = 10,
-                   max_tokens: int = 3000) -> str:
+                   max_tokens: int = 3000,
+                   ref: Optional[str] = None) -> str:
         """
         Get context for LLM prompts.
         
@@ -249,49 +641,58 @@ class RAGService:
             query: Context query
             k: Number of chunks to retrieve
             max_tokens: Maximum tokens in context
+            ref: Git ref to restrict context to
             
         Returns:
             Formatted context string
         """
-        # Search for relevant chunks
-        results = self.search_code(query, k=k)
+        packed = self.pack_context(query, k=k, max_tokens=max_tokens, ref=ref)
         
-        if not results:
+        if not packed.candidates:
             return "No relevant context found."
         
-        # Format context
-        context_parts = []
-        total_tokens = 0
+        return packed.text
+    
+    def pack_context(self,
+                     query: str,
+                     k: int = 10,
+                     max_tokens: int = 3000,
+                     ref: Optional[str] = None) -> PackedContext:
+        """
+        Get context for LLM prompts as structured spans.
         
-        for result in results:
-            chunk = result.chunk
-            
-            # Format chunk
-            chunk_text = f"""File: {chunk.file_path}:{chunk.start_line}-{chunk.end_line}
-```{chunk.language}
-{chunk.content}
-```
-"""
-            
-            # Check token count
-            chunk_tokens = self.embedding_service.count_tokens(chunk_text)
-            if total_tokens + chunk_tokens > max_tokens:
-                break
-            
-            context_parts.append(chunk_text)
-            total_tokens += chunk_tokens
+        The most relevant set of chunks that fits in max_tokens is
+        selected (not just the leading ones), and adjacent or overlapping
+        chunks of a file are merged into one span.
         
-        return "\n".join(context_parts)
+        Args:
+            query: Context query
+            k: Number of chunks to retrieve
+            max_tokens: Maximum tokens in context
+            ref: Git ref to restrict context to
+            
+        Returns:
+            Packed context with spans, token usage and formatted text
+        """
+        results = self.search_code(query, k=k, ref=ref)
+        return self.context_packer.pack(results, max_tokens)
     
     def find_symbol(self,
                    symbol_name: str,
-                   symbol_type: Optional[str] = None) -> List[SearchResult]:
+                   symbol_type: Optional[str] = None,
+                   prefix: bool = False,
+                   ref: Optional[str] = None) -> List[SearchResult]:
         """
         Find a specific symbol.
         
+        Definitions come from the symbol index; hybrid search is only used
+        when no indexed symbol matches.
+        
         Args:
-            symbol_name: Name of the symbol
+            symbol_name: Name of the symbol, optionally qualified (Class.method)
             symbol_type: Type of symbol (function, class, etc)
+            prefix: Also match symbols starting with symbol_name
+            ref: Git ref to restrict results to
             
         Returns:
             List of search results
@@ -300,9 +701,17 @@ class RAGService:
         if symbol_type:
             filters["chunk_type"] = symbol_type
         
-        return self.search.search_by_symbol(
-            symbol_name=symbol_name,
-            filters=filters
+        commit, scope = self._ref_scope(ref) if ref else (None, None)
+        search_type = "symbol_prefix" if prefix else "symbol"
+        
+        return self._cached_search(
+            f"{search_type}@{commit}" if commit else search_type, symbol_name, 0, filters,
+            lambda: self.search.search_by_symbol(
+                symbol_name=symbol_name,
+                filters=filters,
+                prefix=prefix,
+                scope=scope
+            )
         )
     
     def get_snippet(self,
@@ -357,28 +766,53 @@ class RAGService:
             total_files=len(self.indexed_files),
             total_embeddings=vector_stats.get("total_chunks", 0),
             languages=vector_stats.get("languages", {}),
-            chunk_types=vector_stats.get("chunk_types", {})
+            chunk_types=vector_stats.get("chunk_types", {}),
+            cache_stats={
+                "embedding_model": {
+                    "backend": getattr(self.embedding_service.backend, "name", None),
+                    "model": self.embedding_service.model,
+                    "dimension": self.embedding_service.dimension,
+                    "enabled": self.embedding_service.enabled
+                },
+                "embedding_cache": self.embedding_service.get_cache_stats(),
+                "embedding_coalescing": self.embedding_service.get_coalescing_stats(),
+                "query_cache": self.query_cache.get_stats(),
+                "token_counts": self.token_counts.get_stats()
+            }
         )
     
+    def _bind_embedding_model(self):
+        """Check the collection was embedded with the current model."""
+        backend = self.embedding_service.backend
+        if backend is None:
+            return
+        
+        if not self.vector_store.bind_embedding_model(backend.model_id, backend.dimension):
+            # Vectors of different models are not comparable; keep keyword
+            # and symbol search, but neither embed nor vector-search
+            logger.warning(
+                f"Vector search disabled: the index was built with a different "
+                f"embedding model. Re-index into a new persist directory to use "
+                f"{backend.model_id}."
+            )
+            self.embedding_service.enabled = False
+    
     def clear_index(self):
         """Clear the entire index."""
         # TODO: Implement proper index clearing
         logger.warning("Index clearing not fully implemented")
-        self.indexed_files.clear()
-        self._save_indexed_files()
+        self.manifest.clear()
+        self.blob_manifest.clear()
+        self.ref_manifest.clear()
+        self._index_changed()
     
-    def _load_indexed_files(self):
-        """Load list of indexed files."""
-        if self.persist_dir:
-            index_file = self.persist_dir / "indexed_files.txt"
-            if index_file.exists():
-                with open(index_file, 'r') as f:
-                    self.indexed_files = set(line.strip() for line in f)
+    def flush(self):
+        """Persist pending index bookkeeping."""
+        self.manifest.flush()
     
-    def _save_indexed_files(self):
-        """Save list of indexed files."""
-        if self.persist_dir:
-            index_file = self.persist_dir / "indexed_files.txt"
-            with open(index_file, 'w') as f:
-                for file_path in sorted(self.indexed_files):
-                    f.write(f"{file_path}\n")
\ No newline at end of file
+    def close(self):
+        """Flush pending state and release resources."""
+        self._close_manifests()
+        self.query_cache.close()
+        self.token_counts.close()
+        self.vector_store.close()
\ No newline at end of file
@@ -0,0 +1,276 @@
+"""
+Symbol-name index for the RAG service.
+
+Maps the symbol names recorded in chunk metadata (plus ``Parent.name``
+qualified names for methods and the names folded into merged chunks) to
+chunk ids. Names are kept in SQLite B-tree indexes next to the vector
+store, so exact lookups and prefix range scans are O(log n) and symbol
+lookups no longer need a hybrid search.
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .keyword_index import SCOPE_FIELD, scope_condition
+
+logger = logging.getLogger(__name__)
+
+# Lookup filters supported by the index
+SYMBOL_FILTER_FIELDS = ("file_path", "language", "chunk_type")
+
+# Ranking of match kinds, best first
+_EXACT, _QUALIFIED, _CASE_INSENSITIVE, _PREFIX = range(4)
+
+# Chunks that define a symbol rank above chunks that merely contain it
+_DEFINITION_TYPES = ("class", "function", "method")
+
+
+def _value(value: Any) -> Any:
+    """Unwrap enum values stored in metadata."""
+    return getattr(value, "value", value)
+
+
+def symbol_names(metadata: Dict[str, Any]) -> List[Tuple[str, bool]]:
+    """
+    Get the (name, merged) pairs a chunk is indexed under.
+
+    Args:
+        metadata: Stored chunk metadata
+
+    Returns:
+        The chunk's own symbol (and its qualified form if it has a parent),
+        followed by symbols folded into it by chunk merging
+    """
+    names = []
+    symbol = metadata.get("symbol_name")
+    if symbol:
+        names.append((symbol, False))
+        parent = metadata.get("parent_symbol")
+        if parent:
+            names.append((f"{parent}.{symbol}", False))
+
+    for merged in str(metadata.get("merged_symbols") or "").split(","):
+        if merged and merged != symbol:
+            names.append((merged, True))
+    return names
+
+
+class SymbolIndex:
+    """
+    Exact and prefix lookup of chunks by symbol name.
+
+    Every (name, chunk) pair is one row. ``name`` and its lowercase form
+    are indexed for exact, case-insensitive and prefix lookups, and
+    ``short_name`` (the last dotted component) lets ``Parser.parse`` and
+    ``parse`` find the same method.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the symbol index.
+
+        Args:
+            db_path: Path to the SQLite database (None for in-memory)
+        """
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self.db_path = str(db_path)
+        else:
+            self.db_path = ":memory:"
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create tables and indexes if they do not exist."""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS symbols (
+                    name TEXT NOT NULL,
+                    name_lower TEXT NOT NULL,
+                    short_name TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    file_path TEXT,
+                    language TEXT,
+                    chunk_type TEXT,
+                    start_line INTEGER,
+                    merged INTEGER NOT NULL DEFAULT 0,
+                    blob_sha TEXT,
+                    PRIMARY KEY (name, chunk_id)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS symbols_name_lower ON symbols(name_lower)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS symbols_short_name ON symbols(short_name)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS symbols_chunk_id ON symbols(chunk_id)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(symbols)")}
+            if SCOPE_FIELD not in columns:
+                # Indexes created before ref scoping: drop the built marker so
+                # the store rebuilds them with blob shas
+                self._conn.execute(f"ALTER TABLE symbols ADD COLUMN {SCOPE_FIELD} TEXT")
+                self._conn.execute("DELETE FROM symbols")
+                self._conn.execute("DELETE FROM meta")
+
+    @property
+    def built(self) -> bool:
+        """Whether the index was populated; it is maintained incrementally after."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'built'"
+            ).fetchone()
+        return row is not None
+
+    def mark_built(self):
+        """Record that the index covers every stored chunk."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('built', '1')")
+
+    def add_documents(self, documents: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Index chunks, replacing existing entries for the same ids.
+
+        Args:
+            documents: Iterable of (chunk_id, metadata) tuples
+
+        Returns:
+            Number of (name, chunk) rows written
+        """
+        chunk_ids = []
+        rows = []
+        for chunk_id, metadata in documents:
+            chunk_ids.append(chunk_id)
+            for name, merged in symbol_names(metadata):
+                rows.append((
+                    name,
+                    name.lower(),
+                    name.rsplit(".", 1)[-1],
+                    chunk_id,
+                    metadata.get("file_path"),
+                    _value(metadata.get("language")),
+                    _value(metadata.get("chunk_type")),
+                    metadata.get("start_line", 0),
+                    int(merged),
+                    metadata.get(SCOPE_FIELD),
+                ))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM symbols WHERE chunk_id = ?", [(i,) for i in chunk_ids]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def remove_ids(self, chunk_ids: Iterable[str]):
+        """Remove all entries for the given chunk ids."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM symbols WHERE chunk_id = ?", [(i,) for i in chunk_ids]
+            )
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM symbols")
+            self._conn.execute("DELETE FROM meta")
+
+    def lookup(self,
+               name: str,
+               k: int = 20,
+               filters: Optional[Dict[str, Any]] = None,
+               prefix: bool = False) -> List[Tuple[str, int]]:
+        """
+        Find chunks for a symbol name.
+
+        Matches are tried from most to least specific: the exact name, the
+        name as the last component of a qualified name (``parse`` finds
+        ``Parser.parse``), a case-insensitive match and, if ``prefix`` is
+        set, names starting with ``name``. Within each kind, definitions
+        rank above chunks a symbol was merged into.
+
+        Args:
+            name: Symbol name, optionally qualified (``Parser.parse``)
+            k: Maximum number of chunk ids
+            filters: Optional file_path/language/chunk_type filters and
+                a blob_sha ref scope (see keyword_index.scope_condition)
+            prefix: Also match names that start with name
+
+        Returns:
+            List of (chunk_id, match kind) tuples, best first
+        """
+        name = name.strip()
+        if not name:
+            return []
+
+        lowered = name.lower()
+        queries = [
+            (_EXACT, "name = ?", (name,)),
+            (_QUALIFIED, "short_name = ?", (name,)),
+            (_CASE_INSENSITIVE, "name_lower = ?", (lowered,)),
+        ]
+        if prefix:
+            # Range scan over the name_lower index
+            queries.append(
+                (_PREFIX, "name_lower >= ? AND name_lower < ?", (lowered, lowered + "\uffff"))
+            )
+
+        where, params = [], []
+        for field, value in (filters or {}).items():
+            if field == SCOPE_FIELD:
+                clause, values = scope_condition(field, value)
+                where.append(clause)
+                params.extend(values)
+            elif field in SYMBOL_FILTER_FIELDS and value is not None:
+                where.append(f"{field} = ?")
+                params.append(_value(value))
+        extra = "".join(f" AND {clause}" for clause in where)
+
+        definition_types = ", ".join("?" * len(_DEFINITION_TYPES))
+        seen = set()
+        matches = []
+        with self._lock:
+            for kind, condition, values in queries:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT chunk_id FROM symbols
+                    WHERE {condition}{extra}
+                    ORDER BY merged, chunk_type NOT IN ({definition_types}),
+                             LENGTH(name), file_path, start_line
+                    LIMIT ?
+                    """,
+                    (*values, *params, *_DEFINITION_TYPES, k)
+                )
+                for (chunk_id,) in rows:
+                    if chunk_id not in seen:
+                        seen.add(chunk_id)
+                        matches.append((chunk_id, kind))
+                if len(matches) >= k:
+                    break
+
+        return matches[:k]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -3,73 +3,252 @@ Vector store implementation for the RAG service.
 """
 
 import os
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 import logging
 import json
 from datetime import datetime
 import re
 
-import chromadb
-from chromadb.config import Settings
 import numpy as np
 
 from .models import CodeChunk, SearchResult
+from .keyword_index import SCOPE_FIELD, KeywordIndex
+from .symbol_index import SymbolIndex
+
+# ChromaDB is optional when the local backend is used
+try:
+    import chromadb
+    from chromadb.config import Settings
+    CHROMADB_AVAILABLE = True
+except ImportError:
+    CHROMADB_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 
-class VectorStore:
+class BaseVectorStore(ABC):
     """
-    Vector store for code embeddings using ChromaDB.
+    Interface shared by the vector store backends.
     
-    This is the MVP implementation. Will be replaced with Qdrant
-    for production use.
+    Backends store chunk embeddings, documents and metadata; keyword and
+    symbol search and the chunk bookkeeping around them are implemented
+    here on top of the persistent BM25 and symbol-name indexes.
     """
     
-    def __init__(self, 
+    def __init__(self,
                  persist_directory: Optional[str] = None,
                  collection_name: str = "code_chunks"):
         """
-        Initialize the vector store.
+        Initialize common state.
         
         Args:
             persist_directory: Directory for persistence (None for in-memory)
             collection_name: Name of the collection
         """
         self.collection_name = collection_name
-        
-        # Initialize ChromaDB client
         if persist_directory:
             self.persist_directory = Path(persist_directory)
             self.persist_directory.mkdir(parents=True, exist_ok=True)
-            
-            self.client = chromadb.PersistentClient(
-                path=str(self.persist_directory),
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
-            )
         else:
-            self.client = chromadb.EphemeralClient(
-                settings=Settings(anonymized_telemetry=False)
-            )
+            self.persist_directory = None
+    
+    def _init_keyword_index(self):
+        """Open the keyword index next to the collection and backfill it."""
+        self.keyword_index = KeywordIndex(
+            db_path=str(self.persist_directory / f"{self.collection_name}_keywords.db")
+            if self.persist_directory else None
+        )
+        self._sync_keyword_index()
+    
+    def _init_symbol_index(self):
+        """Open the symbol index next to the collection and backfill it."""
+        self.symbol_index = SymbolIndex(
+            db_path=str(self.persist_directory / f"{self.collection_name}_symbols.db")
+            if self.persist_directory else None
+        )
+        try:
+            if not self.symbol_index.built:
+                if self.count():
+                    logger.info("Building symbol index")
+                for ids, _, metadatas in self._iter_records(documents=False):
+                    self.symbol_index.add_documents(zip(ids, metadatas))
+                self.symbol_index.mark_built()
+        except Exception as e:
+            logger.error(f"Error building symbol index: {e}")
+    
+    # Backend storage primitives
+    
+    @abstractmethod
+    def _add(self,
+             ids: List[str],
+             embeddings: List[List[float]],
+             metadatas: List[Dict[str, Any]],
+             documents: List[str]):
+        """Store new records."""
+        pass
+    
+    def _upsert(self,
+                ids: List[str],
+                embeddings: List[List[float]],
+                metadatas: List[Dict[str, Any]],
+                documents: List[str]):
+        """Store records, replacing existing records with the same ids."""
+        # Backends whose _add already replaces records only need _add
+        self._add(ids, embeddings, metadatas, documents)
+    
+    @abstractmethod
+    def search(self,
+               query_embedding: List[float],
+               k: int = 10,
+               filters: Optional[Dict[str, Any]] = None) -> List[Tuple[CodeChunk, float]]:
+        """
+        Search for similar code chunks.
         
-        # Get or create collection
-        # We need to specify that we'll handle embeddings ourselves
-        # to prevent ChromaDB from using its default embedding function
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            filters: Optional metadata filters
+            
+        Returns:
+            List of (chunk, score) tuples, score being cosine similarity
+        """
+        pass
+    
+    @abstractmethod
+    def get_records(self, chunk_ids: Sequence[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Get (document, metadata) for the stored chunks among chunk_ids."""
+        pass
+    
+    @abstractmethod
+    def _ids_for_files(self, file_paths: List[str]) -> Dict[str, List[str]]:
+        """Get the ids of the working-tree chunks stored for each of the files."""
+        pass
+    
+    @abstractmethod
+    def _delete(self, chunk_ids: List[str]):
+        """Delete records by id."""
+        pass
+    
+    @abstractmethod
+    def count(self) -> int:
+        """Get the number of stored chunks."""
+        pass
+    
+    @abstractmethod
+    def _iter_records(self,
+                      page_size: int = 1000,
+                      documents: bool = True) -> Iterator[Tuple[List[str], List[Optional[str]], List[Dict[str, Any]]]]:
+        """
+        Iterate over (ids, documents, metadatas) pages of all records.
+        
+        With documents=False, documents are not read and come back as None.
+        """
+        pass
+    
+    @abstractmethod
+    def _get_collection_meta(self) -> Dict[str, str]:
+        """Get the collection-level metadata (embedding model and dimension)."""
+        pass
+    
+    @abstractmethod
+    def _set_collection_meta(self, meta: Dict[str, str]):
+        """Store collection-level metadata."""
+        pass
+    
+    def bind_embedding_model(self, model_id: str, dimension: int) -> bool:
+        """
+        Record which embedding model the collection's vectors come from.
+        
+        The first model used with a collection is stored on it; later
+        sessions must use the same model, since vectors of different models
+        (or dimensions) cannot be compared.
+        
+        Args:
+            model_id: Embedding backend and model (e.g. "hashing:ngram3-384")
+            dimension: Embedding dimension
+            
+        Returns:
+            False if the collection was embedded with a different model
+        """
         try:
-            self.collection = self.client.get_collection(name=self.collection_name)
-            logger.info(f"Loaded existing collection: {self.collection_name}")
-        except:
-            # Create collection without embedding function since we provide our own
-            self.collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"},
-                embedding_function=None  # Disable default embedding function
-            )
-            logger.info(f"Created new collection: {self.collection_name}")
+            meta = self._get_collection_meta()
+            stored_model = meta.get("embedding_model")
+            stored_dimension = meta.get("embedding_dimension")
+            
+            if stored_dimension is not None and int(stored_dimension) != dimension:
+                logger.warning(
+                    f"Collection {self.collection_name} has {stored_dimension}-dimensional "
+                    f"embeddings ({stored_model or 'unknown model'}), but {model_id} "
+                    f"produces {dimension}"
+                )
+                return False
+            if stored_model is not None and stored_model != model_id:
+                logger.warning(
+                    f"Collection {self.collection_name} was embedded with "
+                    f"{stored_model}, not {model_id}"
+                )
+                return False
+            
+            if stored_model is None:
+                # New collection, or one indexed before models were recorded
+                self._set_collection_meta({
+                    "embedding_model": model_id,
+                    "embedding_dimension": str(dimension)
+                })
+            return True
+        except Exception as e:
+            logger.error(f"Error reading collection metadata: {e}")
+            return True
+    
+    def get_embedding_model(self) -> Dict[str, Any]:
+        """Get the embedding model and dimension recorded on the collection."""
+        try:
+            meta = self._get_collection_meta()
+        except Exception as e:
+            logger.error(f"Error reading collection metadata: {e}")
+            return {}
+        dimension = meta.get("embedding_dimension")
+        return {
+            "model": meta.get("embedding_model"),
+            "dimension": int(dimension) if dimension is not None else None
+        }
+    
+    def _sync_keyword_index(self, page_size: int = 1000):
+        """Backfill the keyword index from an existing collection."""
+        try:
+            count = self.count()
+            if count == 0 or len(self.keyword_index) == count:
+                return
+            
+            logger.info(f"Rebuilding keyword index for {count} chunks")
+            self.keyword_index.clear()
+            for ids, documents, metadatas in self._iter_records(page_size):
+                self.keyword_index.add_documents(zip(ids, documents, metadatas))
+        except Exception as e:
+            logger.error(f"Error rebuilding keyword index: {e}")
+    
+    def _chunk_metadata(self, chunk: CodeChunk) -> Dict[str, Any]:
+        """Get the flat metadata stored for a chunk."""
+        metadata = {
+            "file_path": chunk.file_path,
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line,
+            "chunk_type": chunk.chunk_type,
+            "language": chunk.language,
+            "created_at": chunk.created_at.isoformat()
+        }
+        
+        if chunk.symbol_name:
+            metadata["symbol_name"] = chunk.symbol_name
+        
+        # Add custom metadata
+        for key, value in chunk.metadata.items():
+            if isinstance(value, (str, int, float, bool)):
+                metadata[key] = value
+        
+        return metadata
     
     def add_chunks(self, chunks: List[CodeChunk]) -> int:
         """
@@ -81,6 +260,26 @@ class VectorStore:
         Returns:
             Number of chunks added
         """
+        return self._write_chunks(chunks, upsert=False)
+    
+    def upsert_chunks(self, chunks: List[CodeChunk]) -> int:
+        """
+        Add code chunks, replacing stored chunks with the same ids.
+        
+        With deterministic chunk ids (see manifest.file_chunk_id) writing
+        the chunks of a re-indexed file is idempotent, so no delete is
+        needed before the write.
+        
+        Args:
+            chunks: List of code chunks with embeddings
+            
+        Returns:
+            Number of chunks written
+        """
+        return self._write_chunks(chunks, upsert=True)
+    
+    def _write_chunks(self, chunks: List[CodeChunk], upsert: bool) -> int:
+        """Write chunks that have embeddings, with add or upsert semantics."""
         if not chunks:
             return 0
         
@@ -91,43 +290,21 @@ class VectorStore:
             logger.warning("No chunks with embeddings to add")
             return 0
         
-        # Prepare data for ChromaDB
         ids = [chunk.id for chunk in chunks_with_embeddings]
         embeddings = [chunk.embedding for chunk in chunks_with_embeddings]
-        
-        # Prepare metadata
-        metadatas = []
-        for chunk in chunks_with_embeddings:
-            metadata = {
-                "file_path": chunk.file_path,
-                "start_line": chunk.start_line,
-                "end_line": chunk.end_line,
-                "chunk_type": chunk.chunk_type,
-                "language": chunk.language,
-                "created_at": chunk.created_at.isoformat()
-            }
-            
-            if chunk.symbol_name:
-                metadata["symbol_name"] = chunk.symbol_name
-            
-            # Add custom metadata
-            for key, value in chunk.metadata.items():
-                if isinstance(value, (str, int, float, bool)):
-                    metadata[key] = value
-            
-            metadatas.append(metadata)
+        metadatas = [self._chunk_metadata(chunk) for chunk in chunks_with_embeddings]
         
         # Prepare documents (for keyword search)
         documents = [chunk.content for chunk in chunks_with_embeddings]
         
-        # Add to collection
         try:
-            self.collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                documents=documents
-            )
+            if upsert:
+                self._upsert(ids, embeddings, metadatas, documents)
+            else:
+                self._add(ids, embeddings, metadatas, documents)
+            
+            self.keyword_index.add_documents(zip(ids, documents, metadatas))
+            self.symbol_index.add_documents(zip(ids, metadatas))
             
             logger.info(f"Added {len(chunks_with_embeddings)} chunks to vector store")
             return len(chunks_with_embeddings)
@@ -136,169 +313,159 @@ class VectorStore:
             logger.error(f"Error adding chunks to vector store: {e}")
             return 0
     
-    def search(self, 
-               query_embedding: List[float],
-               k: int = 10,
-               filters: Optional[Dict[str, Any]] = None) -> List[Tuple[CodeChunk, float]]:
+    def keyword_search(self,
+                      query: str,
+                      k: int = 10,
+                      filters: Optional[Dict[str, Any]] = None) -> List[Tuple[CodeChunk, float]]:
         """
-        Search for similar code chunks.
+        Keyword search implementation.
+        
+        Candidates are ranked with BM25 over the persistent inverted index;
+        only the top k documents are fetched from the backend.
         
         Args:
-            query_embedding: Query embedding vector
-            k: Number of results to return
+            query: Search query
+            k: Number of results
             filters: Optional metadata filters
             
         Returns:
             List of (chunk, score) tuples
         """
         try:
-            # Build where clause from filters
-            where = {}
-            if filters:
-                for key, value in filters.items():
-                    if key in ["file_path", "language", "chunk_type"]:
-                        where[key] = value
+            hits = self.keyword_index.search(query, k=k, filters=filters)
+            if not hits:
+                return []
             
-            # Search
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=k,
-                where=where if where else None
-            )
+            by_id = self.get_records([chunk_id for chunk_id, _ in hits])
             
-            # Parse results
-            chunks_with_scores = []
+            # BM25 scores are unbounded; scale to 0-1 for hybrid merging
+            top_score = hits[0][1] or 1.0
             
-            if results['ids'] and results['ids'][0]:
-                for i in range(len(results['ids'][0])):
-                    # Reconstruct chunk
-                    chunk_id = results['ids'][0][i]
-                    metadata = results['metadatas'][0][i]
-                    document = results['documents'][0][i]
-                    distance = results['distances'][0][i]
-                    
-                    # Convert distance to similarity score (1 - cosine distance)
-                    score = 1.0 - distance
-                    
-                    # Create chunk object
-                    chunk = CodeChunk(
-                        id=chunk_id,
-                        content=document,
-                        file_path=metadata.get('file_path', ''),
-                        start_line=metadata.get('start_line', 0),
-                        end_line=metadata.get('end_line', 0),
-                        chunk_type=metadata.get('chunk_type', 'general'),
-                        language=metadata.get('language', 'unknown'),
-                        symbol_name=metadata.get('symbol_name'),
-                        metadata={k: v for k, v in metadata.items() 
-                                if k not in ['file_path', 'start_line', 'end_line', 
-                                           'chunk_type', 'language', 'symbol_name']}
-                    )
-                    
-                    chunks_with_scores.append((chunk, score))
+            chunks_with_scores = []
+            for chunk_id, score in hits:
+                if chunk_id not in by_id:
+                    continue
+                document, metadata = by_id[chunk_id]
+                chunk = self._chunk_from_record(chunk_id, document, metadata)
+                chunks_with_scores.append((chunk, score / top_score))
             
             return chunks_with_scores
             
         except Exception as e:
-            logger.error(f"Error searching vector store: {e}")
+            logger.error(f"Error in keyword search: {e}")
             return []
     
-    def keyword_search(self,
-                      query: str,
-                      k: int = 10,
-                      filters: Optional[Dict[str, Any]] = None) -> List[Tuple[CodeChunk, float]]:
+    def symbol_search(self,
+                      symbol_name: str,
+                      k: int = 20,
+                      filters: Optional[Dict[str, Any]] = None,
+                      prefix: bool = False) -> List[Tuple[CodeChunk, float]]:
         """
-        Keyword search implementation.
-        
-        Note: We implement our own keyword search instead of using ChromaDB's
-        query_texts to avoid embedding dimension mismatches. ChromaDB's default
-        embedding function creates 384D embeddings while we use 1536D embeddings
-        from OpenAI's text-embedding-3-small model.
+        Look up chunks by symbol name.
         
         Args:
-            query: Search query
+            symbol_name: Symbol name, optionally qualified (Class.method)
             k: Number of results
             filters: Optional metadata filters
+            prefix: Also match symbols starting with symbol_name
             
         Returns:
-            List of (chunk, score) tuples
+            List of (chunk, score) tuples, exact matches scoring highest
         """
         try:
-            # Build where clause
-            where = {}
-            if filters:
-                for key, value in filters.items():
-                    if key in ["file_path", "language", "chunk_type"]:
-                        where[key] = value
+            hits = self.symbol_index.lookup(symbol_name, k=k, filters=filters, prefix=prefix)
+            if not hits:
+                return []
             
-            # Use ChromaDB's document search instead of query_texts
-            # This searches the stored documents without creating new embeddings
-            all_results = self.collection.get(
-                where=where if where else None,
-                include=["documents", "metadatas"]
-            )
+            by_id = self.get_records([chunk_id for chunk_id, _ in hits])
             
-            # Perform keyword matching on documents
             chunks_with_scores = []
-            
-            if all_results['ids']:
-                # Convert query to lowercase for case-insensitive search
-                query_lower = query.lower()
-                query_words = query_lower.split()
-                
-                # Score each document based on keyword matches
-                scored_chunks = []
-                
-                for i in range(len(all_results['ids'])):
-                    chunk_id = all_results['ids'][i]
-                    metadata = all_results['metadatas'][i]
-                    document = all_results['documents'][i]
-                    
-                    # Calculate keyword match score
-                    document_lower = document.lower()
-                    score = 0.0
-                    
-                    # Count exact word matches
-                    for word in query_words:
-                        if len(word) >= 2:  # Skip very short words
-                            count = document_lower.count(word)
-                            if count > 0:
-                                # Give higher score for more occurrences, with diminishing returns
-                                score += min(count * 0.1, 0.5)
-                    
-                    # Bonus for exact phrase match
-                    if query_lower in document_lower:
-                        score += 0.5
-                    
-                    # Normalize score to 0-1 range
-                    score = min(score / max(len(query_words), 1), 1.0)
-                    
-                    if score > 0:
-                        chunk = CodeChunk(
-                            id=chunk_id,
-                            content=document,
-                            file_path=metadata.get('file_path', ''),
-                            start_line=metadata.get('start_line', 0),
-                            end_line=metadata.get('end_line', 0),
-                            chunk_type=metadata.get('chunk_type', 'general'),
-                            language=metadata.get('language', 'unknown'),
-                            symbol_name=metadata.get('symbol_name'),
-                            metadata={k: v for k, v in metadata.items() 
-                                    if k not in ['file_path', 'start_line', 'end_line', 
-                                               'chunk_type', 'language', 'symbol_name']}
-                        )
-                        scored_chunks.append((chunk, score))
-                
-                # Sort by score and return top k
-                scored_chunks.sort(key=lambda x: x[1], reverse=True)
-                chunks_with_scores = scored_chunks[:k]
+            for chunk_id, kind in hits:
+                if chunk_id not in by_id:
+                    continue
+                document, metadata = by_id[chunk_id]
+                chunk = self._chunk_from_record(chunk_id, document, metadata)
+                chunks_with_scores.append((chunk, 1.0 - 0.1 * kind))
             
             return chunks_with_scores
             
         except Exception as e:
-            logger.error(f"Error in keyword search: {e}")
+            logger.error(f"Error in symbol search: {e}")
             return []
     
+    def _chunk_from_record(self,
+                           chunk_id: str,
+                           document: str,
+                           metadata: Dict[str, Any]) -> CodeChunk:
+        """Reconstruct a code chunk from a stored document and its metadata."""
+        return CodeChunk(
+            id=chunk_id,
+            content=document,
+            file_path=metadata.get('file_path', ''),
+            start_line=metadata.get('start_line', 0),
+            end_line=metadata.get('end_line', 0),
+            chunk_type=metadata.get('chunk_type', 'general'),
+            language=metadata.get('language', 'unknown'),
+            symbol_name=metadata.get('symbol_name'),
+            metadata={k: v for k, v in metadata.items() 
+                    if k not in ['file_path', 'start_line', 'end_line', 
+                               'chunk_type', 'language', 'symbol_name']}
+        )
+    
+    def ids_for_files(self,
+                      file_paths: List[str],
+                      page_size: int = 500) -> Dict[str, List[str]]:
+        """
+        Get the ids of the chunks stored for many files.
+        
+        Files are looked up in pages with one query each ($in filter),
+        rather than one query per file. Chunks indexed from git refs are
+        kept by blob, not by file, and are not included.
+        
+        Args:
+            file_paths: Stored paths of the files
+            page_size: Files per query
+            
+        Returns:
+            Dictionary of file_path -> chunk ids (files without chunks are omitted)
+        """
+        ids_by_file: Dict[str, List[str]] = {}
+        for i in range(0, len(file_paths), page_size):
+            ids_by_file.update(self._ids_for_files(list(file_paths[i:i + page_size])))
+        return ids_by_file
+    
+    def delete_by_files(self, file_paths: List[str]) -> int:
+        """
+        Delete all chunks for many files in bulk.
+        
+        Args:
+            file_paths: Paths of the files
+            
+        Returns:
+            Number of chunks deleted
+        """
+        if not file_paths:
+            return 0
+        
+        try:
+            chunk_ids = [
+                chunk_id
+                for ids in self.ids_for_files(file_paths).values()
+                for chunk_id in ids
+            ]
+            
+            if chunk_ids:
+                self._delete(chunk_ids)
+                self.keyword_index.remove_ids(chunk_ids)
+                self.symbol_index.remove_ids(chunk_ids)
+                logger.info(f"Deleted {len(chunk_ids)} chunks for {len(file_paths)} files")
+            
+            return len(chunk_ids)
+            
+        except Exception as e:
+            logger.error(f"Error deleting chunks: {e}")
+            return 0
+    
     def delete_by_file(self, file_path: str) -> int:
         """
         Delete all chunks for a file.
@@ -309,61 +476,266 @@ class VectorStore:
         Returns:
             Number of chunks deleted
         """
-        try:
-            # Get all chunks for the file
-            results = self.collection.get(
-                where={"file_path": file_path}
-            )
-            
-            if results['ids']:
-                # Delete chunks
-                self.collection.delete(ids=results['ids'])
-                logger.info(f"Deleted {len(results['ids'])} chunks for {file_path}")
-                return len(results['ids'])
+        return self.delete_by_files([file_path])
+    
+    def delete_ids(self, chunk_ids: List[str]) -> int:
+        """
+        Delete chunks by id.
+        
+        Args:
+            chunk_ids: Ids of the chunks to delete
             
+        Returns:
+            Number of chunks deleted
+        """
+        if not chunk_ids:
             return 0
+        
+        try:
+            self._delete(chunk_ids)
+            self.keyword_index.remove_ids(chunk_ids)
+            self.symbol_index.remove_ids(chunk_ids)
+            return len(chunk_ids)
             
         except Exception as e:
             logger.error(f"Error deleting chunks: {e}")
             return 0
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get statistics about the vector store."""
+        """
+        Get statistics about the vector store.
+        
+        Counts come from the counters maintained by the keyword index on
+        every add and delete, so they are exact and need no scan.
+        """
         try:
-            # Get collection info
-            count = self.collection.count()
-            
-            # Get sample to analyze
-            sample = self.collection.get(limit=1000)
-            
-            # Analyze metadata
-            languages = {}
-            chunk_types = {}
-            file_count = set()
-            
-            if sample['metadatas']:
-                for metadata in sample['metadatas']:
-                    # Count languages
-                    lang = metadata.get('language', 'unknown')
-                    languages[lang] = languages.get(lang, 0) + 1
-                    
-                    # Count chunk types
-                    chunk_type = metadata.get('chunk_type', 'general')
-                    chunk_types[chunk_type] = chunk_types.get(chunk_type, 0) + 1
-                    
-                    # Count unique files
-                    file_path = metadata.get('file_path')
-                    if file_path:
-                        file_count.add(file_path)
-            
             return {
-                "total_chunks": count,
-                "total_files": len(file_count),
-                "languages": languages,
-                "chunk_types": chunk_types,
-                "collection_name": self.collection_name
+                "total_chunks": self.count(),
+                "total_files": len(self.keyword_index.field_counts("file_path")),
+                "languages": self.keyword_index.field_counts("language"),
+                "chunk_types": self.keyword_index.field_counts("chunk_type"),
+                "collection_name": self.collection_name,
+                "backend": self.backend,
+                "embedding_model": self.get_embedding_model()
             }
             
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
-            return {}
\ No newline at end of file
+            return {}
+    
+    def file_chunk_counts(self) -> Dict[str, int]:
+        """Get the number of stored chunks per file."""
+        return self.keyword_index.field_counts("file_path")
+    
+    def close(self):
+        """Release resources held by the store."""
+        self.keyword_index.close()
+        self.symbol_index.close()
+
+
+class VectorStore(BaseVectorStore):
+    """
+    Vector store for code embeddings using ChromaDB.
+    
+    This is the MVP implementation. Will be replaced with Qdrant
+    for production use.
+    """
+    
+    backend = "chroma"
+    
+    def __init__(self, 
+                 persist_directory: Optional[str] = None,
+                 collection_name: str = "code_chunks"):
+        """
+        Initialize the vector store.
+        
+        Args:
+            persist_directory: Directory for persistence (None for in-memory)
+            collection_name: Name of the collection
+        """
+        if not CHROMADB_AVAILABLE:
+            raise ImportError(
+                "ChromaDB support not available. Install chromadb or use the local backend."
+            )
+        super().__init__(persist_directory, collection_name)
+        
+        # Initialize ChromaDB client
+        if self.persist_directory:
+            self.client = chromadb.PersistentClient(
+                path=str(self.persist_directory),
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True
+                )
+            )
+        else:
+            self.client = chromadb.EphemeralClient(
+                settings=Settings(anonymized_telemetry=False)
+            )
+        
+        # Get or create collection
+        # We need to specify that we'll handle embeddings ourselves
+        # to prevent ChromaDB from using its default embedding function
+        try:
+            self.collection = self.client.get_collection(name=self.collection_name)
+            logger.info(f"Loaded existing collection: {self.collection_name}")
+        except:
+            # Create collection without embedding function since we provide our own
+            self.collection = self.client.create_collection(
+                name=self.collection_name,
+                metadata={"hnsw:space": "cosine"},
+                embedding_function=None  # Disable default embedding function
+            )
+            logger.info(f"Created new collection: {self.collection_name}")
+        
+        # Keyword and symbol indexes, stored next to the collection
+        self._init_keyword_index()
+        self._init_symbol_index()
+    
+    def _iter_records(self, page_size: int = 1000, documents: bool = True):
+        """Iterate over (ids, documents, metadatas) pages of all records."""
+        count = self.collection.count()
+        for offset in range(0, count, page_size):
+            page = self.collection.get(
+                limit=page_size,
+                offset=offset,
+                include=["documents", "metadatas"] if documents else ["metadatas"]
+            )
+            yield (
+                page['ids'],
+                page['documents'] if documents else [None] * len(page['ids']),
+                page['metadatas']
+            )
+    
+    def _add(self, ids, embeddings, metadatas, documents):
+        """Add records to the collection."""
+        self.collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            documents=documents
+        )
+    
+    def _upsert(self, ids, embeddings, metadatas, documents):
+        """Add or replace records in the collection."""
+        self.collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            documents=documents
+        )
+    
+    def search(self, 
+               query_embedding: List[float],
+               k: int = 10,
+               filters: Optional[Dict[str, Any]] = None) -> List[Tuple[CodeChunk, float]]:
+        """
+        Search for similar code chunks.
+        
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            filters: Optional metadata filters
+            
+        Returns:
+            List of (chunk, score) tuples
+        """
+        try:
+            # Build where clause from filters
+            conditions = []
+            if filters:
+                for key, value in filters.items():
+                    if key in ["file_path", "language", "chunk_type"]:
+                        conditions.append({key: value})
+                    elif key == SCOPE_FIELD and value is not None:
+                        # Chroma cannot match a missing key, so a working
+                        # tree scope (None) is left to the caller
+                        values = [value] if isinstance(value, str) else list(value)
+                        conditions.append({key: {"$in": values}})
+            where = conditions[0] if len(conditions) == 1 else (
+                {"$and": conditions} if conditions else None
+            )
+            
+            # Search
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=k,
+                where=where
+            )
+            
+            # Parse results
+            chunks_with_scores = []
+            
+            if results['ids'] and results['ids'][0]:
+                for i in range(len(results['ids'][0])):
+                    # Reconstruct chunk
+                    chunk_id = results['ids'][0][i]
+                    metadata = results['metadatas'][0][i]
+                    document = results['documents'][0][i]
+                    distance = results['distances'][0][i]
+                    
+                    # Convert distance to similarity score (1 - cosine distance)
+                    score = 1.0 - distance
+                    
+                    chunk = self._chunk_from_record(chunk_id, document, metadata)
+                    
+                    chunks_with_scores.append((chunk, score))
+            
+            return chunks_with_scores
+            
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}")
+            return []
+    
+    def get_records(self, chunk_ids):
+        """Get (document, metadata) for the stored chunks among chunk_ids."""
+        records = self.collection.get(
+            ids=list(chunk_ids),
+            include=["documents", "metadatas"]
+        )
+        return {
+            chunk_id: (document, metadata)
+            for chunk_id, document, metadata in zip(
+                records['ids'], records['documents'], records['metadatas']
+            )
+        }
+    
+    def _ids_for_files(self, file_paths: List[str]) -> Dict[str, List[str]]:
+        """Get the ids of the working-tree chunks stored for each of the files."""
+        records = self.collection.get(
+            where={"file_path": {"$in": file_paths}},
+            include=["metadatas"]
+        )
+        ids_by_file: Dict[str, List[str]] = {}
+        for chunk_id, metadata in zip(records['ids'], records['metadatas']):
+            if SCOPE_FIELD in metadata:
+                continue
+            ids_by_file.setdefault(metadata.get('file_path'), []).append(chunk_id)
+        return ids_by_file
+    
+    def _delete(self, chunk_ids: List[str]):
+        """Delete records from the collection."""
+        self.collection.delete(ids=chunk_ids)
+    
+    def _get_collection_meta(self) -> Dict[str, str]:
+        """Get embedding metadata stored on the Chroma collection."""
+        metadata = self.collection.metadata or {}
+        return {
+            key: str(metadata[key])
+            for key in ("embedding_model", "embedding_dimension")
+            if key in metadata
+        }
+    
+    def _set_collection_meta(self, meta: Dict[str, str]):
+        """Store embedding metadata on the Chroma collection."""
+        # The HNSW settings are fixed at creation and cannot be modified
+        metadata = {
+            key: value for key, value in (self.collection.metadata or {}).items()
+            if not key.startswith("hnsw:")
+        }
+        metadata.update(meta)
+        self.collection.modify(metadata=metadata)
+    
+    def count(self) -> int:
+        """Get the number of stored chunks."""
+        return self.collection.count()
@@ -0,0 +1,353 @@
+"""
+Filesystem watcher that keeps the RAG index and AST caches current.
+
+Changes are picked up through watchdog (inotify, FSEvents, ...) when it is
+installed, or by polling file stats otherwise. Events are debounced and
+handled in batches: changed files go through the service's pipelined
+indexer (embeddings are batched across files), deleted files are removed
+from the index, and an optional code analyzer (e.g. EnhancedASTAnalyzer)
+invalidates and re-analyzes the same files so its caches and call graph
+stay in sync. Analyzers that keep call graph snapshots are loaded from the
+latest one on start and saved periodically and on stop.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from .git_indexer import is_excluded
+from .indexer import DEFAULT_EXCLUDE_PATTERNS, DEFAULT_EXTENSIONS
+
+if TYPE_CHECKING:
+    from .service import RAGService
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+if WATCHDOG_AVAILABLE:
+    class _EventHandler(FileSystemEventHandler):
+        """Forwards watchdog file events to a FileWatcher."""
+
+        def __init__(self, watcher: "FileWatcher"):
+            super().__init__()
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+                return
+            self.watcher.notify(event.src_path)
+            dest_path = getattr(event, "dest_path", None)
+            if dest_path:
+                self.watcher.notify(dest_path)
+
+
+class FileWatcher:
+    """
+    Re-indexes files of a repository as they change.
+
+    Can be embedded (start/stop, or as a context manager) or run in the
+    foreground with run_forever.
+    """
+
+    def __init__(self,
+                 service: "RAGService",
+                 analyzer: Optional[Any] = None,
+                 extensions: Optional[List[str]] = None,
+                 exclude_patterns: Optional[List[str]] = None,
+                 debounce_seconds: float = 0.5,
+                 max_delay_seconds: float = 5.0,
+                 poll_interval: float = 1.0,
+                 use_polling: bool = False,
+                 snapshot_interval: Optional[float] = 300.0):
+        """
+        Initialize the watcher.
+
+        Args:
+            service: RAG service whose repo_path is watched and indexed
+            analyzer: Code analyzer with refresh_files(paths) (optional)
+            extensions: File extensions to watch
+            exclude_patterns: Path component patterns to ignore
+            debounce_seconds: Quiet period before a batch is processed
+            max_delay_seconds: Longest a change waits under constant activity
+            poll_interval: Seconds between scans when polling
+            use_polling: Poll even if watchdog is available
+            snapshot_interval: Least seconds between call graph snapshots of
+                the analyzer (None to save only on stop)
+        """
+        self.service = service
+        self.analyzer = analyzer
+        self.root = Path(service.repo_path).resolve()
+        self.extensions = set(extensions or DEFAULT_EXTENSIONS)
+        self.exclude_patterns = (
+            DEFAULT_EXCLUDE_PATTERNS if exclude_patterns is None else exclude_patterns
+        )
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.poll_interval = poll_interval
+        self.use_polling = use_polling or not WATCHDOG_AVAILABLE
+        self.snapshot_interval = snapshot_interval
+        self._snapshot_loaded = False
+        self._last_snapshot = 0.0
+
+        self._pending: Set[str] = set()
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._cond = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._observer = None
+
+        self.stats: Dict[str, Any] = {
+            "events": 0,
+            "batches": 0,
+            "files_indexed": 0,
+            "files_removed": 0,
+            "errors": 0,
+            "last_batch_seconds": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether the watcher is running."""
+        return bool(self._threads) and not self._stopping.is_set()
+
+    def start(self):
+        """Start watching in background threads."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._load_snapshot()
+
+        if self.use_polling:
+            poller = threading.Thread(target=self._poll, name="rag-watcher-poll", daemon=True)
+            self._threads.append(poller)
+            poller.start()
+        else:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), str(self.root), recursive=True)
+            self._observer.start()
+
+        worker = threading.Thread(target=self._run, name="rag-watcher", daemon=True)
+        self._threads.append(worker)
+        worker.start()
+
+        logger.info(
+            f"Watching {self.root} for changes "
+            f"({'polling' if self.use_polling else 'watchdog'})"
+        )
+
+    def stop(self):
+        """Stop watching; changes already seen are still processed."""
+        self._stopping.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._save_snapshot()
+
+    def run_forever(self):
+        """Watch in the foreground until interrupted."""
+        self.start()
+        try:
+            while not self._stopping.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def __enter__(self) -> "FileWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def notify(self, path: str):
+        """
+        Record a change to a file.
+
+        Args:
+            path: Absolute path, or path relative to the watched root
+        """
+        rel_path = self._relative(path)
+        if rel_path is None:
+            return
+
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_event = now
+            self._pending.add(rel_path)
+            self._last_event = now
+            self.stats["events"] += 1
+            self._cond.notify()
+
+    def flush(self) -> Dict[str, int]:
+        """Process pending changes now, without waiting for the debounce."""
+        with self._cond:
+            batch = sorted(self._pending)
+            self._pending = set()
+        return self._process(batch)
+
+    def _relative(self, path: str) -> Optional[str]:
+        """Repository-relative path of a watched file, or None to ignore it."""
+        abs_path = Path(path)
+        if not abs_path.is_absolute():
+            abs_path = self.root / abs_path
+        if not abs_path.is_relative_to(self.root):
+            return None
+
+        rel_path = abs_path.relative_to(self.root).as_posix()
+        if abs_path.suffix not in self.extensions:
+            return None
+        if is_excluded(rel_path, self.exclude_patterns):
+            return None
+        return rel_path
+
+    def _run(self):
+        """Worker loop: wait for a quiet period, then process the batch."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping.is_set():
+                    self._cond.wait()
+                if not self._pending:
+                    return
+
+                # Debounce editors' write/rename bursts, up to max_delay
+                while not self._stopping.is_set():
+                    ready_at = min(
+                        self._last_event + self.debounce_seconds,
+                        self._first_event + self.max_delay_seconds
+                    )
+                    remaining = ready_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = sorted(self._pending)
+                self._pending = set()
+
+            self._process(batch)
+
+    def _process(self, batch: List[str]) -> Dict[str, int]:
+        """Re-index a batch of changed files and refresh the analyzer."""
+        if not batch:
+            return {}
+
+        start_time = time.time()
+        results: Dict[str, int] = {}
+        try:
+            results = self.service.update_files(batch)
+        except Exception as e:
+            logger.error(f"Error re-indexing {len(batch)} changed files: {e}")
+            self.stats["errors"] += 1
+
+        if self.analyzer is not None:
+            try:
+                self.analyzer.refresh_files(batch)
+            except Exception as e:
+                logger.error(f"Error refreshing analysis of changed files: {e}")
+                self.stats["errors"] += 1
+            if (self.snapshot_interval is not None
+                    and time.monotonic() - self._last_snapshot >= self.snapshot_interval):
+                self._save_snapshot()
+
+        removed = sum(1 for path in batch if not (self.root / path).exists())
+        self.stats["batches"] += 1
+        self.stats["files_indexed"] += len(batch) - removed
+        self.stats["files_removed"] += removed
+        self.stats["last_batch_seconds"] = time.time() - start_time
+
+        logger.info(
+            f"Updated {len(batch) - removed} changed and {removed} removed files "
+            f"in {self.stats['last_batch_seconds']:.2f}s"
+        )
+        return results
+
+    def _load_snapshot(self):
+        """Start the analyzer from its latest call graph snapshot, once."""
+        if self._snapshot_loaded or not hasattr(self.analyzer, "load_snapshot"):
+            return
+        self._snapshot_loaded = True
+        self._last_snapshot = time.monotonic()
+        try:
+            stats = self.analyzer.load_snapshot()
+            if stats:
+                logger.info(
+                    f"Loaded call graph snapshot {stats['key']} "
+                    f"({stats['changed_files']} files changed since)"
+                )
+        except Exception as e:
+            logger.warning(f"Failed to load call graph snapshot: {e}")
+
+    def _save_snapshot(self):
+        """Save the analyzer's call graph if it changed."""
+        if not hasattr(self.analyzer, "save_snapshot"):
+            return
+        self._last_snapshot = time.monotonic()
+        try:
+            self.analyzer.save_snapshot()
+        except Exception as e:
+            logger.warning(f"Failed to save call graph snapshot: {e}")
+
+    def _poll(self):
+        """Polling fallback: diff file stats between scans."""
+        snapshot = self._scan()
+        while not self._stopping.wait(self.poll_interval):
+            current = self._scan()
+            for rel_path, stat in current.items():
+                if snapshot.get(rel_path) != stat:
+                    self.notify(rel_path)
+            for rel_path in snapshot.keys() - current.keys():
+                self.notify(rel_path)
+            snapshot = current
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Get (mtime_ns, size) of every watched file."""
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [
+                name for name in dirnames
+                if not is_excluded(name, self.exclude_patterns)
+            ]
+            for name in filenames:
+                if os.path.splitext(name)[1] not in self.extensions:
+                    continue
+                path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if is_excluded(rel_path, self.exclude_patterns):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get watcher counters."""
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            **self.stats,
+            "pending": pending,
+            "running": self.running,
+            "backend": "polling" if self.use_polling else "watchdog",
+        }
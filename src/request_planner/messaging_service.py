@@ -153,12 +153,15 @@ class RequestPlannerMessagingService:
                 # Assume it's already a dict or local model
                 local_request = LocalChangeRequest(**message.value)
             
-            # Load repository if specified
+            # Load repository if specified (planning blocks on LLM and RAG
+            # calls, so it runs off the event loop)
             if local_request.repo and local_request.repo != ".":
-                self.planner.load_repository(local_request.repo, local_request.branch)
+                await asyncio.to_thread(
+                    self.planner.load_repository, local_request.repo, local_request.branch
+                )
             
             # Create plan
-            plan = self.planner.create_plan(local_request)
+            plan = await asyncio.to_thread(self.planner.create_plan, local_request)
             
             # Convert to protobuf
             if PROTOBUF_AVAILABLE:
@@ -50,6 +50,7 @@ class WebhookServer:
         self.executor = TaskExecutor()
         self.app = self._create_app()
         self.handlers = {}
+        self.watchers = []
         
         # Register handlers
         self._register_handlers()
@@ -70,13 +71,40 @@ class WebhookServer:
         # Startup
         logger.info("Starting webhook server")
         await self.executor.start()
+        if self.settings.webhook.watch_projects:
+            await asyncio.to_thread(self._start_watchers)
         
         yield
         
         # Shutdown
         logger.info("Shutting down webhook server")
+        await asyncio.to_thread(self._stop_watchers)
         await self.executor.stop()
     
+    def _start_watchers(self):
+        """Keep the RAG index and code analysis of every mapped project up to date."""
+        from src.code_planner.ast_analyzer_v2 import EnhancedASTAnalyzer
+        from src.rag_service import RAGService
+        from src.rag_service.watcher import FileWatcher
+        
+        for project_path in sorted(set(self.settings.webhook.project_mappings.values())):
+            try:
+                root = Path(project_path).resolve()
+                service = RAGService(persist_directory=str(root / ".rag"), repo_path=str(root))
+                watcher = FileWatcher(service, analyzer=EnhancedASTAnalyzer(str(root)))
+                watcher.start()
+                self.watchers.append(watcher)
+            except Exception as e:
+                logger.error(f"Failed to watch {project_path}: {e}")
+    
+    def _stop_watchers(self):
+        """Stop project watchers, indexing changes they already saw."""
+        for watcher in self.watchers:
+            watcher.stop()  # Also saves the call graph snapshot
+            watcher.analyzer.close()
+            watcher.service.close()
+        self.watchers = []
+    
     def _create_app(self) -> FastAPI:
         """Create FastAPI application."""
         app = FastAPI(
@@ -190,6 +218,9 @@ class WebhookServer:
         return {
             "status": "healthy",
             "handlers": list(self.handlers.keys()),
+            "watchers": {
+                str(watcher.root): watcher.get_stats() for watcher in self.watchers
+            },
             "executor": {
                 "active_tasks": self.executor.active_task_count(),
                 "completed_tasks": self.executor.completed_task_count()
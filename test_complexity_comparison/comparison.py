@@ -0,0 +1,53 @@
+
+def nested_conditions(a, b, c, d):
+    '''Function with many nested conditions'''
+    if a > 0:
+        if b > 0:
+            if c > 0:
+                if d > 0:
+                    return "all positive"
+                else:
+                    return "d negative"
+            else:
+                if d > 0:
+                    return "c negative, d positive"
+                else:
+                    return "c and d negative"
+        else:
+            if c > 0:
+                if d > 0:
+                    return "b negative, c and d positive"
+                else:
+                    return "b negative, c positive, d negative"
+            else:
+                return "b and c negative"
+    else:
+        if b > 0:
+            return "a negative, b positive"
+        else:
+            return "a and b negative"
+
+def switch_like(option):
+    '''Function with many branches'''
+    if option == 1:
+        return "one"
+    elif option == 2:
+        return "two"
+    elif option == 3:
+        return "three"
+    elif option == 4:
+        return "four"
+    elif option == 5:
+        return "five"
+    elif option == 6:
+        return "six"
+    elif option == 7:
+        return "seven"
+    elif option == 8:
+        return "eight"
+    elif option == 9:
+        return "nine"
+    elif option == 10:
+        return "ten"
+    else:
+        return "other"
@@ -0,0 +1,84 @@
+
+def simple_function():
+    '''Simple function with complexity 1'''
+    return 42
+
+def moderate_function(x, y):
+    '''Function with moderate complexity'''
+    if x > 0:
+        if y > 0:
+            return x + y
+        else:
+            return x - y
+    else:
+        if y > 0:
+            return y - x
+        else:
+            return -x - y
+
+def complex_function(data, mode='auto'):
+    '''Function with high complexity'''
+    result = []
+    
+    for item in data:
+        if mode == 'auto':
+            if isinstance(item, int):
+                if item > 100:
+                    result.append(item * 2)
+                elif item > 50:
+                    result.append(item + 10)
+                elif item > 0:
+                    result.append(item)
+                else:
+                    result.append(0)
+            elif isinstance(item, str):
+                if item.startswith('test'):
+                    result.append(item.upper())
+                elif item.endswith('data'):
+                    result.append(item.lower())
+                else:
+                    result.append(item)
+            else:
+                result.append(str(item))
+        elif mode == 'strict':
+            if isinstance(item, int) and item > 0:
+                result.append(item)
+        else:
+            result.append(item)
+    
+    return result
+
+class Calculator:
+    '''Class with various complexity methods'''
+    
+    def __init__(self):
+        self.memory = 0
+    
+    def calculate(self, op, x, y=None):
+        '''Method with cyclomatic complexity'''
+        if op == 'add':
+            return x + (y or 0)
+        elif op == 'sub':
+            return x - (y or 0)
+        elif op == 'mul':
+            return x * (y or 1)
+        elif op == 'div':
+            if y and y != 0:
+                return x / y
+            else:
+                raise ValueError("Division by zero")
+        elif op == 'pow':
+            return x ** (y or 2)
+        elif op == 'store':
+            self.memory = x
+            return x
+        elif op == 'recall':
+            return self.memory
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+    
+    def fibonacci(self, n):
+        '''Recursive method'''
+        if n <= 1:
+            return n
+        return self.fibonacci(n-1) + self.fibonacci(n-2)
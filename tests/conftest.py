@@ -0,0 +1,31 @@
+import pytest
+
+
+@pytest.fixture
+def mock_embeddings():
+    """Replace a service's embedding calls with constant vectors, recording batch sizes."""
+    def install(service, calls=None):
+        dim = service.embedding_service.dimension
+        service.embedding_service.enabled = True
+
+        def embed_batch(texts):
+            if calls is not None:
+                calls.append(len(texts))
+            return [[0.1] * dim for _ in texts]
+
+        service.embedding_service.embed_batch = embed_batch
+        service.embedding_service.embed_text = lambda text: [0.1] * dim
+
+    return install
+
+
+@pytest.fixture
+def write_module():
+    """Write a Python module defining the named functions, one chunk each."""
+    def write(path, names):
+        path.write_text("".join(
+            f"def {name}(value):\n" + "    return value * 2  # keep chunk above minimum\n" * 4 + "\n"
+            for name in names
+        ))
+
+    return write
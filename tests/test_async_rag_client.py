@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from src.rag_service import AsyncRAGClient, RAGService
+from src.rag_service.models import CodeChunk
+
+
+class _AsyncBackend:
+    def __init__(self, backend):
+        self.backend = backend
+        self.max_input_tokens = None
+        self.calls = []
+
+    def embed(self, texts):
+        raise AssertionError("query embedding must come from the async API")
+
+    async def embed_async(self, texts):
+        self.calls.append(texts)
+        await asyncio.sleep(0.01)
+        return [[0.1] * self.backend.dimension for _ in texts]
+
+
+def _service(tmp_path):
+    service = RAGService(persist_directory=str(tmp_path / ".rag"), repo_path=str(tmp_path))
+    embedding_service = service.embedding_service
+    embedding_service.backend = _AsyncBackend(embedding_service.backend)
+
+    def blocking_embed(text, cache_key=None):
+        raise AssertionError("query embedding must come from the async API")
+
+    embedding_service.embed_text = blocking_embed
+
+    chunk = CodeChunk(
+        id="c1", content="def parse_config(path):\n    return path\n",
+        file_path="config.py", start_line=1, end_line=2, symbol_name="parse_config",
+        embedding=[0.1] * embedding_service.dimension
+    )
+    service.vector_store.add_chunks([chunk])
+    return service
+
+
+def test_concurrent_searches_use_async_embeddings_and_pool(tmp_path):
+    service = _service(tmp_path)
+    client = AsyncRAGClient(service, max_workers=2)
+
+    store_threads = set()
+    search_code = service.search_code
+
+    def recording_search_code(*args, **kwargs):
+        store_threads.add(threading.current_thread().name)
+        return search_code(*args, **kwargs)
+
+    service.search_code = recording_search_code
+
+    cache_threads = set()
+    get_cached_embedding = service.embedding_service._get_cached_embedding
+
+    def recording_get_cached_embedding(cache_key):
+        cache_threads.add(threading.current_thread())
+        return get_cached_embedding(cache_key)
+
+    service.embedding_service._get_cached_embedding = recording_get_cached_embedding
+
+    async def run():
+        results = await asyncio.gather(*[
+            client.search(f"parse_config {i}", k=3) for i in range(4)
+        ])
+        context = await client.get_context("parse config", max_tokens=500)
+        symbols = await client.find_symbol("parse_config")
+        # Cached results are served without embedding the query again
+        repeated = await client.search("parse_config 0", k=3)
+        await client.close()
+        return results + [repeated], context, symbols
+
+    results, context, symbols = asyncio.run(run())
+
+    assert all(r and r[0]["file_path"] == "config.py" for r in results)
+    assert "config.py:1-2" in context
+    assert symbols[0]["match_type"] == "symbol"
+    assert len(service.embedding_service.backend.calls) == 5
+    assert store_threads and all(name.startswith("async-rag") for name in store_threads)
+    # Embedding cache lookups stay off the event loop
+    assert cache_threads and threading.main_thread() not in cache_threads
@@ -0,0 +1,56 @@
+import pytest
+
+from src.rag_service.chunker import CodeChunker, get_tree_sitter_analyzer
+from src.rag_service.models import ChunkType
+
+
+SOURCE = '''import os
+
+
+def small_a():
+    return 1
+
+
+def small_b():
+    return 2
+
+
+class Service:
+    """Service with a method too large for one chunk."""
+
+    def handle(self, request):
+''' + "        request = request.strip()  # padding padding padding\n" * 40 + '''        return request
+'''
+
+
+def test_regex_chunk_line_numbers():
+    chunker = CodeChunker(strategy="regex", min_chunk_size=10)
+    chunks = chunker.chunk_file(SOURCE, "service.py")
+
+    by_name = {chunk.symbol_name: chunk for chunk in chunks}
+    assert by_name["small_b"].start_line == 8
+    assert by_name["Service"].start_line == 12
+
+
+def test_tree_sitter_chunks_split_merge_and_parent():
+    pytest.importorskip("tree_sitter_python")
+    analyzer = get_tree_sitter_analyzer()
+    chunker = CodeChunker(chunk_size=1000, strategy="tree_sitter")
+
+    chunks = chunker.chunk_file(SOURCE, "service.py")
+
+    # Small sibling functions are merged into one chunk
+    merged = chunks[0]
+    assert (merged.start_line, merged.end_line) == (4, 9)
+    assert merged.metadata["merged_symbols"] == "small_a,small_b"
+
+    # The oversized method is split, each part knows its class
+    parts = [c for c in chunks if c.symbol_name == "Service.handle"]
+    assert len(parts) > 1
+    assert all(c.chunk_type == ChunkType.METHOD for c in parts)
+    assert all(c.metadata["parent_symbol"] == "Service" for c in parts)
+    assert parts[-1].end_line == SOURCE.count("\n")
+
+    # The parse tree is shared with the code planner analyzer
+    assert analyzer.parse(SOURCE.encode("utf-8"), "python") is \
+        analyzer.parse(SOURCE.encode("utf-8"), "python")
@@ -0,0 +1,84 @@
+import pickle
+
+from src.code_planner.ast_analyzer import FileAnalysis, Symbol
+from src.code_planner.compact_analysis import CompactAnalysisBatch, encode_analyses
+from src.code_planner.parallel_analyzer import AnalysisResult, ParallelASTAnalyzer
+
+
+def _analysis(path, n):
+    symbols = [
+        Symbol(
+            name=f"func_{i}",
+            kind="function",
+            file_path=path,
+            line_start=i * 10,
+            line_end=i * 10 + 8,
+            calls={f"func_{i + 1}", "helper"} if i % 2 else set(),
+            imports={"os"} if i == 0 else set(),
+            complexity=i % 4 + 1,
+        )
+        for i in range(n)
+    ]
+    return FileAnalysis(
+        path=path,
+        language="python",
+        symbols=symbols,
+        imports=["os", "typing"],
+        exports=[s.name for s in symbols],
+        dependencies={"os"},
+        complexity=sum(s.complexity for s in symbols),
+    )
+
+
+def test_roundtrip_with_failures():
+    analyses = [_analysis("a.py", 3), None, _analysis("b.py", 0), _analysis("c.py", 5)]
+    batch, positions = encode_analyses(analyses)
+    batch = pickle.loads(pickle.dumps(batch))
+
+    assert positions == [0, -1, 1, 2]
+    assert len(batch) == 3
+    assert batch.path(2) == "c.py"
+    for analysis, position in zip(analyses, positions):
+        if analysis is not None:
+            assert batch.decode(position) == analysis
+
+
+def test_encoding_is_smaller_than_pickled_objects():
+    analyses = [_analysis(f"pkg/module_{i}.py", 40) for i in range(20)]
+    batch = CompactAnalysisBatch.encode(analyses)
+
+    assert len(pickle.dumps(batch)) < len(pickle.dumps(analyses)) / 2
+
+
+def test_result_decodes_lazily():
+    batch = CompactAnalysisBatch.encode([_analysis("a.py", 2)])
+    result = AnalysisResult(file_path="a.py", encoded=(batch, 0))
+
+    assert result._analysis is None
+    assert result.analysis.symbols[1].calls == {"func_2", "helper"}
+    assert result.analysis is result.analysis
+
+
+def test_parallel_ast_analyzer_caches_encoded_results(tmp_path):
+    batch = CompactAnalysisBatch.encode([_analysis("a.py", 2), _analysis("b.py", 1)])
+    results = {
+        path: AnalysisResult(file_path=path, encoded=(batch, i))
+        for i, path in enumerate(["a.py", "b.py"])
+    }
+
+    class Pool:
+        def start(self):
+            return self
+
+        def analyze_files(self, file_paths, repo_path, progress_callback=None):
+            return {path: results[path] for path in file_paths}
+
+    analyzer = ParallelASTAnalyzer(str(tmp_path), pool=Pool())
+    analyses = analyzer.analyze_files(["a.py", "b.py"], show_progress=False)
+    assert sorted(analyses) == ["a.py", "b.py"]
+    assert all(result._analysis is None for result in results.values())
+
+    # Only the file that is read is decoded, including from the cache
+    assert analyzer.analyze_files(["a.py"], show_progress=False)["a.py"].path == "a.py"
+    assert results["a.py"]._analysis is not None
+    assert results["b.py"]._analysis is None
@@ -0,0 +1,63 @@
+from src.rag_service.context_packer import ContextPacker, TokenCountCache, knapsack
+from src.rag_service.models import CodeChunk, SearchResult
+
+
+def _result(chunk_id, file_path, start, lines, score):
+    chunk = CodeChunk(
+        id=chunk_id,
+        content="\n".join(f"line{n}" for n in range(start, start + lines)),
+        file_path=file_path,
+        start_line=start,
+        end_line=start + lines - 1,
+        language="python",
+    )
+    return SearchResult(chunk=chunk, score=score)
+
+
+def _counter(calls):
+    def count(text):
+        calls.append(text)
+        return len(text.split())
+    return count
+
+
+def test_knapsack_prefers_best_total_score():
+    # Greedy by rank would take the first item and stop
+    assert knapsack([60, 50, 50], [1.0, 0.8, 0.8], 100) == [1, 2]
+    assert knapsack([10], [1.0], 5) == []
+
+
+def test_pack_fits_smaller_chunks_and_merges_adjacent():
+    packer = ContextPacker(TokenCountCache(_counter([])))
+    results = [
+        _result("big", "big.py", 1, 40, 0.9),
+        _result("a1", "a.py", 1, 5, 0.8),
+        _result("a2", "a.py", 4, 6, 0.7),  # Overlaps a1
+        _result("b", "b.py", 20, 5, 0.6),
+    ]
+
+    packed = packer.pack(results, max_tokens=30)
+
+    assert packed.dropped_ids == ["big"]
+    assert [(s.file_path, s.start_line, s.end_line) for s in packed.spans] == [
+        ("a.py", 1, 9), ("b.py", 20, 24)
+    ]
+    assert packed.spans[0].chunk_ids == ["a1", "a2"]
+    assert packed.spans[0].content.split("\n") == [f"line{n}" for n in range(1, 10)]
+    assert packed.tokens_used <= 30
+    assert packed.text.startswith("File: a.py:1-9")
+
+
+def test_token_counts_cached_and_persisted(tmp_path):
+    calls = []
+    db_path = str(tmp_path / "token_counts.db")
+    cache = TokenCountCache(_counter(calls), namespace="words", db_path=db_path)
+    assert cache.count_many(["a b", "c", "a b"]) == [2, 1, 2]
+    assert cache.count("c") == 1
+    assert len(calls) == 2
+    cache.close()
+
+    reopened = TokenCountCache(_counter(calls), namespace="words", db_path=db_path)
+    assert reopened.count("a b") == 2
+    assert len(calls) == 2
+    assert reopened.get_stats()["hits"] == 1
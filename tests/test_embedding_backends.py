@@ -0,0 +1,64 @@
+import numpy as np
+
+from src.rag_service import RAGService
+from src.rag_service.embedding_backends import HashingBackend
+
+
+def test_hashing_backend_is_deterministic_and_lexical():
+    backend = HashingBackend(dimension=256)
+    texts = [
+        "def parse_config(path): return load_yaml(path)",
+        "class ConfigParser: parses config files",
+        "async def send_email(recipient, body)",
+    ]
+    vectors = np.array(backend.embed(texts))
+
+    assert vectors.shape == (3, 256)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert np.allclose(vectors, HashingBackend(dimension=256).embed(texts))
+
+    query = np.array(backend.embed(["parse config"])[0])
+    scores = vectors @ query
+    assert scores[0] > scores[2] and scores[1] > scores[2]
+
+
+def test_service_vector_search_offline_and_model_binding(tmp_path):
+    (tmp_path / "config.py").write_text(
+        "def parse_config(path):\n"
+        "    with open(path) as config_file:\n"
+        "        config = yaml.safe_load(config_file)\n"
+        "    return config\n"
+    )
+    (tmp_path / "mail.py").write_text(
+        "def send_email(recipient, body):\n"
+        "    message = build_message(recipient, body)\n"
+        "    smtp_client.send(recipient, message)\n"
+    )
+
+    persist_dir = str(tmp_path / ".rag")
+    service = RAGService(persist_directory=persist_dir, repo_path=str(tmp_path),
+                         vector_backend="local", embedding_backend="hashing")
+    assert service.embedding_service.enabled
+    assert service.index_directory(str(tmp_path)) == {"config.py": 1, "mail.py": 1}
+
+    embedding = service.embedding_service.embed_text("parse config file")
+    chunk, _ = service.vector_store.search(embedding, k=1)[0]
+    assert chunk.file_path == "config.py"
+    assert service.vector_store.get_embedding_model() == {
+        "model": "hashing:ngram3-384", "dimension": 384
+    }
+    service.close()
+
+    # Same model: vectors stay usable
+    service = RAGService(persist_directory=persist_dir, repo_path=str(tmp_path),
+                         vector_backend="local", embedding_backend="hashing")
+    assert service.embedding_service.enabled
+    service.close()
+
+    # Different model: vector search is disabled instead of mixing vectors
+    service = RAGService(persist_directory=persist_dir, repo_path=str(tmp_path),
+                         vector_backend="local",
+                         embedding_backend=HashingBackend(dimension=128))
+    assert not service.embedding_service.enabled
+    assert service.search_code("send email")[0].chunk.file_path == "mail.py"
+    service.close()
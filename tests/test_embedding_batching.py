@@ -0,0 +1,68 @@
+import threading
+
+from src.rag_service.embedding_backends import EmbeddingBackend
+from src.rag_service.embedding_batching import RequestCoalescer, pack_batches
+from src.rag_service.embeddings import EmbeddingService
+
+
+class _Backend(EmbeddingBackend):
+    name = "fake"
+    model = "fake"
+    dimension = 2
+    max_batch_size = 4
+    max_input_tokens = 5
+    max_batch_tokens = 12
+
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        if any(text.startswith("bad") for text in texts):
+            raise RuntimeError("invalid input")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_pack_batches_by_items_and_tokens():
+    assert pack_batches([1, 1, 1, 1, 1], max_items=2) == [[0, 1], [2, 3], [4]]
+    assert pack_batches([5, 5, 20, 1, 1], max_items=10, max_tokens=10) == [[0, 1], [2], [3, 4]]
+
+
+def test_embed_batch_packs_by_tokens_and_retries_failed_halves():
+    backend = _Backend()
+    service = EmbeddingService(backend=backend)
+    texts = ["one", "two", "bad three", "four", "five six seven eight nine ten eleven"]
+
+    embeddings = service.embed_batch(texts)
+
+    assert embeddings[2] is None
+    assert all(embeddings[i] is not None for i in (0, 1, 3, 4))
+    # The long text was truncated to 5 tokens before packing
+    assert service.count_tokens(backend.batches[-1][-1]) <= 5
+    # The failing batch was split until the bad text was isolated
+    assert any(len(batch) == 1 and batch[0].startswith("bad") for batch in backend.batches)
+    assert all(sum(service.count_tokens(t) for t in batch) <= 12 for batch in backend.batches)
+
+
+def test_coalescer_merges_concurrent_requests():
+    calls = []
+
+    def embed_many(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    coalescer = RequestCoalescer(embed_many, window=0.2, max_items=8)
+    results = {}
+
+    def submit(text):
+        results[text] = coalescer.submit(text)
+
+    threads = [threading.Thread(target=submit, args=(f"query {i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {f"query {i}": [7.0] for i in range(8)}
+    assert len(calls) < 8
+    assert coalescer.stats == {"requests": 8, "upstream_calls": len(calls)}
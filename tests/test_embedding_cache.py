@@ -0,0 +1,71 @@
+import sqlite3
+
+from src.rag_service.embedding_cache import EmbeddingCache, get_shared_cache, text_hash
+
+
+def test_roundtrip_and_counters(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model", dimension=4)
+    cache.put_many([(text_hash("a"), [1.0, 2.0, 3.0, 4.0])])
+
+    found = cache.get_many([text_hash("a"), text_hash("b")])
+    assert found == {text_hash("a"): [1.0, 2.0, 3.0, 4.0]}
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_lru_eviction_reuses_slots(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model", dimension=2, max_entries=2)
+    cache.put(text_hash("a"), [1.0, 1.0])
+    cache.put(text_hash("b"), [2.0, 2.0])
+    cache.get(text_hash("a"))
+    cache.put(text_hash("c"), [3.0, 3.0])
+
+    assert len(cache) == 2
+    assert cache.get(text_hash("b")) is None
+    assert cache.get(text_hash("a")) == [1.0, 1.0]
+    assert cache.get(text_hash("c")) == [3.0, 3.0]
+
+
+def test_batches_larger_than_the_cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model", dimension=2, max_entries=3)
+    cache.put(text_hash("a"), [1.0, 1.0])
+
+    # Entries of the batch itself are never evicted for its new keys
+    batch = [(text_hash("a"), [1.0, 1.0])] + [
+        (text_hash(str(i)), [float(i), 0.0]) for i in range(5)
+    ]
+    cache.put_many(batch)
+
+    assert len(cache) == 3
+    found = cache.get_many([key for key, _ in batch])
+    assert found[text_hash("a")] == [1.0, 1.0]
+    assert all(found[key] == vector for key, vector in batch if key in found)
+    assert len(found) == 3
+
+
+def test_cache_shared_across_instances(tmp_path):
+    first = get_shared_cache(str(tmp_path), "model", 2)
+    first.put(text_hash("a"), [0.5, 0.25])
+    assert get_shared_cache(str(tmp_path), "model", 2) is first
+
+    # A separate instance (e.g. another process) sees the same entries
+    other = EmbeddingCache(str(tmp_path), "model", dimension=2)
+    assert other.get(text_hash("a")) == [0.5, 0.25]
+
+
+def test_reads_tolerate_concurrent_writers(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model", dimension=2)
+    cache.put(text_hash("a"), [1.0, 1.0])
+
+    # Another process holding the write lock only delays the LRU update
+    writer = sqlite3.connect(str(tmp_path / "index.db"))
+    writer.execute("BEGIN IMMEDIATE")
+    assert cache.get(text_hash("a")) == [1.0, 1.0]
+    writer.rollback()
+
+    # A slot being reused for another key reads as a miss, not a wrong vector
+    other = EmbeddingCache(str(tmp_path), "model", dimension=2)
+    other._map_vectors()
+    other._write_slot(text_hash("b"), 0, [2.0, 2.0])
+    assert cache.get(text_hash("a")) is None
@@ -0,0 +1,88 @@
+import time
+
+from src.rag_service import RAGService
+from src.rag_service.watcher import FileWatcher
+
+
+class _RecordingAnalyzer:
+    def __init__(self):
+        self.refreshed = []
+        self.snapshots = []
+
+    def refresh_files(self, files):
+        self.refreshed.append(list(files))
+
+    def load_snapshot(self):
+        self.snapshots.append("load")
+
+    def save_snapshot(self):
+        self.snapshots.append("save")
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for the watcher"
+        time.sleep(0.02)
+
+
+def test_changes_are_debounced_into_one_batch(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    (repo / "node_modules").mkdir(parents=True)
+    calls = []
+    service = RAGService(persist_directory=str(tmp_path / ".rag"), repo_path=str(repo))
+    mock_embeddings(service, calls)
+    analyzer = _RecordingAnalyzer()
+
+    watcher = FileWatcher(service, analyzer=analyzer, debounce_seconds=0.2)
+    write_module(repo / "a.py", ["alpha"])
+    write_module(repo / "b.py", ["beta", "gamma"])
+    for path in ["a.py", str(repo / "b.py"), "a.py", "notes.txt", "node_modules/x.py", "/elsewhere/c.py"]:
+        watcher.notify(path)
+
+    assert watcher.flush() == {"a.py": 1, "b.py": 2}
+    assert analyzer.refreshed == [["a.py", "b.py"]]
+    assert calls == [3]  # Embeddings batched across both files
+
+    (repo / "a.py").unlink()
+    watcher.notify("a.py")
+    assert watcher.flush() == {"a.py": 0}
+    assert service.indexed_files == {"b.py"}
+
+
+def test_polling_watcher_reindexes_changed_and_removed_files(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    write_module(repo / "a.py", ["alpha"])
+    service = RAGService(persist_directory=str(tmp_path / ".rag"), repo_path=str(repo))
+    mock_embeddings(service)
+    service.index_directory(str(repo))
+
+    with FileWatcher(service, debounce_seconds=0.05, poll_interval=0.05, use_polling=True) as watcher:
+        write_module(repo / "a.py", ["alpha", "beta"])
+        write_module(repo / "b.py", ["gamma"])
+        # A poll can see a.py half-written; the next one picks up the rest
+        _wait_for(lambda: service.indexed_files == {"a.py", "b.py"}
+                  and len(service.manifest.get("a.py").chunks) == 2)
+
+        (repo / "b.py").unlink()
+        _wait_for(lambda: service.indexed_files == {"a.py"})
+
+    assert not watcher.running
+    assert watcher.get_stats()["files_removed"] == 1
+
+
+def test_analyzer_snapshot_loaded_on_start_and_saved(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    service = RAGService(persist_directory=str(tmp_path / ".rag"), repo_path=str(repo))
+    mock_embeddings(service)
+    analyzer = _RecordingAnalyzer()
+
+    with FileWatcher(service, analyzer=analyzer, debounce_seconds=0.05, poll_interval=0.05,
+                     use_polling=True, snapshot_interval=0):
+        write_module(repo / "a.py", ["alpha"])
+        _wait_for(lambda: analyzer.refreshed)
+
+    # Saved after the batch (interval elapsed) and again on stop
+    assert analyzer.snapshots == ["load", "save", "save"]
@@ -0,0 +1,35 @@
+from src.rag_service.fusion import diversify, fuse, normalize_scores
+from src.rag_service.models import CodeChunk
+
+
+def _chunk(chunk_id, file_path="a.py"):
+    return CodeChunk(id=chunk_id, file_path=file_path)
+
+
+def test_rrf_ignores_score_scales():
+    a, b, c = _chunk("a"), _chunk("b"), _chunk("c")
+    vector = [(a, 0.91), (b, 0.90)]
+    keyword = [(b, 35.0), (c, 2.0)]
+
+    fused = fuse([vector, keyword], [0.5, 0.5], strategy="rrf")
+
+    # b is ranked by both legs, its large BM25 score does not matter
+    assert [chunk.id for chunk, _ in fused] == ["b", "a", "c"]
+    assert all(0 <= score <= 1 for _, score in fused)
+
+
+def test_normalization_and_empty_leg_weights():
+    a, b = _chunk("a"), _chunk("b")
+    assert [s for _, s in normalize_scores([(a, 3.0), (b, 1.0)], "minmax")] == [1.0, 0.0]
+
+    # A zero-weight leg is still used when it is the only one with results
+    fused = fuse([[], [(a, 3.0), (b, 1.0)]], [1.0, 0.0], strategy="zscore")
+    assert [chunk.id for chunk, _ in fused] == ["a", "b"]
+
+
+def test_diversify_caps_chunks_per_file():
+    results = [(_chunk(str(i), "a.py"), 1.0) for i in range(4)] + [(_chunk("x", "b.py"), 0.5)]
+
+    selected = diversify(results, k=3, max_per_file=2)
+
+    assert [chunk.id for chunk, _ in selected] == ["0", "1", "x"]
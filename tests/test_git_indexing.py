@@ -0,0 +1,123 @@
+import subprocess
+
+from src.rag_service import RAGService
+from src.git_integration import GitAdapter
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, check=True, capture_output=True
+    )
+
+
+def test_adapter_lists_and_streams_blobs(tmp_path):
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("print('a')\n")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+
+    adapter = GitAdapter(str(tmp_path))
+    entries = adapter.list_files("HEAD")
+    assert [e.path for e in entries] == ["pkg/a.py"]
+
+    blobs = dict(adapter.iter_blobs([entries[0].sha, "0" * 40]))
+    assert blobs[entries[0].sha] == b"print('a')\n"
+    assert blobs["0" * 40] is None
+
+
+def test_index_git_ref_embeds_each_blob_once(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    write_module(repo / "a.py", ["alpha", "beta"])
+    write_module(repo / "b.py", ["gamma"])
+    (repo / "notes.txt").write_text("not indexed")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "first")
+
+    calls = []
+    service = RAGService(persist_directory=str(tmp_path / ".rag"), repo_path=str(repo))
+    mock_embeddings(service, calls)
+
+    assert service.index_git_ref("HEAD") == {"a.py": 2, "b.py": 1}
+    assert sum(calls) == 3
+
+    # A copy of an indexed file and one modified file: only the change is embedded
+    write_module(repo / "copy.py", ["gamma"])
+    write_module(repo / "a.py", ["alpha", "delta"])
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "second")
+
+    calls.clear()
+    results = service.index_git_ref("HEAD")
+    assert results == {"a.py": 2, "b.py": 1, "copy.py": 1}
+    assert sum(calls) == 2
+    assert service.last_indexing_stats.files_unchanged == 2
+
+    # The first commit is fully indexed already
+    calls.clear()
+    service.index_git_ref("HEAD~1")
+    assert calls == []
+
+
+def test_search_scoped_to_ref(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    write_module(repo / "a.py", ["alpha", "beta"])
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "first")
+    (repo / "a.py").unlink()
+    write_module(repo / "renamed.py", ["alpha", "delta"])
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "second")
+
+    service = RAGService(persist_directory=str(tmp_path / ".rag"), repo_path=str(repo))
+    mock_embeddings(service)
+    service.index_git_ref("HEAD")
+    first = GitAdapter(str(repo)).resolve_ref("HEAD~1")
+
+    assert [r.chunk.file_path for r in service.find_symbol("alpha", ref="HEAD")] == ["renamed.py"]
+
+    # Searches never index: an unindexed ref falls back to the working tree
+    assert service.find_symbol("alpha", ref=first) == []
+    assert service.ref_manifest.resolve(first) is None
+
+    service.index_git_ref(first)
+    results = service.find_symbol("alpha", ref=first)
+    assert [(r.chunk.file_path, r.match_type) for r in results] == [("a.py", "symbol")]
+    assert service.ref_manifest.resolve(first[:8]) == first
+    assert all(r.chunk.symbol_name != "delta" for r in service.find_symbol("delta", ref=first))
+
+    # Unscoped searches only see the working tree, not the indexed refs
+    assert service.find_symbol("alpha") == []
+    service.index_directory(str(repo))
+    results = service.find_symbol("alpha")
+    assert [(r.chunk.file_path, r.match_type) for r in results] == [("renamed.py", "symbol")]
+
+
+def test_many_indexed_refs_do_not_crowd_out_results(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    service = RAGService(persist_directory=str(tmp_path / ".rag"), repo_path=str(repo))
+    mock_embeddings(service)
+
+    # Every version of alpha is a separate blob, indexed from its own commit
+    for version in range(25):
+        write_module(repo / "a.py", ["alpha", f"version{version}"])
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", f"version {version}")
+        service.index_git_ref("HEAD")
+    first = GitAdapter(str(repo)).resolve_ref("HEAD~24")
+    service.index_directory(str(repo))
+
+    results = service.search_code("alpha", k=2)
+    assert sorted(r.chunk.symbol_name for r in results) == ["alpha", "version24"]
+    assert all("blob_sha" not in r.chunk.metadata for r in results)
+    assert len(service.find_symbol("alpha")) == 1
+
+    results = service.search_code("alpha", k=2, ref=first)
+    assert sorted(r.chunk.symbol_name for r in results) == ["alpha", "version0"]
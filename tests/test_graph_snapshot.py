@@ -0,0 +1,112 @@
+from src.code_planner.ast_analyzer_v2 import EnhancedASTAnalyzer
+from src.code_planner.cache_manager import InMemoryCacheManager
+from src.code_planner.call_graph_analyzer import CallGraphAnalyzer
+from src.code_planner.graph_snapshot import GraphSnapshot, SnapshotStore
+from src.code_planner.symbol_table import SymbolTable
+from src.git_integration import GitAdapter
+
+
+def _analyzer(repo, snapshot_dir):
+    return EnhancedASTAnalyzer(str(repo), cache_manager=InMemoryCacheManager(),
+                               snapshot_dir=str(snapshot_dir))
+
+
+def _state(analyzer):
+    graph = analyzer.call_graph
+    calls, imports = graph.iter_pending()
+    return (
+        {node_id: vars(node) for node_id, node in graph.node_data.items()},
+        sorted(graph.iter_edges(), key=str),
+        sorted(calls),
+        sorted(imports),
+    )
+
+
+def test_snapshot_roundtrip_and_delta(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "app.py").write_text(
+        "from lib import helper\n\n"
+        "def main():\n"
+        "    print(helper())\n"
+    )
+    (repo / "lib.py").write_text(
+        "def helper():\n"
+        "    return _inner()\n\n"
+        "def _inner():\n"
+        "    return 1\n"
+    )
+    snapshot_dir = tmp_path / "snapshots"
+    git = GitAdapter(str(repo))  # not a git repository: files are hashed
+
+    analyzer = _analyzer(repo, snapshot_dir)
+    analyzer.build_call_graph(["app.py", "lib.py"])
+    saved = analyzer.save_snapshot(git)
+    assert saved is not None and (saved / "edge_indptr.npy").exists()
+    # Nothing changed since: no new snapshot is written
+    assert analyzer.save_snapshot(git) is None
+
+    assert analyzer.get_analyzer_info()["graph_snapshot"] == {"key": None, "state": "none"}
+    restored = _analyzer(repo, snapshot_dir)
+    stats = restored.load_snapshot(git)
+    assert stats["changed_files"] == 0
+    # The graph is built on first use
+    info = restored.get_analyzer_info()["graph_snapshot"]
+    assert info == {"key": saved.name, "state": "loaded"}
+    assert _state(restored) == _state(analyzer)
+    info = restored.get_analyzer_info()["graph_snapshot"]
+    assert info == {"key": saved.name, "state": "restored"}
+    assert restored.symbol_table.find_symbol("helper", "app.py") == "lib.py:helper"
+
+    # Snapshot arrays are memory-mapped CSR adjacency
+    snapshot = SnapshotStore(str(snapshot_dir)).latest()
+    assert snapshot.arrays["edge_indptr"][-1] == snapshot.meta["edges"]
+
+    # An edited file is re-analyzed on load
+    (repo / "lib.py").write_text(
+        "def helper():\n"
+        "    return 2\n"
+    )
+    delta = _analyzer(repo, snapshot_dir)
+    stats = delta.load_snapshot(git)
+    assert stats["changed_files"] == 1
+    assert "lib.py:_inner" not in delta.call_graph.node_data
+    assert delta.call_graph.get_callees("app.py:main") == ["lib.py:helper"]
+
+    fresh = _analyzer(repo, tmp_path / "unused")
+    fresh.build_call_graph(["app.py", "lib.py"])
+    assert _state(delta)[:3] == _state(fresh)[:3]
+
+    # The new state gets its own snapshot, preferred for the same commit
+    new_dir = delta.save_snapshot(git)
+    assert new_dir != saved
+    assert SnapshotStore(str(snapshot_dir)).latest(git.get_current_commit()).key == new_dir.name
+
+
+def test_snapshot_key_depends_on_commit_and_hashes():
+    graph, table = CallGraphAnalyzer(), SymbolTable()
+    a = GraphSnapshot.capture(graph, table, {"a.py": "1"}, "c1")
+    assert a.key == GraphSnapshot.capture(graph, table, {"a.py": "1"}, "c1").key
+    assert a.key != GraphSnapshot.capture(graph, table, {"a.py": "2"}, "c1").key
+    assert a.key != GraphSnapshot.capture(graph, table, {"a.py": "1"}, "c2").key
+
+
+def test_parallel_build_reanalyzes_edited_files(tmp_path):
+    for i in range(12):
+        (tmp_path / f"mod{i}.py").write_text(f"def f{i}():\n    return {i}\n")
+    files = [f"mod{i}.py" for i in range(12)]
+
+    analyzer = _analyzer(tmp_path, tmp_path / "snapshots")
+    try:
+        analyzer.build_call_graph(files)
+        assert "mod0.py:f0" in analyzer.call_graph.node_data
+
+        (tmp_path / "mod0.py").write_text("def g0():\n    return 0\n")
+        (tmp_path / "mod1.py").unlink()
+        analyzer.build_call_graph(files)
+        nodes = analyzer.call_graph.node_data
+        assert "mod0.py:g0" in nodes and "mod0.py:f0" not in nodes
+        assert not any(node.startswith("mod1.py:") for node in nodes)
+        assert "mod2.py:f2" in nodes
+    finally:
+        analyzer.close()
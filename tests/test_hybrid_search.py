@@ -0,0 +1,53 @@
+import time
+
+from src.rag_service.models import CodeChunk, SearchRequest
+from src.rag_service.search import HybridSearch
+
+
+class _SlowEmbeddings:
+    enabled = True
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def embed_text(self, text):
+        time.sleep(self.delay)
+        return [1.0, 0.0]
+
+
+class _Store:
+    def __init__(self):
+        self.vector_chunk = CodeChunk(id="v", content="def vector_hit(): pass")
+        self.keyword_chunk = CodeChunk(id="k", content="def keyword_hit(): pass")
+
+    def search(self, query_embedding, k, filters):
+        return [(self.vector_chunk, 0.9)]
+
+    def keyword_search(self, query, k, filters):
+        return [(self.keyword_chunk, 1.0)]
+
+
+def test_parallel_search_merges_both_legs_with_timings():
+    search = HybridSearch(_Store(), _SlowEmbeddings(0.0))
+
+    results = search.search(SearchRequest(query="hit", k=5))
+
+    assert {r.chunk.id for r in results} == {"v", "k"}
+    assert all(r.match_type == "hybrid" for r in results)
+    assert {"embedding", "vector", "keyword", "total"} <= set(results[0].timings)
+    assert results[0].timings == results[1].timings
+    assert results[0].timings is not results[1].timings
+    assert results.complete
+
+
+def test_slow_embedding_degrades_to_keyword_results():
+    search = HybridSearch(_Store(), _SlowEmbeddings(1.0), vector_timeout=0.1)
+
+    start = time.perf_counter()
+    results = search.search(SearchRequest(query="hit", k=5))
+
+    assert time.perf_counter() - start < 0.5
+    assert [r.chunk.id for r in results] == ["k"]
+    assert results[0].match_type == "keyword"
+    assert "vector_timeout" in results[0].timings
+    assert not results.complete
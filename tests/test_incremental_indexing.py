@@ -0,0 +1,110 @@
+import gc
+import os
+
+from src.rag_service import RAGService
+from src.rag_service.manifest import FileRecord, IndexManifest
+
+
+def test_reindex_skips_unchanged_and_prunes_removed(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    write_module(repo / "a.py", ["alpha", "beta"])
+    write_module(repo / "b.py", ["gamma"])
+
+    calls = []
+    service = RAGService(persist_directory=str(repo / ".rag"), repo_path=str(repo))
+    mock_embeddings(service, calls)
+
+    assert service.index_directory(str(repo), extensions=[".py"]) == {"a.py": 2, "b.py": 1}
+    assert sum(calls) == 3
+
+    # No-op pass: nothing is re-embedded
+    calls.clear()
+    service.index_directory(str(repo), extensions=[".py"])
+    assert calls == []
+
+    # Only the changed function is re-embedded, removed files are pruned
+    write_module(repo / "a.py", ["alpha", "delta"])
+    os.remove(repo / "b.py")
+    calls.clear()
+    results = service.index_directory(str(repo), extensions=[".py"])
+
+    assert results == {"a.py": 2}
+    assert sum(calls) == 1
+    assert service.indexed_files == {"a.py"}
+    assert service.vector_store.count() == 2
+
+
+def test_pipelined_indexing_batches_across_files(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for i in range(20):
+        write_module(repo / f"mod_{i}.py", [f"func_{i}_a", f"func_{i}_b"])
+
+    calls = []
+    service = RAGService(
+        persist_directory=str(repo / ".rag"), repo_path=str(repo), index_workers=2
+    )
+    mock_embeddings(service, calls)
+
+    results = service.index_directory(str(repo), extensions=[".py"])
+
+    assert sum(results.values()) == 40
+    # Chunks from many files share embedding requests
+    assert len(calls) < 20
+    stats = service.last_indexing_stats
+    assert stats.files_indexed == 20
+    assert stats.chunks_written == 40
+    assert stats.files_per_sec > 0
+
+
+def test_manifest_write_behind_flush(tmp_path):
+    manifest = IndexManifest(tmp_path / "index_manifest.db", flush_threshold=3)
+    manifest.set(FileRecord(path="a.py", content_hash="h1", chunks={"c1": "fp"}))
+    manifest.set(FileRecord(path="b.py", content_hash="h2"))
+
+    # Nothing is committed until a flush point
+    assert len(IndexManifest(tmp_path / "index_manifest.db")) == 0
+
+    manifest.remove("b.py")
+    manifest.set(FileRecord(path="c.py", content_hash="h3"))  # third pending file
+    reopened = IndexManifest(tmp_path / "index_manifest.db")
+    assert sorted(reopened.paths()) == ["a.py", "c.py"]
+    assert reopened.get("a.py").chunks == {"c1": "fp"}
+
+
+def test_collected_service_flushes_manifest(tmp_path):
+    service = RAGService(persist_directory=str(tmp_path / ".rag"), repo_path=str(tmp_path))
+    service.manifest.set(FileRecord(path="a.py", content_hash="h1"))
+    del service
+    gc.collect()
+
+    assert IndexManifest(tmp_path / ".rag" / "index_manifest.db").paths() == ["a.py"]
+
+
+def test_reindex_without_manifest_keeps_stored_chunks(tmp_path, mock_embeddings, write_module):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for i in range(3):
+        write_module(repo / f"mod_{i}.py", [f"func_{i}_a", f"func_{i}_b"])
+
+    calls = []
+    service = RAGService(persist_directory=str(repo / ".rag"), repo_path=str(repo))
+    mock_embeddings(service, calls)
+    service.index_directory(str(repo), extensions=[".py"])
+    chunk_ids = service.vector_store.ids_for_files(["mod_0.py", "mod_1.py", "mod_2.py"])
+    assert all(chunk_id.startswith("mod_0.py:") for chunk_id in chunk_ids["mod_0.py"])
+
+    # Without manifest records, chunks are matched by their deterministic ids
+    service.manifest.clear()
+    write_module(repo / "mod_0.py", ["func_0_a", "func_0_changed"])
+    calls.clear()
+    results = service.index_directory(str(repo), extensions=[".py"])
+
+    assert results == {"mod_0.py": 2, "mod_1.py": 2, "mod_2.py": 2}
+    assert sum(calls) == 1
+    assert service.vector_store.count() == 6
+    assert service.vector_store.ids_for_files(["mod_1.py"]) == {"mod_1.py": chunk_ids["mod_1.py"]}
+
+    assert service.vector_store.delete_by_files(["mod_1.py", "mod_2.py", "missing.py"]) == 4
+    assert service.vector_store.count() == 2
@@ -0,0 +1,81 @@
+from src.rag_service.keyword_index import KeywordIndex, tokenize
+from src.rag_service.models import CodeChunk
+
+
+def _chunk(chunk_id, content, file_path="a.py", language="python"):
+    return CodeChunk(id=chunk_id, content=content, file_path=file_path, language=language)
+
+
+def test_tokenize_splits_identifiers():
+    tokens = tokenize("def parseHttpRequest(max_retry_count)")
+    assert "parsehttprequest" in tokens
+    assert {"parse", "http", "request"} <= set(tokens)
+    assert {"max_retry_count", "max", "retry", "count"} <= set(tokens)
+
+
+def test_bm25_ranking_and_filters(tmp_path):
+    index = KeywordIndex(db_path=str(tmp_path / "keywords.db"))
+    index.add_chunks([
+        _chunk("a", "def parse_http_request(request): return request"),
+        _chunk("b", "class HttpServer: pass", file_path="b.py"),
+        _chunk("c", "const unrelated = 1", file_path="c.js", language="javascript"),
+    ])
+
+    hits = index.search("http request", k=5)
+    assert [chunk_id for chunk_id, _ in hits] == ["a", "b"]
+    assert index.search("http", filters={"file_path": "b.py"})[0][0] == "b"
+    assert index.search("unrelated", filters={"language": "python"}) == []
+
+
+def test_incremental_updates_persist(tmp_path):
+    db_path = str(tmp_path / "keywords.db")
+    index = KeywordIndex(db_path=db_path)
+    index.add_chunks([_chunk("a", "alpha beta"), _chunk("b", "beta gamma", file_path="b.py")])
+    index.remove_file("b.py")
+    index.add_chunks([_chunk("a", "delta")])
+    index.close()
+
+    reopened = KeywordIndex(db_path=db_path)
+    assert len(reopened) == 1
+    assert reopened.search("beta") == []
+    assert reopened.search("delta")[0][0] == "a"
+
+
+def test_field_counts_maintained_and_persisted(tmp_path):
+    db_path = str(tmp_path / "keywords.db")
+    index = KeywordIndex(db_path=db_path)
+    index.add_chunks([
+        _chunk("a", "def a(): pass"),
+        _chunk("b", "def b(): pass"),
+        _chunk("c", "function c() {}", file_path="c.js", language="javascript"),
+    ])
+    # Re-indexing an id replaces its counts
+    index.add_chunks([_chunk("b", "def b(): return 1", file_path="b.py")])
+    index.remove_ids(["c"])
+
+    assert index.field_counts("file_path") == {"a.py": 1, "b.py": 1}
+    assert index.field_counts("language") == {"python": 2}
+    index.close()
+
+    reopened = KeywordIndex(db_path=db_path)
+    assert reopened.field_counts("language") == {"python": 2}
+    assert reopened.field_counts("chunk_type") == {"general": 2}
+
+
+def test_blob_scope_filter_and_schema_upgrade(tmp_path):
+    db_path = str(tmp_path / "keywords.db")
+    index = KeywordIndex(db_path=db_path)
+    index.add_documents([
+        ("tree", "alpha", {"file_path": "a.py"}),
+        ("v1", "alpha", {"file_path": "a.py", "blob_sha": "1" * 40}),
+        ("v2", "alpha", {"file_path": "a.py", "blob_sha": "2" * 40}),
+    ])
+    assert [i for i, _ in index.search("alpha", filters={"blob_sha": None})] == ["tree"]
+    hits = index.search("alpha", filters={"blob_sha": ["2" * 40, "3" * 40]})
+    assert [i for i, _ in hits] == ["v2"]
+
+    # Indexes without blob shas are emptied so the store rebuilds them
+    with index._conn:
+        index._conn.execute("ALTER TABLE documents DROP COLUMN blob_sha")
+    index.close()
+    assert len(KeywordIndex(db_path=db_path)) == 0
@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.rag_service.local_vector_store import LocalVectorStore
+from src.rag_service.models import ChunkType, CodeChunk
+
+
+def _chunks(vectors, start=0, files=("a.py", "b.py")):
+    return [
+        CodeChunk(
+            id=f"chunk-{i}",
+            content=f"def func_{i}(): pass",
+            file_path=files[i % len(files)],
+            chunk_type=ChunkType.FUNCTION,
+            embedding=vector.tolist(),
+        )
+        for i, vector in enumerate(vectors, start)
+    ]
+
+
+def test_search_filters_and_persistence(tmp_path):
+    vectors = np.random.default_rng(0).normal(size=(50, 16)).astype(np.float32)
+    store = LocalVectorStore(str(tmp_path))
+    assert store.add_chunks(_chunks(vectors)) == 50
+
+    chunk, score = store.search(vectors[7].tolist(), k=1)[0]
+    assert chunk.id == "chunk-7"
+    assert abs(score - 1.0) < 1e-5
+
+    results = store.search(vectors[7].tolist(), k=5, filters={"file_path": "a.py"})
+    assert len(results) == 5
+    assert all(c.file_path == "a.py" for c, _ in results)
+
+    assert store.delete_by_file("b.py") == 25
+    store.close()
+
+    reopened = LocalVectorStore(str(tmp_path))
+    assert reopened.count() == 25
+    assert reopened.search(vectors[8].tolist(), k=1)[0][0].file_path == "a.py"
+
+
+def test_temporary_store_removes_its_directory():
+    vectors = np.random.default_rng(2).normal(size=(4, 8)).astype(np.float32)
+    store = LocalVectorStore()
+    store.add_chunks(_chunks(vectors))
+    data_dir = store._f32_path.parent
+    assert data_dir.exists()
+
+    store.close()
+    assert not data_dir.exists()
+
+
+def test_ivf_index_keeps_nearest_neighbours(tmp_path):
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(20, 32))
+    vectors = (centers[rng.integers(0, 20, 2000)] + rng.normal(size=(2000, 32)) * 0.3).astype(np.float32)
+
+    store = LocalVectorStore(str(tmp_path), ivf_min_rows=1000, nprobe=4)
+    for start in range(0, 2000, 500):
+        store.add_chunks(_chunks(vectors[start:start + 500], start))
+
+    assert store.get_stats()["ivf_lists"] > 1
+    for i in (3, 700, 1999):
+        assert store.search(vectors[i].tolist(), k=1)[0][0].id == f"chunk-{i}"
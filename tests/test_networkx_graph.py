@@ -207,12 +207,84 @@ def test_graph_analyzer_directly():
     return True
 
 
+def test_incremental_file_updates():
+    """Test that re-analyzing a file replaces its part of the graph."""
+    print("\n♻️  Testing Incremental Call Graph Updates")
+    print("=" * 50)
+    
+    import shutil
+    test_repo = Path("test_incremental_graph_repo")
+    shutil.rmtree(test_repo, ignore_errors=True)
+    test_repo.mkdir()
+    
+    try:
+        (test_repo / "a.py").write_text(
+            "from b import helper\n\n"
+            "def run():\n"
+            "    return helper()\n"
+        )
+        (test_repo / "b.py").write_text(
+            "def other():\n"
+            "    return 1\n"
+        )
+        
+        analyzer = EnhancedASTAnalyzer(str(test_repo))
+        graph = analyzer.call_graph
+        analyzer.build_call_graph(["a.py", "b.py"])
+        
+        # helper() is not defined anywhere yet
+        assert graph.get_callees("a.py:run") == []
+        assert graph.get_pending_counts()["calls"] >= 1
+        assert graph.get_file_dependencies() == {"a.py": {"b.py"}}
+        
+        # Defining it in b.py connects the pending call
+        (test_repo / "b.py").write_text(
+            "def helper():\n"
+            "    return other()\n\n"
+            "def other():\n"
+            "    return 1\n"
+        )
+        analyzer.refresh_files(["b.py"])
+        assert graph.get_callees("a.py:run") == ["b.py:helper"]
+        assert graph.get_callees("b.py:helper") == ["b.py:other"]
+        
+        # Renaming it removes the old node instead of leaving it behind
+        (test_repo / "b.py").write_text(
+            "def assist():\n"
+            "    return 1\n"
+        )
+        analyzer.refresh_files(["b.py"])
+        b_nodes = sorted(n for n, d in graph.node_data.items() if d.file == "b.py")
+        assert b_nodes == ["b.py:__file__", "b.py:assist"]
+        assert graph.get_callees("a.py:run") == []
+        
+        # Deleting b.py removes its node; the import reconnects when it returns
+        (test_repo / "b.py").unlink()
+        analyzer.refresh_files(["b.py"])
+        assert graph.get_file_dependencies() == {}
+        (test_repo / "b.py").write_text(
+            "def helper():\n"
+            "    return 2\n"
+        )
+        analyzer.refresh_files(["b.py"])
+        assert graph.get_file_dependencies() == {"a.py": {"b.py"}}
+        assert graph.get_callees("a.py:run") == ["b.py:helper"]
+        
+        print(f"  Pending edges: {graph.get_pending_counts()}")
+        print("  ✓ Graph follows file changes without a rebuild")
+    finally:
+        shutil.rmtree(test_repo, ignore_errors=True)
+    
+    return True
+
+
 if __name__ == "__main__":
     print("\n🚀 NetworkX Call Graph Test Suite\n")
     
     success = True
     success &= test_graph_analyzer_directly()
     success &= test_call_graph_creation()
+    success &= test_incremental_file_updates()
     
     if success:
         print("\n✅ All NetworkX tests passed!")
@@ -241,6 +241,43 @@ def test_enhanced_analyzer_parallel():
     return True
 
 
+def test_warm_pool_reuse():
+    """Test that a started pool keeps its workers across calls."""
+    print("\n♻️ Testing warm pool reuse")
+    print("=" * 50)
+    
+    test_dir = Path("test_warm_pool")
+    test_dir.mkdir(exist_ok=True)
+    files = create_test_files(test_dir, num_files=24)
+    
+    analyzer = ParallelAnalyzer(max_workers=2, chunk_size=4).start()
+    try:
+        first = analyzer.analyze_files(files[:12], str(test_dir))
+        second = analyzer.analyze_files(files[12:], str(test_dir))
+        stats = analyzer.get_stats()
+    finally:
+        analyzer.shutdown()
+    
+    assert all(r.analysis for r in first.values()) and len(first) == 12
+    assert all(r.analysis for r in second.values()) and len(second) == 12
+    
+    # Same two worker processes served both calls, in chunks of 4 files
+    assert stats["calls"] == 2 and stats["files_analyzed"] == 24
+    assert len(stats["workers"]) == 2
+    assert sum(w["files"] for w in stats["workers"]) == 24
+    assert sum(w["batches"] for w in stats["workers"]) == 6
+    
+    print(f"✓ Pool startup: {stats['pool_startup_seconds']:.2f}s")
+    for worker in stats["workers"]:
+        print(f"  Worker {worker['pid']}: {worker['files']} files, "
+              f"{worker['files_per_sec']:.1f} files/s, startup {worker['startup_seconds']:.3f}s")
+    
+    import shutil
+    shutil.rmtree(test_dir, ignore_errors=True)
+    
+    return True
+
+
 def test_performance_comparison():
     """Compare sequential vs parallel performance."""
     print("\n⚡ Performance Comparison: Sequential vs Parallel")
@@ -313,6 +350,7 @@ if __name__ == "__main__":
     success &= test_parallel_analyzer()
     success &= test_parallel_ast_analyzer()
     success &= test_enhanced_analyzer_parallel()
+    success &= test_warm_pool_reuse()
     success &= test_performance_comparison()
     
     if success:
@@ -0,0 +1,141 @@
+from src.rag_service import RAGService
+from src.rag_service.models import ChunkType, CodeChunk, SearchResult, SearchResults
+from src.rag_service.query_cache import QueryCache
+
+
+def _result(name: str) -> SearchResult:
+    chunk = CodeChunk(
+        id=f"{name}.py:1:3",
+        content=f"def {name}():\n    pass\n",
+        file_path=f"{name}.py",
+        start_line=1,
+        end_line=3,
+        chunk_type=ChunkType.FUNCTION,
+        language="python",
+        symbol_name=name,
+    )
+    return SearchResult(chunk=chunk, score=0.5, match_type="hybrid")
+
+
+def test_key_normalizes_query_and_filters():
+    key = QueryCache.make_key("parse  config\n", 5, {"language": "python", "chunk_type": "function"}, "hybrid")
+    assert key == QueryCache.make_key("parse config", 5, {"chunk_type": "function", "language": "python"}, "hybrid")
+    assert key != QueryCache.make_key("parse config", 10, {"chunk_type": "function", "language": "python"}, "hybrid")
+    assert key != QueryCache.make_key("parse config", 5, None, "hybrid")
+
+
+def test_generation_bump_invalidates():
+    cache = QueryCache()
+    key = QueryCache.make_key("alpha", 5, None, "hybrid")
+    cache.put(key, [_result("alpha")])
+
+    hit = cache.get(key)
+    assert hit[0].chunk.symbol_name == "alpha"
+    assert hit[0].chunk.chunk_type == ChunkType.FUNCTION
+
+    cache.bump_generation()
+    assert cache.get(key) is None
+
+    # Results computed before a concurrent bump are not stored
+    stale = cache.generation
+    cache.bump_generation()
+    cache.put(key, [_result("alpha")], generation=stale)
+    assert cache.get(key) is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_lru_bounded_by_bytes():
+    probe = QueryCache()
+    probe.put("probe", [_result("a")])
+    size = probe.get_stats()["bytes"]
+
+    cache = QueryCache(max_bytes=2 * size)
+    for name in ("a", "b"):
+        cache.put(name, [_result(name)])
+    cache.get("a")
+    cache.put("c", [_result("c")])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.get_stats()["bytes"] <= 2 * size
+
+
+def test_persistent_cache_shared_across_instances(tmp_path):
+    db_path = str(tmp_path / "query_cache.db")
+    first = QueryCache(db_path=db_path)
+    second = QueryCache(db_path=db_path)
+
+    first.put("key", [_result("alpha")])
+    assert second.get("key")[0].chunk.file_path == "alpha.py"
+
+    # An index change in one process invalidates the other's memory LRU
+    second.bump_generation()
+    assert first.get("key") is None
+
+
+def test_index_changes_of_other_services_invalidate(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("def alpha(value):\n" + "    return value * 2\n" * 4)
+
+    # Not persisting cached results; the generation is kept with the index
+    reader = RAGService(persist_directory=str(repo / ".rag"), repo_path=str(repo))
+    writer = RAGService(persist_directory=str(repo / ".rag"), repo_path=str(repo))
+    searches = []
+
+    def search(**kwargs):
+        searches.append(kwargs["query"])
+        return [_result("alpha")]
+
+    reader.search.search = search
+
+    reader.search_code("alpha", k=5)
+    reader.search_code("alpha", k=5)
+    assert len(searches) == 1
+
+    writer.index_file(str(repo / "a.py"))
+    reader.search_code("alpha", k=5)
+    assert len(searches) == 2
+
+
+def test_service_search_cached_until_index_changes(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("def alpha(value):\n" + "    return value * 2\n" * 4)
+
+    service = RAGService(persist_directory=str(repo / ".rag"), repo_path=str(repo))
+    searches = []
+
+    def search(**kwargs):
+        searches.append(kwargs["query"])
+        return [_result("alpha")]
+
+    service.search.search = search
+
+    service.search_code("alpha", k=5)
+    cached = service.search_code(" alpha ", k=5)
+    assert searches == ["alpha"]
+    assert set(cached[0].timings) == {"query_cache", "total"}
+
+    service.index_file(str(repo / "a.py"))
+    service.search_code("alpha", k=5)
+    assert len(searches) == 2
+
+    service.delete_by_file("a.py")
+    service.search_code("alpha", k=5)
+    assert len(searches) == 3
+
+    cache_stats = service.get_stats().cache_stats["query_cache"]
+    assert cache_stats["hits"] == 1 and cache_stats["misses"] == 3
+
+    # Results missing a timed-out leg are not cached
+    def degraded_search(**kwargs):
+        searches.append(kwargs["query"])
+        return SearchResults([_result("alpha")], complete=False)
+
+    service.search.search = degraded_search
+    service.search_code("beta", k=5)
+    service.search_code("beta", k=5)
+    assert searches[-2:] == ["beta", "beta"]
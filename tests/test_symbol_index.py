@@ -0,0 +1,68 @@
+from src.rag_service.local_vector_store import LocalVectorStore
+from src.rag_service.models import ChunkType, CodeChunk
+from src.rag_service.search import CodeSearch
+from src.rag_service.symbol_index import SymbolIndex
+
+
+def _chunk(chunk_id, symbol, file_path, chunk_type=ChunkType.FUNCTION, **metadata):
+    return CodeChunk(
+        id=chunk_id,
+        content=f"def {symbol}(): pass",
+        file_path=file_path,
+        chunk_type=chunk_type,
+        language="python",
+        symbol_name=symbol,
+        metadata=metadata,
+        embedding=[1.0, 0.0, 0.0, 0.0],
+    )
+
+
+def test_exact_qualified_and_prefix_lookup():
+    index = SymbolIndex()
+    index.add_documents([
+        ("parse", {"symbol_name": "parse", "parent_symbol": "Parser", "chunk_type": "method", "file_path": "p.py"}),
+        ("parse_args", {"symbol_name": "parse_args", "chunk_type": "function", "file_path": "cli.py"}),
+        ("helpers", {"symbol_name": "load", "merged_symbols": "load,Parse", "chunk_type": "function", "file_path": "h.py"}),
+    ])
+
+    assert index.lookup("Parser.parse") == [("parse", 0)]
+    # Exact name first, then the case-insensitive merged match
+    assert [chunk_id for chunk_id, _ in index.lookup("parse")] == ["parse", "helpers"]
+    assert [chunk_id for chunk_id, _ in index.lookup("parse", prefix=True)] == ["parse", "helpers", "parse_args"]
+    assert index.lookup("parse", filters={"file_path": "cli.py"}, prefix=True) == [("parse_args", 3)]
+
+    index.remove_ids(["parse"])
+    assert index.lookup("Parser.parse") == []
+
+
+def test_store_backfills_and_maintains_symbol_index(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    store.add_chunks([
+        _chunk("a", "load_config", "config.py"),
+        _chunk("b", "Config", "config.py", ChunkType.CLASS),
+    ])
+    store.close()
+
+    # Rebuilt from the store when the index file is missing
+    (tmp_path / "code_chunks_symbols.db").unlink()
+    store = LocalVectorStore(str(tmp_path))
+    chunk, score = store.symbol_search("Config")[0]
+    assert chunk.id == "b" and score == 1.0
+
+    store.delete_by_file("config.py")
+    assert store.symbol_search("load_config") == []
+
+
+def test_search_by_symbol_falls_back_to_hybrid(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    store.add_chunks([_chunk("a", "load_config", "config.py")])
+
+    class NoEmbeddings:
+        enabled = False
+
+    search = CodeSearch(vector_store=store, embedding_service=NoEmbeddings())
+    results = search.search_by_symbol("load_config")
+    assert [(r.chunk.id, r.match_type) for r in results] == [("a", "symbol")]
+
+    fallback = search.search_by_symbol("config")
+    assert fallback and fallback[0].match_type != "symbol"
@@ -0,0 +1,70 @@
+from src.code_planner.ast_analyzer import FileAnalysis, Symbol
+from src.code_planner.symbol_table import SymbolTable, python_module_names
+
+
+def _file(path, names, imports=(), calls=(), language="python"):
+    return FileAnalysis(
+        path=path,
+        language=language,
+        symbols=[
+            Symbol(name=name, kind="method" if "." in name else "function",
+                   file_path=path, line_start=1, line_end=2, calls=set(calls))
+            for name in names
+        ],
+        imports=list(imports),
+        exports=list(names),
+        dependencies=set(),
+        complexity=1,
+    )
+
+
+def test_python_module_resolution():
+    table = SymbolTable()
+    table.add_file(_file("src/pkg/__init__.py", []))
+    table.add_file(_file("src/pkg/util.py", ["helper"]))
+    table.add_file(_file("src/pkg/sub/mod.py", [], imports=["..util", ".", "pkg.util", "os"]))
+    table.add_file(_file("src/pkg/sub/__init__.py", []))
+
+    assert python_module_names("src/pkg/__init__.py") == ["src.pkg", "pkg"]
+    assert table.resolve_import("..util", "src/pkg/sub/mod.py") == "src/pkg/util.py"
+    assert table.resolve_import(".", "src/pkg/sub/mod.py") == "src/pkg/sub/__init__.py"
+    assert table.resolve_import("pkg.util", "src/pkg/sub/mod.py") == "src/pkg/util.py"
+    assert table.resolve_import("src.pkg", "src/pkg/sub/mod.py") == "src/pkg/__init__.py"
+    assert table.resolve_import("os", "src/pkg/sub/mod.py") is None
+    assert table.imported_files("src/pkg/sub/mod.py") == {
+        "src/pkg/util.py", "src/pkg/sub/__init__.py"
+    }
+
+
+def test_js_module_resolution():
+    table = SymbolTable()
+    table.add_file(_file("web/lib/index.js", ["init"], language="javascript"))
+    table.add_file(_file("web/lib/api.ts", ["fetchUser"], language="javascript"))
+    table.add_file(_file("web/app.js", [], language="javascript"))
+
+    assert table.resolve_import("./lib", "web/app.js") == "web/lib/index.js"
+    assert table.resolve_import("./lib/api", "web/app.js") == "web/lib/api.ts"
+    assert table.resolve_import("../app.js", "web/lib/api.ts") == "web/app.js"
+    assert table.resolve_import("react", "web/app.js") is None
+
+
+def test_find_symbol_prefers_local_then_imported_definitions():
+    table = SymbolTable()
+    table.add_file(_file("a.py", ["save", "Store.load"]))
+    table.add_file(_file("b.py", ["save", "load"]))
+    table.add_file(_file("c.py", ["run"], imports=["b"]))
+
+    assert table.find_symbol("save", "a.py") == "a.py:save"
+    assert table.find_symbol("load", "a.py") == "a.py:Store.load"
+    assert table.find_symbol("save", "c.py") == "b.py:save"
+    assert table.find_symbol("Store.load", "c.py") == "a.py:Store.load"
+    assert table.find_symbol("a.save", "c.py") == "a.py:save"
+    assert table.find_symbol("missing", "c.py") is None
+
+    # Re-indexing replaces a file's entries; removing drops them
+    table.add_file(_file("b.py", ["store"]))
+    assert table.find_symbol("save", "c.py") == "a.py:save"
+    table.remove_file("a.py")
+    assert table.find_symbol("save", "c.py") is None
+    assert table.resolve_import("a", "c.py") is None
+    assert table.get_stats() == {"files": 2, "symbols": 2, "names": 2, "modules": 2}